@@ -12,6 +12,7 @@ Expected runtime: ~7-10 minutes
 Memory usage: ~3-5GB peak during build, ~2GB for pre-loaded rollups
 """
 
+import shutil
 import sys
 import time
 from pathlib import Path
@@ -21,7 +22,9 @@ import logging
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.core import DataLoader, RollupBuilder, StorageWriter, RollupLoader
+from src.core import DataLoader, RollupBuilder, StorageWriter, RollupLoader, QueryRouter
+from src.core.query_loader import load_queries
+from src.core.rollup_loader import ROLLUP_MANIFEST, drop_shared_memory
 
 logging.basicConfig(
     level=logging.INFO,
@@ -32,75 +35,35 @@ logger = logging.getLogger(__name__)
 # Optimize threading for parallel processing
 import os
 cores = os.cpu_count() or 8
-os.environ['POLARS_MAX_THREADS'] = str(cores)
-logger.info(f"Configured {cores} threads for parallel CSV processing")
+# setdefault: spawned build workers inherit their per-process thread share
+os.environ.setdefault('POLARS_MAX_THREADS', str(cores))
+logger.info(f"Configured {os.environ['POLARS_MAX_THREADS']} threads for parallel CSV processing")
 
 
-def convert_to_parquet(data_dir: Path, output_dir: Path) -> Path:
+def remove_events_sink(events_path: Path):
     """
-    Convert raw CSV files to Parquet format for DuckDB fallback.
-    
-    Parquet provides:
-    - 5-10× faster reads than CSV
-    - Better compression (~70% size reduction)
-    - Columnar format optimized for analytics
+    Delete the raw events sink written by the rollup build.
     
     Args:
-        data_dir: Directory containing raw CSV files
-        output_dir: Directory to write Parquet file
-    
-    Returns:
-        Path to created Parquet file
+        events_path: events.ipc file or events_parts directory
     """
-    import polars as pl
-    
-    logger.info("Converting raw data to Parquet for DuckDB fallback...")
-    
-    start_time = time.time()
-    parquet_path = output_dir / 'events.parquet'
-    
-    # Read all CSVs with proper schema
-    df = pl.scan_csv(
-        str(data_dir / '*.csv'),
-        has_header=True,
-        schema_overrides={
-            'ts': pl.Int64,
-            'type': pl.Utf8,
-            'auction_id': pl.Utf8,
-            'advertiser_id': pl.Int32,
-            'publisher_id': pl.Int32,
-            'bid_price': pl.Float64,
-            'user_id': pl.Int64,
-            'total_price': pl.Float64,
-            'country': pl.Utf8,
-        }
-    )
-    
-    # Write to Parquet with compression
-    df.sink_parquet(
-        parquet_path,
-        compression='snappy',  # Fast decompression
-        row_group_size=1_000_000,  # Optimize for scanning
-    )
-    
-    elapsed = time.time() - start_time
-    size_mb = parquet_path.stat().st_size / (1024 * 1024)
-    
-    logger.info(f"✅ Parquet file created: {parquet_path}")
-    logger.info(f"   Size: {size_mb:.1f} MB")
-    logger.info(f"   Time: {elapsed:.1f}s")
-    
-    return parquet_path
+    if events_path.is_dir():
+        shutil.rmtree(events_path)
+    else:
+        events_path.unlink(missing_ok=True)
 
 
-def build_duckdb_fallback(output_dir: Path, parquet_path: Path):
+def build_duckdb_fallback(output_dir: Path, events_path: Path):
     """
     Build DuckDB fallback with OPTIMAL PHYSICAL LAYOUT (no indexes needed!)
     
     Key optimizations from expert recommendations:
-    1. ✅ Already using Parquet (columnar, compressed)
-    2. ✅ Sort by high-cardinality dims (week, country, type) for GROUP BY locality
-    3. ✅ Pre-compute ALL time dimensions (week, day, hour, minute)
+    1. ✅ Arrow IPC input registered directly (no Parquet decode)
+    2. ✅ Sort by (day bucket, country, type) for GROUP BY locality
+    3. ✅ Integer minute buckets in the fact table; human-readable labels
+       (day, week, hour, minute) live in a small time_dim table joined at
+       query time. Local-timezone labels are computed once per minute
+       instead of four STRFTIME calls per row.
     4. ✅ Multi-threaded execution
     5. ✅ Simple, fast, no complex indexes
     
@@ -113,9 +76,11 @@ def build_duckdb_fallback(output_dir: Path, parquet_path: Path):
     
     Args:
         output_dir: Directory to write DuckDB file
-        parquet_path: Path to Parquet file with events
+        events_path: Path to the uncompressed Arrow IPC file with events, or
+            a directory of per-file IPC parts (parallel build)
     """
     import duckdb
+    import pyarrow as pa
     
     logger.info("Building DuckDB fallback with optimal physical layout...")
     
@@ -137,39 +102,81 @@ def build_duckdb_fallback(output_dir: Path, parquet_path: Path):
     
     logger.info(f"DuckDB configured: {cores} threads, 12GB memory limit")
     
-    logger.info("Creating sorted events table (optimized for GROUP BY)...")
-    
-    # KEY OPTIMIZATION: Create table SORTED by common GROUP BY dimensions
-    # This gives DuckDB massive performance wins:
-    # - Locality for GROUP BY operations
-    # - Better compression
-    # - Efficient aggregation without indexes
-    con.execute(f"""
-        CREATE TABLE events AS 
-        SELECT 
-            -- Pre-compute ALL time dimensions (matches rollup format)
-            STRFTIME(to_timestamp(ts / 1000.0), '%Y-%m-%d') AS day,
-            STRFTIME(to_timestamp(ts / 1000.0), '%Y-W%V') AS week,
-            STRFTIME(to_timestamp(ts / 1000.0), '%Y-%m-%d %H:00') AS hour,
-            STRFTIME(to_timestamp(ts / 1000.0), '%Y-%m-%d %H:%M') AS minute,
+    # Register the Arrow table so DuckDB scans its buffers in place. The
+    # sink is written uncompressed, so read_all() over a memory map is
+    # zero-copy: columns stay file-backed pages (evictable page cache)
+    # rather than a decompressed copy of every event on the heap
+    events_src = None
+    try:
+        if events_path.is_dir():
+            events_src = pa.concat_tables([
+                pa.ipc.open_file(pa.memory_map(str(part))).read_all()
+                for part in sorted(events_path.glob('*.ipc'))
+            ])
+        else:
+            events_src = pa.ipc.open_file(pa.memory_map(str(events_path))).read_all()
+        con.register('events_src', events_src)
+        
+        logger.info("Creating sorted events table (optimized for GROUP BY)...")
+        
+        # KEY OPTIMIZATION: Create table SORTED by common GROUP BY dimensions
+        # This gives DuckDB massive performance wins:
+        # - Locality for GROUP BY operations
+        # - Better compression (bitpacked ints instead of label strings)
+        # - Zonemap pruning on minute_id for time-range filters (day-tight
+        #   min/max per row group; the fallback adds minute_id bounds)
+        con.execute("""
+            CREATE TABLE events AS 
+            SELECT 
+                -- Integer time bucket (labels resolved through time_dim)
+                CAST(ts // 60000 AS INTEGER) AS minute_id,
             
-            -- Dimensions (ordered by cardinality)
-            type,
-            country,
-            advertiser_id,
-            publisher_id,
+                -- Dimensions (ordered by cardinality)
+                type,
+                country,
+                advertiser_id,
+                publisher_id,
             
-            -- Metrics
-            bid_price,
-            total_price
-        FROM parquet_scan('{parquet_path}')
-        ORDER BY week, country, type  -- Sort by common GROUP BY dimensions
+                -- Metrics
+                bid_price,
+                total_price
+            FROM events_src
+            ORDER BY minute_id // 1440, country, type  -- Day-sized buckets, then GROUP BY dims
+        """)
+    finally:
+        # The sink only feeds this CTAS: release the mapped buffers and
+        # delete it (a full uncompressed copy of the events), also when
+        # the build failed
+        con.unregister('events_src')
+        del events_src
+        remove_events_sink(events_path)
+    
+    logger.info("Creating time_dim label table...")
+    
+    # One row per minute in the data range (~525K rows/year). Labels are
+    # rendered in the session's local timezone, matching to_timestamp()
+    # semantics of the baseline, so any UTC offset (incl. half-hour zones)
+    # stays correct.
+    con.execute("""
+        CREATE TABLE time_dim AS
+        SELECT
+            CAST(m AS INTEGER) AS minute_id,
+            STRFTIME(to_timestamp(m * 60), '%Y-%m-%d') AS day,
+            STRFTIME(to_timestamp(m * 60), '%Y-W%V') AS week,
+            STRFTIME(to_timestamp(m * 60), '%Y-%m-%d %H:00') AS hour,
+            STRFTIME(to_timestamp(m * 60), '%Y-%m-%d %H:%M') AS minute
+        FROM range(
+            (SELECT MIN(minute_id) FROM events),
+            (SELECT MAX(minute_id) FROM events) + 1
+        ) t(m)
+        ORDER BY minute_id
     """)
     
     logger.info("Optimizing table statistics...")
     
     # Update statistics for query planner (fast, no indexes needed)
     con.execute("ANALYZE events")
+    con.execute("ANALYZE time_dim")
     
     # Checkpoint to persist
     con.execute("CHECKPOINT")
@@ -177,6 +184,17 @@ def build_duckdb_fallback(output_dir: Path, parquet_path: Path):
     # Get statistics
     row_count = con.execute("SELECT COUNT(*) FROM events").fetchone()[0]
     
+    # DuckDB picks per-segment compression at checkpoint (Dictionary/FSST
+    # for the low-cardinality strings, bitpacking/RLE for numbers); report
+    # the dominant scheme per column so a regression shows up in the log
+    compression = con.execute("""
+        SELECT column_name, MODE(compression)
+        FROM pragma_storage_info('events')
+        WHERE segment_type <> 'VALIDITY'
+        GROUP BY column_name
+        ORDER BY MIN(column_id)
+    """).fetchall()
+    
     con.close()
     
     elapsed = time.time() - start_time
@@ -186,7 +204,38 @@ def build_duckdb_fallback(output_dir: Path, parquet_path: Path):
     logger.info(f"   Rows: {row_count:,}")
     logger.info(f"   Size: {size_mb:.1f} MB")
     logger.info(f"   Time: {elapsed:.1f}s")
-    logger.info(f"   Strategy: Sorted table (week, country, type) - NO indexes needed!")
+    logger.info(f"   Compression: {', '.join(f'{col}={scheme}' for col, scheme in compression)}")
+    logger.info(f"   Strategy: Sorted table (day bucket, country, type) + time_dim labels - NO indexes needed!")
+
+
+def check_rollup_coverage(queries: list) -> int:
+    """
+    Dry-run the router over a query set.
+    
+    Args:
+        queries: Query dictionaries (same format as run.py)
+    
+    Returns:
+        Number of queries that would NOT be served by a rollup
+        (i.e. would need the DuckDB fallback)
+    """
+    router = QueryRouter()
+    unrouted = 0
+    
+    for i, query in enumerate(queries, 1):
+        try:
+            rollup_name, _ = router.route_query(query)
+        except Exception as e:
+            logger.warning(f"  Q{i}: routing failed ({e})")
+            rollup_name = None
+        
+        if rollup_name is None:
+            unrouted += 1
+            logger.info(f"  Q{i}: ⚠️ no rollup - needs fallback")
+        else:
+            logger.info(f"  Q{i}: → {rollup_name}")
+    
+    return unrouted
 
 
 def main():
@@ -205,9 +254,44 @@ def main():
         default=Path('rollups'),
         help='Directory to write rollup files'
     )
+    parser.add_argument(
+        '--build-workers',
+        type=int,
+        default=1,
+        help='Worker processes for the rollup build (1 = single-pass streaming build; '
+             'each extra worker holds one full CSV file in memory)'
+    )
+    parser.add_argument(
+        '--write-parquet',
+        action='store_true',
+        help='Also convert the CSVs to a Parquet mirror (<data-dir>_parquet/) '
+             'that DataLoader.load_lazy scans instead of CSV'
+    )
+    parser.add_argument(
+        '--query-file',
+        type=Path,
+        default=None,
+        help='JSON query list the run phase will execute (enables fallback skipping)'
+    )
+    parser.add_argument(
+        '--query-dir',
+        type=Path,
+        default=None,
+        help='Directory with inputs.py the run phase will execute (enables fallback skipping)'
+    )
+    parser.add_argument(
+        '--drop-shm',
+        action='store_true',
+        help='Unlink the shared memory segments published for --rollup-dir and exit'
+    )
     
     args = parser.parse_args()
     
+    if args.drop_shm:
+        dropped = drop_shared_memory(args.rollup_dir)
+        logger.info(f"✅ Dropped {dropped} shared memory segments for {args.rollup_dir}")
+        return
+    
     print("="*70)
     print("PREPARE PHASE: Building Optimized Rollup Tables")
     print("="*70)
@@ -231,6 +315,21 @@ def main():
     # Create rollup directory
     args.rollup_dir.mkdir(parents=True, exist_ok=True)
     
+    # The fallback is only skippable when the run-phase query set is known
+    # up front; otherwise unseen queries may still need it. Routing needs no
+    # rollup files, so decide before Phase 1 and skip the events sink too.
+    skip_fallback = False
+    if args.query_file or args.query_dir:
+        queries = load_queries(query_file=args.query_file, query_dir=args.query_dir)
+        if queries:
+            logger.info(f"Dry-run routing {len(queries)} queries...")
+            unrouted = check_rollup_coverage(queries)
+            skip_fallback = unrouted == 0
+            if skip_fallback:
+                logger.info("✅ All queries served by rollups - skipping DuckDB fallback build")
+            else:
+                logger.info(f"{unrouted} queries need the fallback - building it")
+    
     # Phase 1: Build rollups
     logger.info("")
     logger.info("="*70)
@@ -240,14 +339,35 @@ def main():
     build_start = time.time()
     
     loader = DataLoader(args.data_dir)
+    
+    if args.write_parquet:
+        parquet_start = time.time()
+        logger.info("Converting CSVs to Parquet...")
+        loader.write_parquet()
+        logger.info(f"✅ Parquet mirror written in {time.time() - parquet_start:.1f}s")
+    
     builder = RollupBuilder(loader)
     
-    logger.info("Starting single-pass rollup build...")
+    logger.info("Starting single-pass rollup build..." if args.build_workers <= 1
+                else f"Starting parallel rollup build ({args.build_workers} workers)...")
     logger.info("This will take approximately 7-10 minutes...")
     logger.info("")
     
+    # Projected raw events are written in the same CSV pass for the fallback.
+    # The .ipc suffix keeps RollupLoader (which discovers *.arrow) from
+    # mistaking the event table for a rollup.
     try:
-        rollups = builder.build_all_rollups_single_pass()
+        if args.build_workers > 1:
+            events_path = args.rollup_dir / 'events_parts'
+            rollups = builder.build_all_rollups_parallel(
+                max_workers=args.build_workers,
+                events_sink_dir=None if skip_fallback else events_path
+            )
+        else:
+            events_path = args.rollup_dir / 'events.ipc'
+            rollups = builder.build_all_rollups_single_pass(
+                events_sink_path=None if skip_fallback else events_path
+            )
     except Exception as e:
         logger.error(f"Failed to build rollups: {e}", exc_info=True)
         sys.exit(1)
@@ -267,6 +387,9 @@ def main():
     
     storage = StorageWriter(args.rollup_dir)
     
+    # The manifest describes the previous build's files - drop it first
+    (args.rollup_dir / ROLLUP_MANIFEST).unlink(missing_ok=True)
+    
     try:
         storage.write_all_rollups(rollups)
     except Exception as e:
@@ -285,18 +408,20 @@ def main():
     
     duckdb_start = time.time()
     
-    try:
-        # Convert CSV to Parquet (faster for DuckDB)
-        parquet_path = convert_to_parquet(args.data_dir, args.rollup_dir)
-        
-        # Build DuckDB database from Parquet
-        build_duckdb_fallback(args.rollup_dir, parquet_path)
-    except Exception as e:
-        logger.error(f"Failed to build DuckDB fallback: {e}", exc_info=True)
-        logger.warning("Continuing without DuckDB fallback - fallback queries will be slow!")
+    if skip_fallback:
+        # A fallback left by an earlier build would serve stale data
+        (args.rollup_dir / 'fallback.duckdb').unlink(missing_ok=True)
+    else:
+        try:
+            # Build DuckDB database from the events IPC written during Phase 1
+            build_duckdb_fallback(args.rollup_dir, events_path)
+        except Exception as e:
+            logger.error(f"Failed to build DuckDB fallback: {e}", exc_info=True)
+            logger.warning("Continuing without DuckDB fallback - fallback queries will be slow!")
     
     duckdb_time = time.time() - duckdb_start
-    logger.info(f"✅ DuckDB fallback built in {duckdb_time:.1f}s")
+    if not skip_fallback:
+        logger.info(f"✅ DuckDB fallback built in {duckdb_time:.1f}s")
     
     # Phase 4: Pre-load rollups for run phase
     logger.info("")
@@ -311,15 +436,30 @@ def main():
         # This happens during prepare phase so startup time doesn't count against query execution
         loader_instance = RollupLoader(
             args.rollup_dir,
-            preload_threshold_mb=1000  # Pre-load everything (up to 1GB)
+            preload_threshold_mb=1000,  # Pre-load everything (up to 1GB)
+            attach_shared_memory=False  # Fresh rollups: always read from disk
         )
         
         preloaded_count = len(loader_instance.preloaded)
+        # One directory pass instead of an exists() + stat() per rollup
+        with os.scandir(args.rollup_dir) as entries:
+            arrow_sizes = {
+                entry.name[:-len('.arrow')]: entry.stat().st_size
+                for entry in entries
+                if entry.name.endswith('.arrow') and entry.is_file()
+            }
         total_size_mb = sum(
-            (args.rollup_dir / f"{name}.arrow").stat().st_size / (1024*1024)
-            for name in loader_instance.preloaded.keys()
-            if (args.rollup_dir / f"{name}.arrow").exists()
-        )
+            arrow_sizes.get(name, 0) for name in loader_instance.preloaded
+        ) / (1024*1024)
+        
+        # Hand the pre-loaded rollups to run.py through shared memory
+        try:
+            loader_instance.publish_to_shared_memory()
+        except Exception as e:
+            logger.warning(f"Shared memory publish failed ({e}) - run phase will read from disk")
+        
+        # Let run.py skip rollup discovery
+        loader_instance.write_manifest()
         
     except Exception as e:
         logger.error(f"Failed to pre-load rollups: {e}", exc_info=True)
@@ -13,19 +13,25 @@ Expected runtime: <1s for all queries
 Memory usage: ~2GB (pre-loaded rollups)
 """
 
+import os
 import sys
 import time
-import csv
-import json
 from pathlib import Path
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Tuple
+
+import pyarrow as pa
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.core import RollupLoader, QueryRouter, QueryExecutor
+from src.core import RollupLoader, QueryRouter, QueryExecutor, QueryPattern
 from src.core.fallback_executor import FallbackExecutor
+from src.core.query_loader import load_queries
+from src.result_csv import write_result_csv
 
 logging.basicConfig(
     level=logging.INFO,
@@ -34,55 +40,137 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def load_queries(query_file=None, query_dir=None):
+def available_cpus() -> int:
+    """
+    Number of CPUs this process may run on.
+    
+    Uses the scheduler affinity mask where available, so a container
+    pinned to a cpuset doesn't size its pools for the whole host.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _failed_result(i: int, query: dict, e: Exception) -> dict:
+    """Log a failed query and build its summary entry."""
+    logger.error(f"Q{i}: ❌ Query {i} FAILED: {e}")
+    logger.error(f"     Query: {query}", exc_info=False)
+    
+    return {
+        'query': i,
+        'rollup': 'N/A',
+        'rows': 0,
+        'route_ms': 0,
+        'exec_ms': 0,
+        'total_ms': 0,
+        'status': f'failed: {str(e)[:50]}'
+    }
+
+
+def route_queries(
+    queries: List[dict],
+    router: QueryRouter,
+    executor: QueryExecutor,
+    fallback: FallbackExecutor
+) -> Tuple[List[tuple], List[tuple], List[dict]]:
+    """
+    Route every query once, up front, into a dispatch table.
+    
+    Each entry binds the query to the callable that executes it, so the
+    execution loops below neither re-route nor branch on the target.
+    
+    Args:
+        queries: Query JSON list
+        router: Query router
+        executor: Rollup query executor
+        fallback: DuckDB fallback executor
+    
+    Returns:
+        (rollup plans, fallback plans, failed results); a plan is
+        (i, query, target, execute, pattern, route_ms)
+    """
+    rollup_plans, fallback_plans, failed = [], [], []
+    route = router.route_query
+    perf = time.perf_counter
+    
+    for i, query in enumerate(queries, 1):
+        try:
+            route_start = perf()
+            rollup_name, pattern = route(query)
+            route_time = (perf() - route_start) * 1000
+        except Exception as e:
+            failed.append(_failed_result(i, query, e))
+            continue
+        
+        if rollup_name is None:
+            # No suitable rollup - use fallback to raw data
+            logger.info(f"Q{i}: No rollup found - using FALLBACK to raw data")
+            fallback_plans.append((i, query, 'FALLBACK_RAW', fallback.execute_arrow, pattern, route_time))
+        else:
+            logger.info(f"Q{i}: Routed to {rollup_name} ({route_time:.3f}ms)")
+            execute = partial(executor.execute_arrow, rollup_name)
+            rollup_plans.append((i, query, rollup_name, execute, pattern, route_time))
+    
+    return rollup_plans, fallback_plans, failed
+
+
+def run_one_query(
+    i: int,
+    query: dict,
+    target: str,
+    execute: Callable[[QueryPattern], pa.Table],
+    pattern: QueryPattern,
+    route_time: float,
+    output_dir: Path
+) -> dict:
     """
-    Load queries from various sources.
+    Execute and write one pre-routed query.
     
-    Priority order:
-    1. --query-file <path.json> - JSON file with query list
-    2. --query-dir <dir/inputs.py> - Python file with queries list
-    3. baseline/inputs.py (default)
+    Safe to call from several threads at once: rollups are immutable,
+    the executor's caches are only ever filled with identical values,
+    each fallback query borrows its own DuckDB cursor, and each query
+    writes its own q{i}.csv.
     
     Args:
-        query_file: Path to JSON file containing query list (optional)
-        query_dir: Path to directory containing inputs.py (optional)
+        i: 1-based query number (names the output file)
+        query: Query JSON (for error reporting)
+        target: Rollup name, or FALLBACK_RAW
+        execute: Bound executor for the target (pattern -> pa.Table)
+        pattern: Parsed query pattern
+        route_time: Time spent routing (ms)
+        output_dir: Directory to write q{i}.csv into
     
     Returns:
-        List of query dictionaries
+        Result summary dict (query, rollup, rows, timings, status)
     """
-    # Option 1: Load from JSON file
-    if query_file and Path(query_file).exists():
-        logger.info(f"Loading queries from JSON: {query_file}")
-        with open(query_file) as f:
-            queries = json.load(f)
-            if not isinstance(queries, list):
-                queries = [queries]
-            return queries
-    
-    # Option 2: Load from query_dir/inputs.py
-    if query_dir and Path(query_dir).exists():
-        inputs_path = Path(query_dir) / 'inputs.py'
-        if inputs_path.exists():
-            logger.info(f"Loading queries from Python: {inputs_path}")
-            sys.path.insert(0, str(query_dir))
-            try:
-                import inputs  # type: ignore
-                return inputs.queries
-            except (ImportError, AttributeError) as e:
-                logger.warning(f"Could not import queries from {inputs_path}: {e}")
-            finally:
-                if str(query_dir) in sys.path:
-                    sys.path.remove(str(query_dir))
-    
-    # Option 3: Default to baseline/inputs.py
-    logger.info("Loading queries from baseline/inputs.py (default)")
     try:
-        from baseline.inputs import queries
-        return queries
-    except ImportError:
-        logger.error("Could not load queries from baseline/inputs.py")
-        logger.error("Please provide --query-file or --query-dir")
-        return []
+        exec_start = time.perf_counter()
+        table = execute(pattern)
+        exec_time = (time.perf_counter() - exec_start) * 1000
+        query_time = route_time + exec_time
+        
+        logger.info(f"Q{i}: Execution {exec_time:.3f}ms, total {query_time:.3f}ms, "
+                    f"{table.num_rows} rows")
+        
+        # Columnar write (no per-row Python iteration); '\r\n' as csv.writer wrote
+        out_path = output_dir / f"q{i}.csv"
+        write_result_csv(table, out_path, lineterminator='\r\n')
+        
+        logger.info(f"Q{i}: ✅ Wrote results to: {out_path}")
+        
+        return {
+            'query': i,
+            'rollup': target,
+            'rows': table.num_rows,
+            'route_ms': route_time,
+            'exec_ms': exec_time,
+            'total_ms': query_time,
+            'status': 'success'
+        }
+        
+    except Exception as e:
+        return _failed_result(i, query, e)
 
 
 def main():
@@ -134,6 +222,18 @@ Examples:
         default=Path('fallback.duckdb'),
         help='Path to DuckDB fallback database (default: ./fallback.duckdb)'
     )
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=Path('data'),
+        help='Raw CSV directory, queried directly if the fallback database is missing (default: ./data)'
+    )
+    parser.add_argument(
+        '--query-workers',
+        type=int,
+        default=available_cpus(),
+        help='Number of queries to execute concurrently (default: CPUs available to this process)'
+    )
     
     args = parser.parse_args()
     
@@ -168,16 +268,14 @@ Examples:
     # Create output directory
     args.output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Load queries
+    # Load queries on a background thread so parsing overlaps with the
+    # rollup/fallback initialization below
     logger.info("")
-    queries = load_queries(query_file=args.query_file, query_dir=args.query_dir)
-    
-    if not queries:
-        logger.error("No queries loaded!")
-        sys.exit(1)
+    io_pool = ThreadPoolExecutor(max_workers=1)
+    queries_future = io_pool.submit(
+        load_queries, query_file=args.query_file, query_dir=args.query_dir
+    )
     
-    logger.info(f"✅ Loaded {len(queries)} queries")
-    print()
     # Initialize query system
     logger.info("")
     logger.info("="*70)
@@ -187,15 +285,15 @@ Examples:
     init_start = time.time()
     
     try:
-        # Load all rollups (should be pre-loaded from prepare phase)
-        loader = RollupLoader(args.rollup_dir, preload_threshold_mb=1000)
+        # Load all rollups (attached from shared memory if prepare published
+        # them; anything else is pre-loaded on a background thread)
+        loader = RollupLoader(args.rollup_dir, preload_threshold_mb=1000, background_preload=True)
         router = QueryRouter()
         executor = QueryExecutor(loader)
         
         # Initialize fallback executor for queries without suitable rollups
-        # Use the fallback path from args
-        fallback_path = args.fallback_path if args.fallback_path.exists() else None
-        fallback = FallbackExecutor(Path('data'), duckdb_path=fallback_path)
+        # (pre-built DuckDB database, or the raw CSVs if it's missing)
+        fallback = FallbackExecutor(args.data_dir, duckdb_path=args.fallback_path)
     except Exception as e:
         logger.error(f"Failed to initialize query system: {e}", exc_info=True)
         sys.exit(1)
@@ -203,91 +301,38 @@ Examples:
     init_time = time.time() - init_start
     logger.info(f"✅ Query system ready in {init_time:.3f}s")
     
+    queries = queries_future.result()
+    io_pool.shutdown()
+    
+    if not queries:
+        logger.error("No queries loaded!")
+        sys.exit(1)
+    
+    logger.info(f"✅ Loaded {len(queries)} queries")
+    
     # Execute queries
     logger.info("")
     logger.info("="*70)
     logger.info("Executing Queries")
     logger.info("="*70)
     
-    results = []
-    total_query_time = 0
+    exec_start = time.perf_counter()
     
-    for i, query in enumerate(queries, 1):
-        logger.info(f"\nQuery {i}:")
-        
-        query_start = time.perf_counter()
-        
-        try:
-            # Route query
-            route_start = time.perf_counter()
-            rollup_name, pattern = router.route_query(query)
-            route_time = (time.perf_counter() - route_start) * 1000
-            
-            if rollup_name is None:
-                # No suitable rollup - use fallback to raw data
-                logger.info(f"  No rollup found - using FALLBACK to raw data")
-                
-                # Execute with fallback
-                exec_start = time.perf_counter()
-                cols, rows = fallback.execute_from_raw(pattern)
-                exec_time = (time.perf_counter() - exec_start) * 1000
-                
-                query_time = (time.perf_counter() - query_start) * 1000
-                total_query_time += query_time
-                
-                logger.info(f"  Fallback scan: {exec_time:.3f}ms")
-                logger.info(f"  Total: {query_time:.3f}ms")
-                logger.info(f"  Result: {len(rows)} rows")
-                
-                rollup_name = 'FALLBACK_RAW'
-            else:
-                # Use rollup
-                logger.info(f"  Routed to: {rollup_name} ({route_time:.3f}ms)")
-                
-                # Execute query
-                exec_start = time.perf_counter()
-                cols, rows = executor.execute(rollup_name, pattern)
-                exec_time = (time.perf_counter() - exec_start) * 1000
-                
-                query_time = (time.perf_counter() - query_start) * 1000
-                total_query_time += query_time
-                
-                logger.info(f"  Execution: {exec_time:.3f}ms")
-                logger.info(f"  Total: {query_time:.3f}ms")
-                logger.info(f"  Result: {len(rows)} rows")
-            
-            # Write results to CSV
-            out_path = args.output_dir / f"q{i}.csv"
-            with open(out_path, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(cols)
-                writer.writerows(rows)
-            
-            logger.info(f"  ✅ Wrote results to: {out_path}")
-            
-            results.append({
-                'query': i,
-                'rollup': rollup_name,
-                'rows': len(rows),
-                'route_ms': route_time,
-                'exec_ms': exec_time,
-                'total_ms': query_time,
-                'status': 'success'
-            })
-            
-        except Exception as e:
-            logger.error(f"  ❌ Query {i} FAILED: {e}")
-            logger.error(f"     Query: {query}", exc_info=False)
-            
-            results.append({
-                'query': i,
-                'rollup': 'N/A',
-                'rows': 0,
-                'route_ms': 0,
-                'exec_ms': 0,
-                'total_ms': 0,
-                'status': f'failed: {str(e)[:50]}'
-            })
+    # Route everything once, then run each kind of query in its own loop
+    rollup_plans, fallback_plans, results = route_queries(queries, router, executor, fallback)
+    
+    # Queries are independent (immutable rollups, a DuckDB cursor per
+    # fallback query, per-query output file), so run them concurrently.
+    # Fallbacks are submitted first so the slow ones start early.
+    with ThreadPoolExecutor(max_workers=args.query_workers) as pool:
+        futures = [
+            pool.submit(run_one_query, *plan, args.output_dir)
+            for plan in fallback_plans + rollup_plans
+        ]
+        results.extend(future.result() for future in futures)
+    results.sort(key=lambda r: r['query'])
+    wall_time = (time.perf_counter() - exec_start) * 1000
+    total_query_time = sum(r['total_ms'] for r in results)
     
     # Summary
     print()
@@ -304,15 +349,16 @@ Examples:
     print()
     print(f"Total query time: {total_query_time:.3f}ms ({total_query_time/1000:.3f}s)")
     print(f"Average per query: {total_query_time/len(queries):.3f}ms")
+    print(f"Wall time ({args.query_workers} workers): {wall_time:.3f}ms ({wall_time/1000:.3f}s)")
     print()
     
-    # Check against budget
+    # Check against budget (queries overlap, so wall time is what counts)
     budget_ms = 1000  # 1 second
-    if total_query_time < budget_ms:
-        speedup = budget_ms / total_query_time
+    if wall_time < budget_ms:
+        speedup = budget_ms / wall_time
         print(f"✅ UNDER BUDGET! ({speedup:.1f}× faster than 1s target)")
     else:
-        print(f"⚠️ OVER BUDGET by {total_query_time - budget_ms:.0f}ms")
+        print(f"⚠️ OVER BUDGET by {wall_time - budget_ms:.0f}ms")
     
     # Count successes
     successes = sum(1 for r in results if r['status'] == 'success')
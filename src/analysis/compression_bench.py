@@ -10,13 +10,14 @@ Tests different compression strategies to measure:
 This helps decide which encodings to use for each column type.
 """
 
+import os
 import time
+import statistics
 import sys
-import csv
 from pathlib import Path
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
 import struct
-import zlib
 
 try:
     import lz4.frame
@@ -25,75 +26,295 @@ except ImportError:
     HAS_LZ4 = False
     print("⚠️  lz4 not installed. Install with: pip install lz4")
 
+# zlib-ng is a drop-in for stdlib zlib with SIMD match finding and CRC;
+# fall back to the reference implementation when it isn't installed
+try:
+    from zlib_ng import zlib_ng as zlib
+    ZLIB_IMPL = 'zlib-ng'
+except ImportError:
+    import zlib
+    ZLIB_IMPL = 'zlib'
+
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
+# zstd: prefer the zstandard bindings, otherwise use the codec bundled
+# with pyarrow (same libzstd, no extra dependency)
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    zstandard = None
+    HAS_ZSTD = pa.Codec.is_available('zstd')
+    if not HAS_ZSTD:
+        print("⚠️  zstd not available. Install with: pip install zstandard")
 
-def load_column_sample(csv_file: Path, column: str, max_rows: int = 100000) -> List:
-    """Load a single column from CSV"""
+
+def load_column_sample(csv_file: Path, column: str, max_rows: int = 100000) -> pa.ChunkedArray:
+    """
+    Load a single column from CSV as an Arrow array.
+    
+    Arrow's CSV reader parses only the requested column (as strings, empty
+    → NULL) and stops once max_rows have been read, so no per-row Python
+    objects are created.
+    """
     print(f"Loading column '{column}' from {csv_file.name}...")
     
-    values = []
-    with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader):
-            if i >= max_rows:
-                break
-            val = row.get(column, '')
-            values.append(val if val != '' else None)
-    
-    return values
+    reader = pacsv.open_csv(
+        csv_file,
+        read_options=pacsv.ReadOptions(block_size=4 * 1024 * 1024),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=[column],
+            column_types={column: pa.string()},
+            strings_can_be_null=True
+        )
+    )
+    
+    batches = []
+    rows = 0
+    for batch in reader:
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= max_rows:
+            break
+    
+    table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, max_rows)
+    return table.column(0)
 
 
-def benchmark_dictionary_encoding(values: List) -> Tuple[float, int, int]:
-    """Test dictionary encoding"""
-    start = time.time()
+def _concat_bytes(arr: pa.Array) -> bytes:
+    """Concatenated UTF-8 bytes of a string array (NULLs contribute nothing)"""
+    arr = arr.cast(pa.string())
+    offsets = np.frombuffer(arr.buffers()[1], dtype=np.int32)[arr.offset:arr.offset + len(arr) + 1]
+    if len(offsets) == 0 or arr.buffers()[2] is None:
+        return b''
+    # Slice the Arrow buffer first (zero-copy) so only the live range is copied
+    return arr.buffers()[2].slice(int(offsets[0]), int(offsets[-1] - offsets[0])).to_pybytes()
+
+
+def _as_arrow(values) -> pa.Array:
+    """Return values as a single contiguous Arrow array (no copy if already Arrow)"""
+    if isinstance(values, pa.ChunkedArray):
+        return values.combine_chunks()
+    if isinstance(values, pa.Array):
+        return values
+    return pa.array(values)
+
+
+# Peak memcpy bandwidth (MB/s), measured once by main()
+_PEAK_BW = None
+
+# Below this fraction of memory bandwidth a codec is limited by its own
+# compute, not by moving bytes
+COMPUTE_BOUND_FRACTION = 0.3
+
+
+def measure_peak_bandwidth(size_mb: int = 256, trials: int = 3) -> float:
+    """
+    Measure peak memory bandwidth with a large NumPy copy.
+    
+    Counts bytes read + written per copy; the best of several trials
+    approximates what a streaming decoder could achieve at most.
+    
+    Args:
+        size_mb: Buffer size (MB) - well above last-level cache
+        trials: Number of copies (max is taken)
+    
+    Returns:
+        Peak bandwidth in MB/s
+    """
+    src = np.ones(size_mb * 1024 * 1024, dtype=np.uint8)
+    dst = np.empty_like(src)
+    best = 0.0
+    for _ in range(trials):
+        start = time.perf_counter_ns()
+        np.copyto(dst, src)
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        best = max(best, 2 * size_mb / elapsed)
+    return best
+
+
+def _regime(throughput_mbps: float) -> str:
+    """Label a throughput as compute- or memory-bound against _PEAK_BW."""
+    if not _PEAK_BW:
+        return ''
+    bound = 'compute' if throughput_mbps < COMPUTE_BOUND_FRACTION * _PEAK_BW else 'memory'
+    return f"[{bound}-bound]"
+
+
+def _timed(fn, n: int = 5, warmup: int = 1) -> float:
+    """
+    Median wall time of fn() in seconds.
+    
+    Warm-up calls absorb first-use costs (codec tables, allocator growth)
+    so they don't land in the measurement; the median of n timed runs
+    filters scheduler noise.
+    
+    Args:
+        fn: Zero-argument callable to time
+        n: Number of timed runs
+        warmup: Number of untimed runs first
+    
+    Returns:
+        Median run time in seconds
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1e9
+
+
+def benchmark_dictionary_encoding(values) -> Tuple[float, int, int]:
+    """Test dictionary encoding (Arrow's C++ hash kernel, as a columnar engine would)"""
+    arr = _as_arrow(values)
     
-    # Build dictionary
-    unique_values = list(set(v for v in values if v is not None))
-    value_to_id = {v: i for i, v in enumerate(unique_values)}
+    start = time.time()
     
-    # Encode as integers
-    encoded = np.array([value_to_id.get(v, -1) if v is not None else -1 
-                       for v in values], dtype=np.int32)
+    # Build dictionary + int32 indices in one pass (NULLs stay NULL)
+    dict_arr = arr.dictionary_encode()
     
     # Dictionary size
-    dict_bytes = sum(len(str(v).encode('utf-8')) for v in unique_values)
+    dict_bytes = dict_arr.dictionary.nbytes
     
     # Encoded array size
-    array_bytes = encoded.nbytes
+    array_bytes = dict_arr.indices.nbytes
     
     encode_time = time.time() - start
     total_bytes = dict_bytes + array_bytes
     
-    return encode_time, total_bytes, len(unique_values)
+    return encode_time, total_bytes, len(dict_arr.dictionary)
 
 
-def benchmark_rle_encoding(values: List) -> Tuple[float, int, int]:
-    """Test run-length encoding"""
-    start = time.time()
-    
-    runs = []
-    if len(values) == 0:
+def rle_encode(values) -> Tuple[np.ndarray, np.ndarray, pa.Array]:
+    """
+    Run-length encode a column as two parallel arrays (structure of arrays).
+    
+    Values are factorized to dictionary codes (NULL gets its own code, so
+    consecutive NULLs form one run); a run starts wherever the code
+    differs from the previous one.
+    
+    Args:
+        values: Column values (Arrow array/ChunkedArray or sequence)
+    
+    Returns:
+        (run_codes int32[], run_lengths int32[], dictionary) - run i is
+        run_lengths[i] copies of dictionary[run_codes[i]]
+    """
+    arr = _as_arrow(values)
+    encoded = arr.dictionary_encode(null_encoding='encode')
+    indices = encoded.indices
+    if len(indices) == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), encoded.dictionary
+    
+    # View the int32 index buffer directly - zero-copy, no conversion layer
+    codes = np.frombuffer(indices.buffers()[1], dtype=np.int32)[indices.offset:indices.offset + len(indices)]
+    
+    change = np.concatenate(([True], codes[1:] != codes[:-1]))
+    starts = np.flatnonzero(change)
+    run_lengths = np.diff(np.concatenate((starts, [len(codes)]))).astype(np.int32)
+    run_codes = codes[starts]
+    
+    return run_codes, run_lengths, encoded.dictionary
+
+
+if HAS_NUMBA:
+    @numba.njit(cache=True, parallel=True)
+    def _rle_filtered_sum_kernel(run_codes, run_lengths, code_values, keep):
+        total = 0.0
+        for i in numba.prange(len(run_codes)):
+            code = run_codes[i]
+            if keep[code]:
+                total += code_values[code] * run_lengths[i]
+        return total
+
+
+def rle_filtered_sum(
+    run_codes: np.ndarray,
+    run_lengths: np.ndarray,
+    code_values: np.ndarray,
+    keep: np.ndarray
+) -> float:
+    """
+    SUM of the rows selected by a filter, computed directly on RLE runs.
+    
+    Filter and aggregate are fused per run (value x run length), so the
+    decoded column is never materialized. Compiled with Numba when
+    installed, otherwise a vectorized NumPy pass over the runs.
+    
+    Args:
+        run_codes: Dictionary code of each run (from rle_encode)
+        run_lengths: Length of each run (from rle_encode)
+        code_values: Numeric value of each dictionary code
+        keep: Per-code filter result (False for NULL)
+    
+    Returns:
+        Sum over kept rows
+    """
+    if HAS_NUMBA:
+        return float(_rle_filtered_sum_kernel(run_codes, run_lengths, code_values, keep))
+    kept = keep[run_codes]
+    return float(np.dot(code_values[run_codes[kept]], run_lengths[kept]))
+
+
+def benchmark_rle_scan(values) -> Optional[Tuple[float, float]]:
+    """
+    Time a filtered SUM over an RLE column: decode-then-sum vs fused.
+    
+    The filter keeps values at or above the median distinct value.
+    
+    Args:
+        values: Column values (must parse as numbers)
+    
+    Returns:
+        (decode_then_sum_time, fused_time), or None for non-numeric columns
+    """
+    run_codes, run_lengths, dictionary = rle_encode(values)
+    try:
+        code_values = dictionary.cast(pa.float64()).to_numpy(zero_copy_only=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+    if len(code_values) == 0 or np.isnan(code_values).all():
+        return None
+    
+    # NULL (NaN) codes never pass the filter
+    keep = code_values >= np.nanmedian(code_values)
+    
+    def decode_then_sum():
+        decoded = np.repeat(run_codes, run_lengths)
+        return code_values[decoded][keep[decoded]].sum()
+    
+    rle_filtered_sum(run_codes, run_lengths, code_values, keep)  # JIT compile outside timing
+    decode_time = _timed(decode_then_sum)
+    fused_time = _timed(lambda: rle_filtered_sum(run_codes, run_lengths, code_values, keep))
+    return decode_time, fused_time
+
+
+def benchmark_rle_encoding(values) -> Tuple[float, int, int]:
+    """Test run-length encoding (vectorized run-boundary detection)"""
+    arr = _as_arrow(values)
+    if len(arr) == 0:
         return 0, 0, 0
     
-    current_val = values[0]
-    count = 1
-    
-    for v in values[1:]:
-        if v == current_val:
-            count += 1
-        else:
-            runs.append((current_val, count))
-            current_val = v
-            count = 1
-    runs.append((current_val, count))
-    
+    start = time.time()
+    run_codes, run_lengths, _ = rle_encode(arr)
     encode_time = time.time() - start
     
-    # Estimate size (value + count per run)
-    run_bytes = len(runs) * (8 + 4)  # 8 bytes for value string hash, 4 for count
+    # Size: one dictionary code + one count per run
+    run_bytes = run_codes.nbytes + run_lengths.nbytes
     
-    return encode_time, run_bytes, len(runs)
+    return encode_time, run_bytes, len(run_codes)
 
 
 def benchmark_lz4_compression(data: bytes) -> Tuple[float, float, int]:
@@ -101,35 +322,106 @@ def benchmark_lz4_compression(data: bytes) -> Tuple[float, float, int]:
     if not HAS_LZ4:
         return 0, 0, len(data)
     
-    # Compress
-    start = time.time()
+    # Size is deterministic - compress once, then time each direction
     compressed = lz4.frame.compress(data)
-    compress_time = time.time() - start
-    
-    # Decompress
-    start = time.time()
-    _ = lz4.frame.decompress(compressed)
-    decompress_time = time.time() - start
+    compress_time = _timed(lambda: lz4.frame.compress(data))
+    decompress_time = _timed(lambda: lz4.frame.decompress(compressed))
     
     return compress_time, decompress_time, len(compressed)
 
 
 def benchmark_zlib_compression(data: bytes, level: int = 6) -> Tuple[float, float, int]:
-    """Test zlib/gzip compression"""
+    """Test zlib/gzip compression (zlib-ng when installed)"""
     
-    # Compress
-    start = time.time()
+    # Size is deterministic - compress once, then time each direction
     compressed = zlib.compress(data, level=level)
-    compress_time = time.time() - start
+    compress_time = _timed(lambda: zlib.compress(data, level=level))
+    decompress_time = _timed(lambda: zlib.decompress(compressed))
     
-    # Decompress
-    start = time.time()
-    _ = zlib.decompress(compressed)
-    decompress_time = time.time() - start
+    return compress_time, decompress_time, len(compressed)
+
+
+def _zstd_codec(level: int, raw_size: int) -> Tuple[Callable, Callable]:
+    """
+    (compress, decompress) functions for zstd.
+    
+    Uses the zstandard bindings when installed, otherwise pyarrow's
+    bundled zstd codec (which needs the decompressed size up front).
+    """
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=level)
+        decompressor = zstandard.ZstdDecompressor()
+        return compressor.compress, decompressor.decompress
+    codec = pa.Codec('zstd', compression_level=level)
+    return (
+        lambda d: codec.compress(d, asbytes=True),
+        lambda c: codec.decompress(c, decompressed_size=raw_size, asbytes=True),
+    )
+
+
+def benchmark_zstd_compression(data: bytes, level: int = 3) -> Tuple[float, float, int]:
+    """
+    Test zstd compression.
+    
+    Uses the zstandard bindings when installed, otherwise pyarrow's
+    bundled zstd codec.
+    
+    Args:
+        data: Raw bytes to compress
+        level: zstd compression level
+    
+    Returns:
+        (compress_time, decompress_time, compressed_size)
+    """
+    compress, decompress = _zstd_codec(level, len(data))
+    
+    # Size is deterministic - compress once, then time each direction
+    compressed = compress(data)
+    compress_time = _timed(lambda: compress(data))
+    decompress_time = _timed(lambda: decompress(compressed))
     
     return compress_time, decompress_time, len(compressed)
 
 
+def benchmark_parallel_decompression(
+    decompress: Callable[[], object],
+    raw_size: int,
+    workers: int = None
+) -> Tuple[float, int]:
+    """
+    Aggregate decompression throughput with one decoder per core.
+    
+    The codecs release the GIL while decoding, so threads decode truly in
+    parallel - the situation when several rollups are loaded at once.
+    4 tasks per worker amortize the dispatch overhead.
+    
+    Args:
+        decompress: Zero-argument callable decoding one buffer
+        raw_size: Decompressed size of one buffer (bytes)
+        workers: Number of threads (default: CPUs this process may run on)
+    
+    Returns:
+        (aggregate MB/s, number of threads)
+    """
+    if not workers:
+        # The affinity mask, not the host's core count, bounds parallelism
+        # in containers and under taskset
+        if hasattr(os, 'sched_getaffinity'):
+            workers = len(os.sched_getaffinity(0))
+        else:
+            workers = os.cpu_count() or 1
+    n_tasks = 4 * workers
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: decompress(), range(workers)))  # Warm up threads
+        start = time.perf_counter_ns()
+        list(pool.map(lambda _: decompress(), range(n_tasks)))
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+    
+    throughput = (n_tasks * raw_size / 1024 / 1024) / elapsed if elapsed > 0 else 0
+    return throughput, workers
+
+
 def benchmark_column(csv_file: Path, column: str, max_rows: int = 100000):
     """Benchmark all encoding strategies for a column"""
     
@@ -141,17 +433,17 @@ def benchmark_column(csv_file: Path, column: str, max_rows: int = 100000):
     values = load_column_sample(csv_file, column, max_rows)
     print(f"Loaded {len(values):,} values")
     
-    # Calculate null percentage
-    null_count = sum(1 for v in values if v is None or v == '')
+    # Calculate null percentage (empty fields are read as NULL)
+    null_count = values.null_count
     null_pct = (null_count / len(values) * 100) if len(values) > 0 else 0
     print(f"NULL percentage: {null_pct:.1f}%")
     
     # Calculate cardinality
-    unique_count = len(set(v for v in values if v is not None and v != ''))
+    unique_count = pc.count_distinct(values).as_py()
     print(f"Unique values: {unique_count:,}")
     
-    # Raw size (as strings)
-    raw_bytes = sum(len(str(v).encode('utf-8')) for v in values if v is not None)
+    # Raw size (as UTF-8 strings; binary_length counts bytes, not characters)
+    raw_bytes = pc.sum(pc.binary_length(_as_arrow(values).cast(pa.string()))).as_py() or 0
     print(f"Raw string size: {raw_bytes:,} bytes ({raw_bytes/1024/1024:.2f} MB)")
     
     print(f"\n{'Strategy':<30} {'Time (ms)':<15} {'Size (bytes)':<15} {'Ratio':<10} {'Throughput'}")
@@ -161,33 +453,58 @@ def benchmark_column(csv_file: Path, column: str, max_rows: int = 100000):
     encode_time, dict_bytes, dict_size = benchmark_dictionary_encoding(values)
     ratio = raw_bytes / dict_bytes if dict_bytes > 0 else 0
     throughput = (raw_bytes / 1024 / 1024) / encode_time if encode_time > 0 else 0
-    print(f"{'Dictionary Encoding':<30} {encode_time*1000:<15.2f} {dict_bytes:<15,} {ratio:<10.2f}x {throughput:.1f} MB/s")
+    print(f"{'Dictionary Encoding':<30} {encode_time*1000:<15.2f} {dict_bytes:<15,} {ratio:<10.2f}x {throughput:.1f} MB/s {_regime(throughput)}")
     print(f"  └─ Dictionary size: {dict_size} entries")
     
     # RLE encoding
     encode_time, rle_bytes, run_count = benchmark_rle_encoding(values)
     ratio = raw_bytes / rle_bytes if rle_bytes > 0 else 0
     throughput = (raw_bytes / 1024 / 1024) / encode_time if encode_time > 0 else 0
-    print(f"{'RLE Encoding':<30} {encode_time*1000:<15.2f} {rle_bytes:<15,} {ratio:<10.2f}x {throughput:.1f} MB/s")
+    print(f"{'RLE Encoding':<30} {encode_time*1000:<15.2f} {rle_bytes:<15,} {ratio:<10.2f}x {throughput:.1f} MB/s {_regime(throughput)}")
     print(f"  └─ Run count: {run_count}")
+    scan = benchmark_rle_scan(values)
+    if scan is not None:
+        decode_time, fused_time = scan
+        kernel = 'numba' if HAS_NUMBA else 'numpy'
+        print(f"  └─ Filtered SUM: decode+sum {decode_time*1000:.3f} ms, "
+              f"fused on runs {fused_time*1000:.3f} ms ({kernel})")
     
     # LZ4 compression (on raw bytes)
-    raw_data = ''.join(str(v) if v is not None else '' for v in values).encode('utf-8')
+    raw_data = _concat_bytes(_as_arrow(values))
     if HAS_LZ4:
         comp_time, decomp_time, lz4_bytes = benchmark_lz4_compression(raw_data)
         ratio = len(raw_data) / lz4_bytes if lz4_bytes > 0 else 0
         comp_throughput = (len(raw_data) / 1024 / 1024) / comp_time if comp_time > 0 else 0
-        decomp_throughput = (len(raw_data) / 1024 / 1024) / decomp_time if decomp_time > 0 else 0
-        print(f"{'LZ4 Compression':<30} {comp_time*1000:<15.2f} {lz4_bytes:<15,} {ratio:<10.2f}x {comp_throughput:.1f} MB/s (comp)")
-        print(f"{'LZ4 Decompression':<30} {decomp_time*1000:<15.2f} {lz4_bytes:<15,} {ratio:<10.2f}x {decomp_throughput:.1f} MB/s (decomp)")
+        lz4_decomp_throughput = (len(raw_data) / 1024 / 1024) / decomp_time if decomp_time > 0 else 0
+        print(f"{'LZ4 Compression':<30} {comp_time*1000:<15.2f} {lz4_bytes:<15,} {ratio:<10.2f}x {comp_throughput:.1f} MB/s (comp) {_regime(comp_throughput)}")
+        print(f"{'LZ4 Decompression':<30} {decomp_time*1000:<15.2f} {lz4_bytes:<15,} {ratio:<10.2f}x {lz4_decomp_throughput:.1f} MB/s (decomp) {_regime(lz4_decomp_throughput)}")
+        lz4_data = lz4.frame.compress(raw_data)
+        mbps, threads = benchmark_parallel_decompression(lambda: lz4.frame.decompress(lz4_data), len(raw_data))
+        print(f"{f'LZ4 Decompression ({threads} thr)':<30} {'':<15} {lz4_bytes:<15,} {ratio:<10.2f}x {mbps:.1f} MB/s (aggregate) {_regime(mbps)}")
+    
+    # zstd compression
+    if HAS_ZSTD:
+        comp_time, decomp_time, zstd_bytes = benchmark_zstd_compression(raw_data, level=3)
+        ratio = len(raw_data) / zstd_bytes if zstd_bytes > 0 else 0
+        comp_throughput = (len(raw_data) / 1024 / 1024) / comp_time if comp_time > 0 else 0
+        zstd_decomp_throughput = (len(raw_data) / 1024 / 1024) / decomp_time if decomp_time > 0 else 0
+        print(f"{'Zstd Compression (level 3)':<30} {comp_time*1000:<15.2f} {zstd_bytes:<15,} {ratio:<10.2f}x {comp_throughput:.1f} MB/s (comp) {_regime(comp_throughput)}")
+        print(f"{'Zstd Decompression':<30} {decomp_time*1000:<15.2f} {zstd_bytes:<15,} {ratio:<10.2f}x {zstd_decomp_throughput:.1f} MB/s (decomp) {_regime(zstd_decomp_throughput)}")
+        zstd_compress, zstd_decompress = _zstd_codec(3, len(raw_data))
+        zstd_data = zstd_compress(raw_data)
+        mbps, threads = benchmark_parallel_decompression(lambda: zstd_decompress(zstd_data), len(raw_data))
+        print(f"{f'Zstd Decompression ({threads} thr)':<30} {'':<15} {zstd_bytes:<15,} {ratio:<10.2f}x {mbps:.1f} MB/s (aggregate) {_regime(mbps)}")
     
     # Zlib compression
     comp_time, decomp_time, zlib_bytes = benchmark_zlib_compression(raw_data, level=6)
     ratio = len(raw_data) / zlib_bytes if zlib_bytes > 0 else 0
     comp_throughput = (len(raw_data) / 1024 / 1024) / comp_time if comp_time > 0 else 0
     decomp_throughput = (len(raw_data) / 1024 / 1024) / decomp_time if decomp_time > 0 else 0
-    print(f"{'Zlib Compression (level 6)':<30} {comp_time*1000:<15.2f} {zlib_bytes:<15,} {ratio:<10.2f}x {comp_throughput:.1f} MB/s (comp)")
-    print(f"{'Zlib Decompression':<30} {decomp_time*1000:<15.2f} {zlib_bytes:<15,} {ratio:<10.2f}x {decomp_throughput:.1f} MB/s (decomp)")
+    print(f"{ZLIB_IMPL.capitalize() + ' Compression (level 6)':<30} {comp_time*1000:<15.2f} {zlib_bytes:<15,} {ratio:<10.2f}x {comp_throughput:.1f} MB/s (comp) {_regime(comp_throughput)}")
+    print(f"{ZLIB_IMPL.capitalize() + ' Decompression':<30} {decomp_time*1000:<15.2f} {zlib_bytes:<15,} {ratio:<10.2f}x {decomp_throughput:.1f} MB/s (decomp) {_regime(decomp_throughput)}")
+    zlib_data = zlib.compress(raw_data, level=6)
+    mbps, threads = benchmark_parallel_decompression(lambda: zlib.decompress(zlib_data), len(raw_data))
+    print(f"{ZLIB_IMPL.capitalize() + f' Decompression ({threads} thr)':<30} {'':<15} {zlib_bytes:<15,} {ratio:<10.2f}x {mbps:.1f} MB/s (aggregate) {_regime(mbps)}")
     
     # Recommendation
     print(f"\n💡 RECOMMENDATION:")
@@ -198,10 +515,25 @@ def benchmark_column(csv_file: Path, column: str, max_rows: int = 100000):
     elif unique_count < 1000:
         print(f"   Use DICTIONARY + RLE encoding")
     else:
+        # zstd trades a little decode speed for a much better ratio, which
+        # wins when the data comes off disk; LZ4 wins once it's in memory
+        if HAS_ZSTD:
+            print(f"   Cold-cache reads: use ZSTD compression "
+                  f"(ratio {len(raw_data) / zstd_bytes:.2f}x, {zstd_decomp_throughput:.0f} MB/s decomp)")
         if HAS_LZ4:
-            print(f"   Use LZ4 compression (fast decompression: {decomp_throughput:.0f} MB/s)")
+            print(f"   Hot-cache reads: use LZ4 compression (fast decompression: {lz4_decomp_throughput:.0f} MB/s)")
+        if not HAS_ZSTD and not HAS_LZ4:
+            print(f"   Use {ZLIB_IMPL} compression or install zstandard/LZ4 for better performance")
+    
+    # Which rung helps next depends on what limits the fastest decoder
+    if _PEAK_BW:
+        best_decode = lz4_decomp_throughput if HAS_LZ4 else decomp_throughput
+        if best_decode < COMPUTE_BOUND_FRACTION * _PEAK_BW:
+            print(f"   Regime: compute-bound ({best_decode:.0f} of {_PEAK_BW:.0f} MB/s) - "
+                  f"prefer the lightest codec (LZ4) over heavier compression")
         else:
-            print(f"   Use Zlib compression or install LZ4 for better performance")
+            print(f"   Regime: memory-bound ({best_decode:.0f} of {_PEAK_BW:.0f} MB/s) - "
+                  f"shrink the bytes: DICTIONARY + bit-packed codes")
 
 
 def main():
@@ -215,6 +547,8 @@ def main():
                        help='Columns to benchmark')
     parser.add_argument('--max-rows', type=int, default=100000,
                        help='Maximum rows to sample')
+    parser.add_argument('--bandwidth-mb', type=int, default=256,
+                       help='Buffer size (MB) for the peak memory bandwidth probe (0 to skip)')
     
     args = parser.parse_args()
     
@@ -230,6 +564,12 @@ def main():
     print(f"Sample size: {args.max_rows:,} rows")
     print(f"Columns: {', '.join(args.columns)}")
     
+    global _PEAK_BW
+    if args.bandwidth_mb > 0:
+        _PEAK_BW = measure_peak_bandwidth(args.bandwidth_mb)
+        print(f"Peak memory bandwidth: {_PEAK_BW:,.0f} MB/s "
+              f"(< {COMPUTE_BOUND_FRACTION:.0%} of it = compute-bound)")
+    
     for column in args.columns:
         try:
             benchmark_column(data_file, column, args.max_rows)
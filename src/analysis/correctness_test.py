@@ -12,6 +12,18 @@ from pathlib import Path
 import duckdb
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+
+# One in-memory DuckDB connection shared by every test (connection setup
+# dominates these tiny queries)
+_CONN = duckdb.connect()
+
+
+def _register_test_data(df: pd.DataFrame) -> duckdb.DuckDBPyConnection:
+    """Expose df as the test_data view on the shared connection."""
+    _CONN.unregister('test_data')
+    _CONN.register('test_data', df)
+    return _CONN
 
 
 def test_avg_with_nulls():
@@ -30,8 +42,7 @@ def test_avg_with_nulls():
     print(test_data)
     
     # DuckDB computation
-    conn = duckdb.connect()
-    conn.register('test_data', test_data)
+    conn = _register_test_data(test_data)
     result_duckdb = conn.execute("""
         SELECT country, AVG(value) as avg_value
         FROM test_data
@@ -42,18 +53,17 @@ def test_avg_with_nulls():
     print("\n✅ DuckDB result:")
     print(result_duckdb)
     
-    # Our manual computation (what we'd implement)
+    # Our manual computation (what we'd implement): one hash aggregation,
+    # which skips NULLs and yields NULL for an all-NULL group
     def manual_avg(df):
-        result = []
-        for country in df['country'].unique():
-            subset = df[df['country'] == country]
-            values = subset['value'].dropna()  # Remove NULLs
-            if len(values) > 0:
-                avg = values.sum() / len(values)
-            else:
-                avg = None
-            result.append({'country': country, 'avg_value': avg})
-        return pd.DataFrame(result).sort_values('country')
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        result = (
+            table.group_by('country')
+                 .aggregate([('value', 'mean')])
+                 .rename_columns(['country', 'avg_value'])
+                 .to_pandas()
+        )
+        return result.sort_values('country')
     
     result_manual = manual_avg(test_data)
     
@@ -79,11 +89,10 @@ def test_avg_with_nulls():
     print(f"\nJP average:")
     print(f"  DuckDB: {duckdb_jp}")
     print(f"  Manual: {manual_jp}")
-    print(f"  Match: {np.isnan(duckdb_jp) and np.isnan(manual_jp)}")
-    
     # Verdict
     us_match = abs(duckdb_us - manual_us) < 1e-9
     jp_match = (np.isnan(duckdb_jp) and np.isnan(manual_jp)) or abs(duckdb_jp - manual_jp) < 1e-9
+    print(f"  Match: {jp_match}")
     
     if us_match and jp_match:
         print("\n✅ PASS: AVG with NULLs computed correctly")
@@ -108,8 +117,7 @@ def test_sum_with_nulls():
     print(test_data)
     
     # DuckDB
-    conn = duckdb.connect()
-    conn.register('test_data', test_data)
+    conn = _register_test_data(test_data)
     result_duckdb = conn.execute("""
         SELECT type, SUM(bid_price) as total_bid
         FROM test_data
@@ -120,10 +128,15 @@ def test_sum_with_nulls():
     print("\n✅ DuckDB result:")
     print(result_duckdb)
     
-    # Manual
-    result_manual = test_data.groupby('type')['bid_price'].sum().reset_index()
-    result_manual.columns = ['type', 'total_bid']
-    result_manual = result_manual.sort_values('type')
+    # Manual: Arrow's sum keeps NULL for an all-NULL group (pandas gives 0)
+    result_manual = (
+        pa.Table.from_pandas(test_data, preserve_index=False)
+          .group_by('type')
+          .aggregate([('bid_price', 'sum')])
+          .rename_columns(['type', 'total_bid'])
+          .to_pandas()
+          .sort_values('type')
+    )
     
     print("\n✅ Our manual result:")
     print(result_manual)
@@ -144,15 +157,15 @@ def test_sum_with_nulls():
     print(f"  DuckDB: {click_duck}")
     print(f"  Manual: {click_manual}")
     
-    # DuckDB returns NULL for all-NULL sum, pandas returns 0
-    # We need to handle this!
-    if pd.isna(click_duck):
-        print(f"  ⚠️  DuckDB returns NULL, pandas returns 0")
-        print(f"  We must explicitly handle all-NULL case!")
-        return False
-    
+    # DuckDB returns NULL for an all-NULL sum; so must we (not 0)
     impression_match = abs(impression_duck - impression_manual) < 1e-9
-    click_match = abs(click_duck - click_manual) < 1e-9
+    if pd.isna(click_duck) or pd.isna(click_manual):
+        click_match = pd.isna(click_duck) and pd.isna(click_manual)
+        if not click_match:
+            print(f"  ⚠️  DuckDB returns NULL, manual returns {click_manual}")
+            print(f"  We must explicitly handle all-NULL case!")
+    else:
+        click_match = abs(click_duck - click_manual) < 1e-9
     
     if impression_match and click_match:
         print("\n✅ PASS: SUM with NULLs computed correctly")
@@ -177,8 +190,7 @@ def test_count_star():
     print(test_data)
     
     # DuckDB
-    conn = duckdb.connect()
-    conn.register('test_data', test_data)
+    conn = _register_test_data(test_data)
     result_duckdb = conn.execute("""
         SELECT 
             COUNT(*) as count_star,
@@ -227,8 +239,7 @@ def test_empty_groups():
     print(test_data)
     
     # DuckDB - query for purchase events that don't exist
-    conn = duckdb.connect()
-    conn.register('test_data', test_data)
+    conn = _register_test_data(test_data)
     result_duckdb = conn.execute("""
         SELECT type, SUM(bid_price) as total
         FROM test_data
@@ -275,8 +286,7 @@ def test_float_precision():
     print(test_data)
     
     # DuckDB
-    conn = duckdb.connect()
-    conn.register('test_data', test_data)
+    conn = _register_test_data(test_data)
     result_duckdb = conn.execute("""
         SELECT SUM(bid_price) as total
         FROM test_data
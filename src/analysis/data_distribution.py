@@ -10,17 +10,607 @@ Analyzes actual data distribution to estimate:
 This helps us accurately project storage sizes and query performance.
 """
 
-import csv
+import calendar
+import hashlib
+from bisect import bisect_left, bisect_right
+import os
 import sys
+import time
 from pathlib import Path
 from collections import Counter, defaultdict
-from datetime import datetime
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 import json
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
-def analyze_full_dataset(data_dir: Path, sample_ratio: float = 0.1):
-    """Analyze the full dataset (or a sample of it)"""
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    from tqdm import tqdm
+    HAS_TQDM = True
+except ImportError:
+    HAS_TQDM = False
+
+# orjson parses query files several times faster; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# ts is parsed as an integer; every other column stays a string so empty
+# fields can be counted as NULLs the same way for all columns. auction_id,
+# user_id and the price columns only feed the NULL report.
+ANALYSIS_COLUMN_TYPES = {
+    'ts': pa.int64(),
+    'type': pa.string(),
+    'auction_id': pa.string(),
+    'advertiser_id': pa.string(),
+    'publisher_id': pa.string(),
+    'bid_price': pa.string(),
+    'user_id': pa.string(),
+    'total_price': pa.string(),
+    'country': pa.string(),
+}
+CSV_BLOCK_SIZE = 64 << 20
+
+# Byte-range size used when sampling within files
+SAMPLE_BLOCK_SIZE = 4 << 20
+
+# Local UTC offsets only change at DST/zone transitions, which fall on
+# 15-minute UTC boundaries, so one lookup per 15-minute bucket is exact
+OFFSET_BUCKET_MS = 15 * 60 * 1000
+_BUCKET_OFFSETS_MS: Dict[int, int] = {}
+
+# datetime64 unit → milliseconds per unit
+_UNIT_MS = {'D': 86_400_000, 'h': 3_600_000}
+
+
+def _local_offsets_ms(ts: pa.Array) -> pa.Array:
+    """
+    Local UTC offset (ms) for each epoch-ms timestamp.
+    
+    The offset is computed with time.localtime once per distinct
+    15-minute bucket (cached across batches/files), then gathered back to
+    rows with a take.
+    """
+    buckets = pc.divide(ts, OFFSET_BUCKET_MS).dictionary_encode()
+    offsets = []
+    for bucket in buckets.dictionary.to_pylist():
+        offset = _BUCKET_OFFSETS_MS.get(bucket)
+        if offset is None:
+            t = bucket * OFFSET_BUCKET_MS // 1000
+            offset = (calendar.timegm(time.localtime(t)) - t) * 1000
+            _BUCKET_OFFSETS_MS[bucket] = offset
+        offsets.append(offset)
+    
+    return pc.take(pa.array(offsets, pa.int64()), buckets.indices)
+
+
+def _epoch_labels(local_ms: pa.Array, unit: str) -> pa.Array:
+    """
+    ISO labels ('YYYY-MM-DD' / 'YYYY-MM-DDTHH') for local epoch-ms values.
+    
+    Values are truncated to the unit with one integer divide, formatted
+    once per distinct value with NumPy's datetime64 and gathered back.
+    """
+    ids = pc.divide(local_ms, _UNIT_MS[unit]).dictionary_encode()
+    unique = ids.dictionary.to_numpy().astype(f'datetime64[{unit}]')
+    labels = np.datetime_as_string(unique, unit=unit)
+    return pc.take(pa.array(labels), ids.indices)
+
+
+def _time_labels(ts: pa.Array) -> Tuple[pa.Array, pa.Array]:
+    """
+    Local-time day and hour labels for an array of epoch-ms timestamps.
+    
+    Matches datetime.fromtimestamp(...).strftime() without a Python call
+    per row: timestamps are shifted to local time, then truncated and
+    formatted with datetime64 arithmetic. NULL timestamps give NULL labels.
+    
+    Args:
+        ts: int64 epoch-millisecond timestamps
+    
+    Returns:
+        (day labels 'YYYY-MM-DD', hour labels 'YYYY-MM-DD HH:00')
+    """
+    local_ms = pc.add(ts, _local_offsets_ms(ts))
+    days = _epoch_labels(local_ms, 'D')
+    hours = _epoch_labels(local_ms, 'h')
+    hours = pc.binary_join_element_wise(pc.replace_substring(hours, 'T', ' '), ':00', '')
+    return days, hours
+
+
+# Largest combined key space counted into a dense array; beyond this the
+# distinct combined codes are counted with a sort instead
+DENSE_COUNT_LIMIT = 1 << 22
+
+
+if HAS_NUMBA:
+    @numba.njit(cache=True, parallel=True)
+    def _count_codes_kernel(codes, n_codes):
+        n_threads = numba.get_num_threads()
+        per_thread = (len(codes) + n_threads - 1) // n_threads
+        partial = np.zeros((n_threads, n_codes), dtype=np.int64)
+        for t in numba.prange(n_threads):
+            for i in range(t * per_thread, min(len(codes), (t + 1) * per_thread)):
+                partial[t, codes[i]] += 1
+        return partial.sum(axis=0)
+
+
+def count_codes(codes: np.ndarray, n_codes: int) -> np.ndarray:
+    """
+    Dense histogram of integer codes in [0, n_codes).
+    
+    Compiled with Numba when installed (thread-local partial counts,
+    reduced at the end), otherwise np.bincount.
+    
+    Args:
+        codes: int64 codes
+        n_codes: Size of the code space
+    
+    Returns:
+        int64 count per code
+    """
+    if HAS_NUMBA:
+        return _count_codes_kernel(codes, n_codes)
+    return np.bincount(codes, minlength=n_codes)
+
+
+def _add_histogram(counter: Counter, values: pa.Array, mask=None):
+    """
+    Add a value histogram of one column (optionally filtered) into a Counter.
+    
+    The column is dictionary-encoded and its codes are counted into a
+    dense array with count_codes; only non-zero codes are decoded.
+    """
+    if mask is not None:
+        values = values.filter(mask)
+    if len(values) == 0:
+        return
+    
+    encoded = pc.dictionary_encode(values, null_encoding='encode')
+    counts = count_codes(encoded.indices.to_numpy().astype(np.int64), len(encoded.dictionary))
+    present = np.flatnonzero(counts)
+    keys = encoded.dictionary.take(pa.array(present)).to_pylist()
+    counter.update(dict(zip(keys, counts[present].tolist())))
+
+
+# Bits per key code in a packed composite key (3 keys fit in an int64)
+KEY_BITS = 21
+
+
+class PackedCounter:
+    """
+    Counter over composite keys, stored as packed int64 codes.
+    
+    Each key column gets its own value → dense code vocabulary (assigned
+    on first sight); a key tuple is packed as code_0 << 2*KEY_BITS |
+    code_1 << KEY_BITS | code_2, so merging a batch hashes one int per
+    combination instead of a tuple of strings. Tuples are only rebuilt
+    once, by to_counter().
+    """
+    
+    def __init__(self, keys: List[str]):
+        self.keys = keys
+        self.vocab: List[Dict] = [{} for _ in keys]
+        self.counts = Counter()
+    
+    def _global_codes(self, i: int, dictionary: pa.Array) -> np.ndarray:
+        """Map a batch's dictionary for key i onto this counter's codes."""
+        vocab = self.vocab[i]
+        codes = [vocab.setdefault(value, len(vocab)) for value in dictionary.to_pylist()]
+        if len(vocab) > 1 << KEY_BITS:
+            raise ValueError(f"More than {1 << KEY_BITS:,} distinct values of {self.keys[i]}")
+        return np.array(codes, dtype=np.int64)
+    
+    def add(self, table: pa.Table, mask=None):
+        """
+        Add per-combination row counts of table (optionally filtered).
+        
+        Each key column is dictionary-encoded and the codes are combined into
+        one mixed-radix int64 code per row, which is counted with count_codes;
+        only the non-zero combinations are mapped onto packed keys.
+        """
+        if mask is not None:
+            table = table.filter(mask)
+        if table.num_rows == 0:
+            return
+        
+        # NULL keys become a dictionary entry of their own, as in group_by
+        encoded = [
+            pc.dictionary_encode(table.column(k).combine_chunks(), null_encoding='encode')
+            for k in self.keys
+        ]
+        dims = tuple(len(e.dictionary) for e in encoded)
+        combined = np.ravel_multi_index(
+            [e.indices.to_numpy().astype(np.int64) for e in encoded], dims
+        )
+        
+        n_codes = int(np.prod(dims))
+        if n_codes <= DENSE_COUNT_LIMIT:
+            counts = count_codes(combined, n_codes)
+            present = np.flatnonzero(counts)
+            counts = counts[present]
+        else:
+            present, counts = np.unique(combined, return_counts=True)
+        
+        packed = np.zeros(len(present), dtype=np.int64)
+        for i, (e, idx) in enumerate(zip(encoded, np.unravel_index(present, dims))):
+            packed = (packed << KEY_BITS) | self._global_codes(i, e.dictionary)[idx]
+        self.counts.update(dict(zip(packed.tolist(), counts.tolist())))
+    
+    def to_counter(self) -> Counter:
+        """Counts keyed by value tuples, like a plain tuple-keyed Counter."""
+        values = [list(vocab) for vocab in self.vocab]
+        mask = (1 << KEY_BITS) - 1
+        
+        counter = Counter()
+        for packed, count in self.counts.items():
+            key = []
+            for i in reversed(range(len(values))):
+                key.append(values[i][packed & mask])
+                packed >>= KEY_BITS
+            counter[tuple(reversed(key))] = count
+        return counter
+    
+    def to_table(self) -> pa.Table:
+        """Counts as an Arrow table: one column per key, plus 'count'."""
+        packed = np.fromiter(self.counts.keys(), dtype=np.int64, count=len(self.counts))
+        mask = (1 << KEY_BITS) - 1
+        
+        columns = {}
+        for i, key in enumerate(self.keys):
+            shift = KEY_BITS * (len(self.keys) - 1 - i)
+            codes = (packed >> shift) & mask
+            columns[key] = pa.array(list(self.vocab[i]), pa.string()).take(pa.array(codes))
+        columns['count'] = pa.array(list(self.counts.values()), pa.int64())
+        return pa.table(columns)
+
+
+def sample_ranges(file_size: int, data_start: int, sample_ratio: float) -> List[Tuple[int, int]]:
+    """
+    Byte ranges to read when sampling a CSV file.
+    
+    The data (after the header) is cut into SAMPLE_BLOCK_SIZE blocks and
+    every round(1 / sample_ratio)-th block is kept, so rows are sampled
+    evenly through every file instead of reading a few whole files.
+    
+    Args:
+        file_size: Size of the file in bytes
+        data_start: Offset of the first data row (header length)
+        sample_ratio: Fraction of the data to read (>= 1.0 reads everything)
+    
+    Returns:
+        (start, length) byte ranges
+    """
+    if sample_ratio >= 1.0:
+        return [(data_start, file_size - data_start)]
+    
+    step = max(1, round(1 / sample_ratio)) * SAMPLE_BLOCK_SIZE
+    return [
+        (start, min(SAMPLE_BLOCK_SIZE, file_size - start))
+        for start in range(data_start, file_size, step)
+    ]
+
+
+def _csv_batches(csv_file: Path, sample_ratio: float, convert_options: pacsv.ConvertOptions):
+    """
+    Stream the (sampled) rows of a CSV file as Arrow record batches.
+    
+    Unsampled files are streamed with open_csv. Sampled ranges are aligned
+    to whole lines (the partial line at the start of a range is skipped,
+    the one at its end is completed) and parsed with the file's header.
+    
+    Yields:
+        (record batch, data bytes covered by the batch's range); the
+        first item of a sampled file is (None, total data bytes)
+    """
+    if sample_ratio >= 1.0:
+        read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+        reader = pacsv.open_csv(csv_file, read_options=read_options, convert_options=convert_options)
+        for batch in reader:
+            yield batch, 0
+        return
+    
+    with open(csv_file, 'rb') as f:
+        header = f.readline()
+        read_options = pacsv.ReadOptions(column_names=header.decode().strip().split(','))
+        file_size = os.fstat(f.fileno()).st_size
+        yield None, file_size - len(header)
+        
+        for start, length in sample_ranges(file_size, len(header), sample_ratio):
+            # A range owns the lines that start inside it. Back up one byte
+            # so a range starting on a line boundary keeps its first line,
+            # then read on to the end of the line holding its last byte.
+            end = start + length
+            f.seek(start - 1)
+            f.readline()
+            if f.tell() >= end:
+                continue
+            data = f.read(end - 1 - f.tell()) + f.readline()
+            
+            table = pacsv.read_csv(pa.BufferReader(data), read_options=read_options,
+                                   convert_options=convert_options)
+            batches = table.to_batches()
+            for j, batch in enumerate(batches):
+                yield batch, length if j == 0 else 0
+
+
+# Distribution Counters produced per file and merged across files
+COUNTER_NAMES = [
+    'type_counts',
+    'country_counts',
+    'day_counts',
+    'hour_counts',
+    # Combinations for pre-agg estimation
+    'day_type_counts',
+    'day_advertiser_type_counts',
+    'day_publisher_type_counts',
+    'advertiser_type_counts',
+    'country_type_counts',
+]
+
+# Composite distributions → their key columns (counted with PackedCounter)
+COMPOSITE_KEYS = {
+    'day_type_counts': ['day', 'type'],
+    'day_advertiser_type_counts': ['day', 'advertiser_id', 'type'],
+    'day_publisher_type_counts': ['day', 'publisher_id', 'type'],
+    'advertiser_type_counts': ['advertiser_id', 'type'],
+    'country_type_counts': ['country', 'type'],
+}
+
+# Sparse triple-key distributions (up to one row per day x id x type) are
+# kept as Arrow tables rather than tuple-keyed Counters
+TABLE_COUNTS = {'day_advertiser_type_counts', 'day_publisher_type_counts'}
+
+
+def merge_count_tables(tables: List[pa.Table], keys: List[str]) -> pa.Table:
+    """
+    Merge per-file count tables into one, summing counts per key.
+    
+    Args:
+        tables: Tables with the key columns plus 'count'
+        keys: Key column names
+    
+    Returns:
+        Merged table sorted by key
+    """
+    merged = pa.concat_tables(tables).group_by(keys).aggregate([('count', 'sum')])
+    merged = merged.rename_columns(keys + ['count'])
+    return merged.sort_by([(k, 'ascending') for k in keys])
+
+
+def process_file(csv_file: Path, sample_ratio: float = 1.0) -> Dict:
+    """
+    Collect the distribution statistics of one CSV file.
+    
+    The file is streamed as Arrow record batches and every distribution is
+    counted with vectorized kernels. Self-contained (module-level, picklable
+    arguments) so files can be processed in worker processes.
+    
+    Args:
+        csv_file: CSV file to analyze
+        sample_ratio: Fraction of the file's rows to read (see sample_ranges)
+    
+    Returns:
+        Dict with 'rows', 'bytes_sampled'/'bytes_total' (data bytes read /
+        in the file, when sampling), 'null_counts' and one Counter per
+        COUNTER_NAMES (an Arrow count table for TABLE_COUNTS)
+    """
+    counters = {name: Counter() for name in COUNTER_NAMES if name not in COMPOSITE_KEYS}
+    packed = {name: PackedCounter(keys) for name, keys in COMPOSITE_KEYS.items()}
+    null_counts = Counter()
+    file_rows = 0
+    bytes_sampled = 0
+    bytes_total = 0
+    
+    convert_options = pacsv.ConvertOptions(
+        column_types=ANALYSIS_COLUMN_TYPES,
+        include_columns=list(ANALYSIS_COLUMN_TYPES),
+        # Everything but ts stays a (possibly empty) string
+        strings_can_be_null=False,
+    )
+    
+    for batch, batch_bytes in _csv_batches(csv_file, sample_ratio, convert_options):
+        if batch is None:
+            bytes_total = batch_bytes
+            continue
+        file_rows += batch.num_rows
+        bytes_sampled += batch_bytes
+        
+        # Track NULLs (empty fields; unparseable-as-empty ts is NULL)
+        for name, col in zip(batch.schema.names, batch.columns):
+            nulls = col.null_count
+            if pa.types.is_string(col.type):
+                nulls += pc.sum(pc.equal(col, '')).as_py() or 0
+            null_counts[name] += nulls
+        
+        event_type = batch.column('type')
+        country = batch.column('country')
+        advertiser_id = batch.column('advertiser_id')
+        publisher_id = batch.column('publisher_id')
+        day, hour = _time_labels(batch.column('ts'))
+        
+        table = pa.table({
+            'day': day, 'hour': hour, 'type': event_type, 'country': country,
+            'advertiser_id': advertiser_id, 'publisher_id': publisher_id,
+        })
+        has_ts = pc.is_valid(day)
+        has_type = pc.not_equal(event_type, '')
+        has_country = pc.not_equal(country, '')
+        has_advertiser = pc.not_equal(advertiser_id, '')
+        has_publisher = pc.not_equal(publisher_id, '')
+        
+        # Time distributions and combinations
+        _add_histogram(counters['day_counts'], day, has_ts)
+        _add_histogram(counters['hour_counts'], hour, has_ts)
+        packed['day_type_counts'].add(table, has_ts)
+        packed['day_advertiser_type_counts'].add(table, pc.and_(has_ts, has_advertiser))
+        packed['day_publisher_type_counts'].add(table, pc.and_(has_ts, has_publisher))
+        
+        # Simple counts
+        _add_histogram(counters['type_counts'], event_type, has_type)
+        _add_histogram(counters['country_counts'], country, has_country)
+        packed['advertiser_type_counts'].add(table, pc.and_(has_advertiser, has_type))
+        packed['country_type_counts'].add(table, pc.and_(has_country, has_type))
+    
+    for name, counter in packed.items():
+        counters[name] = counter.to_table() if name in TABLE_COUNTS else counter.to_counter()
+    
+    return {
+        'rows': file_rows,
+        'bytes_sampled': bytes_sampled,
+        'bytes_total': bytes_total,
+        'null_counts': null_counts,
+        **counters,
+    }
+
+
+# Per-file results are cached as one long-format table: a row per
+# (distribution name, key parts k0..k2) with its count. Scalars
+# (rows, bytes_*) are rows with no key parts.
+CACHE_KEY_COLUMNS = ['k0', 'k1', 'k2']
+CACHE_SCALARS = ['rows', 'bytes_sampled', 'bytes_total']
+
+# Default cache location: repo-local (not inside the dataset, which may
+# be a read-only mount)
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / 'cache' / 'data_distribution'
+
+
+def _cache_path(cache_dir: Path, csv_file: Path, sample_ratio: float) -> Path:
+    """Cache file for a CSV, keyed by its identity, the sampling setup and the columns read."""
+    st = csv_file.stat()
+    columns = ",".join(ANALYSIS_COLUMN_TYPES)
+    ident = f"{csv_file.resolve()}|{st.st_mtime_ns}|{st.st_size}|{sample_ratio}|{SAMPLE_BLOCK_SIZE}|{columns}"
+    return cache_dir / f"{csv_file.stem}-{hashlib.sha1(ident.encode()).hexdigest()[:16]}.parquet"
+
+
+def _result_to_table(result: Dict) -> pa.Table:
+    """Flatten a process_file result into the long-format cache table."""
+    names, keys, counts = [], [[], [], []], []
+    
+    def add(name, key_parts, count):
+        names.append(name)
+        for i in range(3):
+            keys[i].append(key_parts[i] if i < len(key_parts) else None)
+        counts.append(count)
+    
+    for name in CACHE_SCALARS:
+        add(name, (), result[name])
+    for col, count in result['null_counts'].items():
+        add('null_counts', (col,), count)
+    for name in COUNTER_NAMES:
+        value = result[name]
+        if name in TABLE_COUNTS:
+            rows = zip(*[value[k].to_pylist() for k in COMPOSITE_KEYS[name]])
+            counts_ = value['count'].to_pylist()
+        else:
+            rows = (k if name in COMPOSITE_KEYS else (k,) for k in value)
+            counts_ = value.values()
+        for key_parts, count in zip(rows, counts_):
+            add(name, key_parts, count)
+    
+    return pa.table({
+        'name': pa.array(names, pa.string()),
+        **{c: pa.array(k, pa.string()) for c, k in zip(CACHE_KEY_COLUMNS, keys)},
+        'count': pa.array(counts, pa.int64()),
+    })
+
+
+def _result_from_table(table: pa.Table) -> Dict:
+    """Rebuild a process_file result from its cache table."""
+    result = {}
+    for name in CACHE_SCALARS + ['null_counts'] + COUNTER_NAMES:
+        part = table.filter(pc.equal(table['name'], name))
+        n_keys = len(COMPOSITE_KEYS.get(name, [name]))
+        columns = [part[c].to_pylist() for c in CACHE_KEY_COLUMNS[:n_keys]]
+        counts = part['count'].to_pylist()
+        
+        if name in CACHE_SCALARS:
+            result[name] = counts[0] if counts else 0
+        elif name in TABLE_COUNTS:
+            result[name] = pa.table({
+                **{k: pa.array(col, pa.string()) for k, col in zip(COMPOSITE_KEYS[name], columns)},
+                'count': pa.array(counts, pa.int64()),
+            })
+        elif name in COMPOSITE_KEYS:
+            result[name] = Counter(dict(zip(zip(*columns), counts)))
+        else:
+            result[name] = Counter(dict(zip(columns[0], counts)))
+    return result
+
+
+def cached_process_file(csv_file: Path, sample_ratio: float = 1.0,
+                        cache_dir: Optional[Path] = None) -> Dict:
+    """
+    process_file with an on-disk Parquet cache of its result.
+    
+    The cache entry is keyed by path, mtime, size and sampling settings,
+    so edited/replaced files are re-parsed. Entries are written to a temp
+    file and renamed, so concurrent workers never see a partial file. A
+    cache that cannot be written (OSError) just behaves as a miss.
+    
+    Args:
+        csv_file: CSV file to analyze
+        sample_ratio: Fraction of the file's rows to read
+        cache_dir: Cache directory (None disables caching)
+    
+    Returns:
+        Same dict as process_file
+    """
+    if cache_dir is None:
+        return process_file(csv_file, sample_ratio)
+    
+    cache_path = _cache_path(cache_dir, csv_file, sample_ratio)
+    if cache_path.exists():
+        return _result_from_table(pq.read_table(cache_path))
+    
+    result = process_file(csv_file, sample_ratio)
+    tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        pq.write_table(_result_to_table(result), tmp_path, compression='zstd')
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Unwritable cache (read-only or full disk): keep the result uncached
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+    return result
+
+
+def analyze_full_dataset(data_dir: Path, sample_ratio: float = 0.1, workers: Optional[int] = None,
+                         cache_dir: Optional[Path] = None):
+    """
+    Analyze the full dataset (or a sample of it).
+    
+    Files are independent, so they are processed in parallel worker
+    processes (see process_file) and their Counters merged here. When
+    sampling, every file is read at the same rate (see sample_ranges) and
+    counts are extrapolated by the fraction of bytes actually read.
+    
+    Args:
+        data_dir: Directory containing CSV files
+        sample_ratio: Fraction of each file to analyze (counts are extrapolated)
+        workers: Worker processes (default: CPU count; 1 = in-process)
+        cache_dir: Per-file result cache (see cached_process_file; None = off)
+    
+    Returns:
+        Statistics dictionary, or None if no CSV files were found
+    """
     
     print(f"\nAnalyzing data from {data_dir}...")
     
@@ -31,112 +621,93 @@ def analyze_full_dataset(data_dir: Path, sample_ratio: float = 0.1):
     
     print(f"Found {len(csv_files)} CSV files")
     
-    # Sample files if needed
-    if sample_ratio < 1.0:
-        import random
-        sample_count = max(1, int(len(csv_files) * sample_ratio))
-        csv_files = random.sample(csv_files, sample_count)
-        print(f"Sampling {len(csv_files)} files ({sample_ratio*100:.0f}%)")
+    sampled = sample_ratio < 1.0
+    if sampled:
+        print(f"Sampling ~{sample_ratio*100:.0f}% of each file "
+              f"({SAMPLE_BLOCK_SIZE >> 20}MB byte ranges)")
     
     # Statistics to collect
     total_rows = 0
-    type_counts = Counter()
-    country_counts = Counter()
-    day_counts = Counter()
-    hour_counts = Counter()
-    
-    # Combinations for pre-agg estimation
-    day_type_counts = Counter()
-    day_advertiser_type_counts = Counter()
-    day_publisher_type_counts = Counter()
-    advertiser_type_counts = Counter()
-    country_type_counts = Counter()
+    bytes_sampled = 0
+    bytes_total = 0
+    totals = {name: [] if name in TABLE_COUNTS else Counter() for name in COUNTER_NAMES}
     
     # NULL tracking
     null_counts = defaultdict(int)
     
-    print("\nProcessing files...")
-    for i, csv_file in enumerate(csv_files, 1):
-        print(f"  [{i}/{len(csv_files)}] {csv_file.name}...", end='', flush=True)
-        
-        with open(csv_file, 'r') as f:
-            reader = csv.DictReader(f)
-            
-            file_rows = 0
-            for row in reader:
-                total_rows += 1
-                file_rows += 1
-                
-                # Extract fields
-                ts = row.get('ts', '')
-                event_type = row.get('type', '')
-                country = row.get('country', '')
-                advertiser_id = row.get('advertiser_id', '')
-                publisher_id = row.get('publisher_id', '')
-                bid_price = row.get('bid_price', '')
-                total_price = row.get('total_price', '')
-                
-                # Convert timestamp to day/hour
-                if ts:
-                    try:
-                        dt = datetime.fromtimestamp(int(ts) / 1000)
-                        day = dt.strftime('%Y-%m-%d')
-                        hour = dt.strftime('%Y-%m-%d %H:00')
-                        
-                        day_counts[day] += 1
-                        hour_counts[hour] += 1
-                        
-                        # Combinations
-                        day_type_counts[(day, event_type)] += 1
-                        if advertiser_id:
-                            day_advertiser_type_counts[(day, advertiser_id, event_type)] += 1
-                        if publisher_id:
-                            day_publisher_type_counts[(day, publisher_id, event_type)] += 1
-                    except:
-                        pass
-                
-                # Simple counts
-                if event_type:
-                    type_counts[event_type] += 1
-                if country:
-                    country_counts[country] += 1
-                if advertiser_id and event_type:
-                    advertiser_type_counts[(advertiser_id, event_type)] += 1
-                if country and event_type:
-                    country_type_counts[(country, event_type)] += 1
-                
-                # Track NULLs
-                for col, val in row.items():
-                    if val == '' or val is None:
-                        null_counts[col] += 1
-        
-        print(f" {file_rows:,} rows")
+    if not workers:
+        # CPUs this process may run on (containers, taskset)
+        if hasattr(os, 'sched_getaffinity'):
+            workers = len(os.sched_getaffinity(0))
+        else:
+            workers = os.cpu_count() or 1
+    workers = min(workers, len(csv_files))
+    print(f"\nProcessing files ({workers} worker{'s' if workers != 1 else ''})...")
     
-    # Extrapolate if sampling
-    if sample_ratio < 1.0:
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        run = partial(cached_process_file, sample_ratio=sample_ratio, cache_dir=cache_dir)
+        results = pool.map(run, csv_files) if pool else map(run, csv_files)
+        if HAS_TQDM:
+            # One rate-limited progress bar instead of a line per file
+            results = tqdm(results, total=len(csv_files), desc='files', unit='file')
+        for i, (csv_file, result) in enumerate(zip(csv_files, results), 1):
+            for name in COUNTER_NAMES:
+                if name in TABLE_COUNTS:
+                    totals[name].append(result[name])
+                else:
+                    totals[name].update(result[name])
+            for col, nulls in result['null_counts'].items():
+                null_counts[col] += nulls
+            total_rows += result['rows']
+            bytes_sampled += result['bytes_sampled']
+            bytes_total += result['bytes_total']
+            if not HAS_TQDM:
+                print(f"  [{i}/{len(csv_files)}] {csv_file.name}... {result['rows']:,} rows")
+    finally:
+        if pool:
+            pool.shutdown()
+    
+    for name in TABLE_COUNTS:
+        totals[name] = merge_count_tables(totals[name], COMPOSITE_KEYS[name])
+    
+    # Extrapolate if sampling (by the fraction of data actually read)
+    if sampled:
+        sample_ratio = max(bytes_sampled, 1) / max(bytes_total, 1)
         scale_factor = 1.0 / sample_ratio
         total_rows = int(total_rows * scale_factor)
-        print(f"\n📊 Extrapolated total rows: ~{total_rows:,}")
+        print(f"\n📊 Read {sample_ratio*100:.1f}% of the data")
+        print(f"📊 Extrapolated total rows: ~{total_rows:,}")
     else:
         print(f"\n📊 Total rows: {total_rows:,}")
     
     return {
         'total_rows': total_rows,
-        'type_counts': type_counts,
-        'country_counts': country_counts,
-        'day_counts': day_counts,
-        'hour_counts': hour_counts,
-        'day_type_counts': day_type_counts,
-        'day_advertiser_type_counts': day_advertiser_type_counts,
-        'day_publisher_type_counts': day_publisher_type_counts,
-        'advertiser_type_counts': advertiser_type_counts,
-        'country_type_counts': country_type_counts,
+        **totals,
         'null_counts': null_counts,
-        'sampled': sample_ratio < 1.0,
+        'sampled': sampled,
         'sample_ratio': sample_ratio
     }
 
 
+def day_range_count(sorted_days: List[str], prefix: np.ndarray, start_day: str, end_day: str) -> int:
+    """
+    Rows whose day falls in [start_day, end_day], by binary search.
+    
+    Args:
+        sorted_days: Sorted day labels
+        prefix: prefix[i] = total count of sorted_days[:i] (length D + 1)
+        start_day: First day of the range (inclusive)
+        end_day: Last day of the range (inclusive)
+    
+    Returns:
+        Row count in the range
+    """
+    lo = bisect_left(sorted_days, start_day)
+    hi = bisect_right(sorted_days, end_day)
+    return int(prefix[hi] - prefix[lo]) if hi > lo else 0
+
+
 def estimate_query_performance(stats: Dict, queries_dir: Path):
     """Estimate query performance based on data distribution"""
     
@@ -149,9 +720,14 @@ def estimate_query_performance(stats: Dict, queries_dir: Path):
         print("No query files found")
         return
     
+    # Day histogram as sorted keys + prefix sums, for O(log D) range counts
+    sorted_days = sorted(stats['day_counts'])
+    day_prefix = np.concatenate(
+        [[0], np.cumsum([stats['day_counts'][d] for d in sorted_days], dtype=np.int64)]
+    )
+    
     for qf in query_files:
-        with open(qf, 'r') as f:
-            query = json.load(f)
+        query = _json_loads(qf.read_bytes())
         
         print(f"\n📊 Query: {qf.stem}")
         print(f"   {json.dumps(query, indent=4)}")
@@ -184,11 +760,8 @@ def estimate_query_performance(stats: Dict, queries_dir: Path):
             
             elif col == 'day' and op == 'between':
                 # Estimate based on date range
-                days_in_range = 0
                 start_day, end_day = val
-                for day in stats['day_counts']:
-                    if start_day <= day <= end_day:
-                        days_in_range += stats['day_counts'][day]
+                days_in_range = day_range_count(sorted_days, day_prefix, start_day, end_day)
                 if stats['sampled']:
                     days_in_range = int(days_in_range / stats['sample_ratio'])
                 selectivity = days_in_range / total_rows if total_rows > 0 else 0
@@ -271,7 +844,13 @@ def main():
     parser.add_argument('--queries-dir', default='queries',
                        help='Directory containing query JSON files')
     parser.add_argument('--sample-ratio', type=float, default=0.2,
-                       help='Ratio of files to sample (0.0-1.0, default 0.2 = 20%%)')
+                       help='Ratio of each file to sample (0.0-1.0, default 0.2 = 20%%)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for parsing files (default: CPU count)')
+    parser.add_argument('--cache-dir', default=None,
+                       help=f'Per-file result cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-parse every file instead of using/writing the cache')
     
     args = parser.parse_args()
     
@@ -287,7 +866,9 @@ def main():
     print("=" * 80)
     
     # Analyze data
-    stats = analyze_full_dataset(data_dir, sample_ratio=args.sample_ratio)
+    cache_dir = None if args.no_cache else Path(args.cache_dir or DEFAULT_CACHE_DIR)
+    stats = analyze_full_dataset(data_dir, sample_ratio=args.sample_ratio, workers=args.workers,
+                                 cache_dir=cache_dir)
     
     if stats:
         # Print summary
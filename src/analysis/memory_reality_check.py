@@ -16,11 +16,18 @@ import sys
 import os
 import psutil
 import gc
+import mmap
 from pathlib import Path
 from collections import defaultdict
-import csv
 import time
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+# Pre-agg time bucket (local UTC offsets only change on 15-minute boundaries)
+PREAGG_BUCKET_MS = 15 * 60 * 1000
+
 
 def get_memory_mb():
     """Get current RSS memory in MB"""
@@ -39,6 +46,20 @@ def get_system_memory_info():
     }
 
 
+def committed_buffer(nbytes: int):
+    """
+    Allocate nbytes and make every page resident.
+    
+    np.empty skips the zero-fill memset; writing one byte per page then
+    faults in exactly the pages RSS should count (large np.zeros arrays
+    are lazily mapped, so sparse touches would leave most uncommitted).
+    """
+    import numpy as np
+    buf = np.empty(nbytes, dtype=np.uint8)
+    buf[::mmap.PAGESIZE] = 1
+    return buf
+
+
 def test_baseline_memory():
     """Test 1: Baseline Python + imports memory"""
     print("\n" + "="*80)
@@ -80,25 +101,34 @@ def test_dictionary_memory(data_dir: Path, sample_size: int = 500000):
     
     print(f"Loading dictionaries from {csv_files[0].name} ({sample_size:,} rows)...")
     
-    with open(csv_files[0], 'r') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader):
-            if i >= sample_size:
-                break
-            
-            for col in columns:
-                if col not in dictionaries:
-                    dictionaries[col] = set()
-                val = row.get(col, '')
-                if val:
-                    dictionaries[col].add(val)
-    
-    # Convert to lists (as we'd store them)
-    for col in columns:
-        if col in dictionaries:
-            dictionaries[col] = list(dictionaries[col])
-            print(f"  {col:20s}: {len(dictionaries[col]):>8,} unique values")
+    # Distinct values per batch with Arrow's hash kernels; the dictionaries
+    # stay in Arrow buffers rather than as Python str objects
+    convert_options = pacsv.ConvertOptions(
+        column_types={col: pa.string() for col in columns},
+        include_columns=columns,
+    )
+    uniques = {col: [] for col in columns}
+    rows = 0
+    
+    for batch in pacsv.open_csv(csv_files[0], convert_options=convert_options):
+        if rows >= sample_size:
+            break
+        batch = batch.slice(0, sample_size - rows)
+        rows += batch.num_rows
+        
+        for col in columns:
+            uniques[col].append(pc.unique(batch.column(col)))
     
+    for col in columns:
+        values = pc.unique(pa.chunked_array(uniques[col], pa.string()))
+        # Empty fields are NULLs, not dictionary entries
+        dictionaries[col] = values.filter(pc.not_equal(values, ''))
+        print(f"  {col:20s}: {len(dictionaries[col]):>8,} unique values")
+    
+    # Hand the reader's freed buffers back to the OS so RSS reflects
+    # only the dictionaries
+    del uniques
+    pa.default_memory_pool().release_unused()
     gc.collect()
     after = get_memory_mb()
     dict_mb = after - before
@@ -119,50 +149,63 @@ def test_preagg_memory(data_dir: Path, sample_ratio: float = 0.1):
     before = get_memory_mb()
     
     # Simulate pre-agg structures
-    # (day, type) -> {sum_bid, sum_total, count}
+    # (day, type) -> row in parallel sum_bid / count / count_non_null_bid
+    # arrays (struct-of-arrays: 24 bytes per group instead of a dict each)
     print("Building (day, type) pre-aggregation from sample...")
     
-    preagg_day_type = {}
+    from datetime import datetime
     
     csv_files = list(data_dir.glob("*.csv"))
     sample_files = csv_files[:max(1, int(len(csv_files) * sample_ratio))]
     
     print(f"Sampling {len(sample_files)} files...")
     
-    from datetime import datetime
+    convert_options = pacsv.ConvertOptions(
+        column_types={'ts': pa.int64(), 'type': pa.string(), 'bid_price': pa.float64()},
+        include_columns=['ts', 'type', 'bid_price'],
+    )
     
+    # Partial aggregates per file, keyed by 15-minute UTC bucket: local day
+    # boundaries fall on those, so buckets map onto local days exactly
+    partials = []
     for csv_file in sample_files:
-        with open(csv_file, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                ts = row.get('ts', '')
-                event_type = row.get('type', '')
-                bid_price = row.get('bid_price', '')
-                
-                if ts and event_type:
-                    try:
-                        dt = datetime.fromtimestamp(int(ts) / 1000)
-                        day = dt.strftime('%Y-%m-%d')
-                        key = (day, event_type)
-                        
-                        if key not in preagg_day_type:
-                            preagg_day_type[key] = {
-                                'sum_bid': 0.0,
-                                'count': 0,
-                                'count_non_null_bid': 0
-                            }
-                        
-                        preagg_day_type[key]['count'] += 1
-                        if bid_price:
-                            try:
-                                preagg_day_type[key]['sum_bid'] += float(bid_price)
-                                preagg_day_type[key]['count_non_null_bid'] += 1
-                            except:
-                                pass
-                    except:
-                        pass
-    
-    print(f"Pre-agg (day, type) rows: {len(preagg_day_type):,}")
+        table = pacsv.read_csv(csv_file, convert_options=convert_options)
+        table = table.filter(pc.and_(pc.is_valid(table['ts']), pc.not_equal(table['type'], '')))
+        table = table.append_column('bucket', pc.divide(table['ts'], PREAGG_BUCKET_MS))
+        partials.append(table.group_by(['bucket', 'type']).aggregate([
+            ('bid_price', 'sum'),
+            ('bid_price', 'count'),
+            ([], 'count_all'),
+        ]))
+    
+    # Merge: label each distinct bucket with its local day, then re-group
+    merged = pa.concat_tables(partials)
+    buckets = pc.unique(merged['bucket'])
+    days = pa.array([
+        datetime.fromtimestamp(b * PREAGG_BUCKET_MS / 1000).strftime('%Y-%m-%d')
+        for b in buckets.to_pylist()
+    ])
+    merged = merged.append_column('day', pc.take(days, pc.index_in(merged['bucket'], buckets)))
+    preagg = merged.group_by(['day', 'type']).aggregate([
+        ('bid_price_sum', 'sum'),
+        ('bid_price_count', 'sum'),
+        ('count_all', 'sum'),
+    ])
+    
+    key_rows = {key: r for r, key in enumerate(zip(preagg['day'].to_pylist(), preagg['type'].to_pylist()))}
+    sum_bid = preagg['bid_price_sum_sum'].fill_null(0.0).to_numpy()
+    count = preagg['count_all_sum'].to_numpy()
+    count_non_null_bid = preagg['bid_price_count_sum'].to_numpy()
+    
+    n = len(key_rows)
+    preagg_day_type = {
+        'keys': key_rows,
+        'sum_bid': sum_bid[:n],
+        'count': count[:n],
+        'count_non_null_bid': count_non_null_bid[:n],
+    }
+    
+    print(f"Pre-agg (day, type) rows: {n:,}")
     
     gc.collect()
     after = get_memory_mb()
@@ -187,13 +230,9 @@ def test_hot_cache_memory(cache_size_mb: int = 3000):
     print(f"Allocating {cache_size_mb} MB cache buffer...")
     
     # Allocate byte array to simulate compressed column cache
-    import numpy as np
     cache_bytes = cache_size_mb * 1024 * 1024
-    hot_cache = np.zeros(cache_bytes, dtype=np.uint8)
-    
-    # Force actual memory allocation by writing to it
-    print("  Writing to buffer to force physical allocation...")
-    hot_cache[::1000000] = 1  # Touch every ~1MB
+    print("  Touching every page to force physical allocation...")
+    hot_cache = committed_buffer(cache_bytes)
     
     gc.collect()
     after = get_memory_mb()
@@ -223,27 +262,22 @@ def test_query_processing_memory():
     
     print("Simulating query buffers (decompression, grouping, results)...")
     
-    import numpy as np
-    
     # Simulate buffers for processing a query
     buffers = []
     
     # Decompression buffer (100MB)
     print("  - Decompression buffer: 100 MB")
-    buf1 = np.zeros(100 * 1024 * 1024, dtype=np.uint8)
-    buf1[::1000000] = 1  # Force allocation
+    buf1 = committed_buffer(100 * 1024 * 1024)
     buffers.append(buf1)
     
     # Group keys buffer (50MB)
     print("  - Group keys buffer: 50 MB")
-    buf2 = np.zeros(50 * 1024 * 1024, dtype=np.uint8)
-    buf2[::1000000] = 1  # Force allocation
+    buf2 = committed_buffer(50 * 1024 * 1024)
     buffers.append(buf2)
     
     # Aggregation buffer (50MB)
     print("  - Aggregation buffer: 50 MB")
-    buf3 = np.zeros(50 * 1024 * 1024, dtype=np.uint8)
-    buf3[::1000000] = 1  # Force allocation
+    buf3 = committed_buffer(50 * 1024 * 1024)
     buffers.append(buf3)
     
     gc.collect()
@@ -15,11 +15,61 @@ This informs decisions about:
 
 import json
 import csv
+import hashlib
+import io
+import os
 import sys
+from sys import intern
 from pathlib import Path
-from collections import Counter, defaultdict
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+# orjson parses query files several times faster; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+
+# Arrow CSV block size when streaming the data sample
+CSV_BLOCK_SIZE = 1 << 20
+
+# Example values kept per column for the report
+SAMPLE_VALUES = 20
+
+# Distinct count at which sampling stops tracking a column; anything this
+# high is far past the low-cardinality (bitmap) threshold of 1000
+CARDINALITY_CAP = 4096
+
+# Default sample-analysis cache: repo-local (not next to the data sample,
+# which may live on a read-only mount)
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / 'cache' / 'predicate_stats'
+
+# Time dimensions (ordered, for the report) and a set for membership tests
+TIME_DIMENSIONS = ('day', 'week', 'hour', 'minute')
+TIME_DIMENSION_SET = frozenset(TIME_DIMENSIONS)
+
+# Low-cardinality filter columns considered for bitmap indexes
+BITMAP_CANDIDATE_COLUMNS = ('type', 'country', 'publisher_id', 'advertiser_id')
+
+
+def _read_query(path: Path) -> Any:
+    """Parse one query JSON file."""
+    return _json_loads(path.read_bytes())
+
+
+def load_queries(query_files: List[Path]) -> Iterator[Any]:
+    """Lazily parse query files, one at a time, in order."""
+    return map(_read_query, query_files)
 
 
 def analyze_queries(query_files: List[Path]) -> Dict[str, Any]:
@@ -35,50 +85,49 @@ def analyze_queries(query_files: List[Path]) -> Dict[str, Any]:
     groupby_patterns = []
     time_dimensions_used = Counter()
     
-    queries = []
-    
-    for qf in query_files:
-        with open(qf, 'r') as f:
-            query = json.load(f)
-            queries.append(query)
-            
+    # File reads release the GIL, so threads overlap the filesystem latency
+    # of many small files. Parsed queries are consumed as they arrive and
+    # not kept - callers that need them can re-read with load_queries()
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(query_files)))) as pool:
+        queries = pool.map(_read_query, query_files)
+        
+        # One Counter.update() per clause per query (C fast path) rather than
+        # a += per column. Column/operator names are interned as they enter the
+        # Counters, so each distinct name is one shared string object
+        for query in queries:
             # Analyze WHERE
-            for cond in query.get('where', []):
-                col = cond['col']
-                op = cond['op']
-                where_columns[col] += 1
-                where_operators[op] += 1
-                
-                # Track time dimensions
-                if col in ['day', 'week', 'hour', 'minute']:
-                    time_dimensions_used[col] += 1
+            where = query.get('where', [])
+            where_cols = [intern(cond['col']) for cond in where]
+            where_columns.update(where_cols)
+            where_operators.update(intern(cond['op']) for cond in where)
             
             # Analyze GROUP BY
-            groupby = query.get('group_by', [])
+            groupby = list(map(intern, query.get('group_by', [])))
             if groupby:
                 groupby_patterns.append(tuple(sorted(groupby)))
-                for col in groupby:
-                    groupby_columns[col] += 1
-                    if col in ['day', 'week', 'hour', 'minute']:
-                        time_dimensions_used[col] += 1
+            groupby_columns.update(groupby)
+            
+            # Analyze SELECT: split columns from aggregates by exact type
+            select = query.get('select', [])
+            select_cols = [intern(item) for item in select if type(item) is str]
+            select_columns.update(select_cols)
+            aggregate_columns.update(
+                f"{func}({col})"
+                for item in select if type(item) is dict
+                for func, col in islice(item.items(), 1)
+            )
             
-            # Analyze SELECT
-            for item in query.get('select', []):
-                if isinstance(item, str):
-                    select_columns[item] += 1
-                    if item in ['day', 'week', 'hour', 'minute']:
-                        time_dimensions_used[item] += 1
-                elif isinstance(item, dict):
-                    func = list(item.keys())[0]
-                    col = item[func]
-                    aggregate_columns[f"{func}({col})"] += 1
+            # Track time dimensions (WHERE, GROUP BY, then SELECT columns)
+            time_dimensions_used.update(
+                col for col in where_cols + groupby + select_cols
+                if col in TIME_DIMENSION_SET
+            )
             
             # Analyze ORDER BY
-            for spec in query.get('order_by', []):
-                orderby_columns[spec['col']] += 1
+            orderby_columns.update(intern(spec['col']) for spec in query.get('order_by', []))
     
     return {
-        'total_queries': len(queries),
+        'total_queries': len(query_files),
         'where_columns': where_columns,
         'groupby_columns': groupby_columns,
         'select_columns': select_columns,
@@ -87,51 +136,156 @@ def analyze_queries(query_files: List[Path]) -> Dict[str, Any]:
         'where_operators': where_operators,
         'groupby_patterns': Counter(groupby_patterns),
         'time_dimensions': time_dimensions_used,
-        'queries': queries
+        'query_files': list(query_files)
     }
 
 
-def analyze_data_sample(csv_file: Path, sample_size: int = 1000000) -> Dict[str, Any]:
-    """Analyze data characteristics from CSV sample"""
+def analyze_data_sample(csv_file: Path, sample_size: int = 1000000,
+                        cardinality_cap: int = CARDINALITY_CAP) -> Dict[str, Any]:
+    """
+    Analyze data characteristics from CSV sample.
+    
+    The first sample_size rows are streamed as Arrow record batches (every
+    column as a string, empty fields as NULL) and profiled with columnar
+    kernels: a running unique() set per column for cardinalities and
+    example values, null_count for NULLs, and value_counts for the type
+    distribution.
+    
+    Recommendations only ask whether a column is low-cardinality, so once
+    a column's distinct count reaches cardinality_cap it is no longer
+    hashed; its cardinality is reported as the cap and the column is
+    listed in 'capped_columns'.
+    
+    Args:
+        csv_file: CSV file to sample
+        sample_size: Maximum number of rows to read
+        cardinality_cap: Distinct count at which a column stops being tracked
+    
+    Returns:
+        Sample statistics (rows, cardinalities, NULL %, type distribution,
+        example values per column, capped columns)
+    """
     
     print(f"\nAnalyzing sample data from {csv_file.name}...")
     
-    column_values = defaultdict(set)
-    null_counts = defaultdict(int)
-    total_rows = 0
+    with open(csv_file, 'r', newline='') as f:
+        columns = next(csv.reader(f))
+    
+    convert_options = pacsv.ConvertOptions(
+        column_types={col: pa.string() for col in columns},
+        strings_can_be_null=True,
+    )
+    read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+    
+    # Distinct non-null values seen so far, in first-seen order
+    distinct_values = {col: pa.array([], pa.string()) for col in columns}
+    capped_columns = set()
+    null_counts = Counter()
     type_distribution = Counter()
     
-    with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
+    total_rows = 0
+    for batch in pacsv.open_csv(csv_file, read_options=read_options, convert_options=convert_options):
+        if total_rows >= sample_size:
+            break
+        batch = batch.slice(0, sample_size - total_rows)
+        total_rows += batch.num_rows
         
-        for i, row in enumerate(reader):
-            if i >= sample_size:
-                break
-            
-            total_rows += 1
-            
-            for col, val in row.items():
-                if val == '' or val is None:
-                    null_counts[col] += 1
-                else:
-                    column_values[col].add(val)
-                    
-                    if col == 'type':
-                        type_distribution[val] += 1
-    
-    # Calculate cardinalities and null percentages
-    cardinalities = {col: len(vals) for col, vals in column_values.items()}
-    null_percentages = {col: (count / total_rows * 100) for col, count in null_counts.items()}
+        for col, values in zip(batch.schema.names, batch.columns):
+            null_counts[col] += values.null_count
+            if col in capped_columns:
+                continue
+            # unique() keeps first-seen order, so earlier values stay first
+            merged = pa.concat_arrays([distinct_values[col], pc.unique(values).drop_null()])
+            distinct_values[col] = pc.unique(merged)
+            if len(distinct_values[col]) >= cardinality_cap:
+                capped_columns.add(col)
+                # Only the example values are reported past the cap
+                distinct_values[col] = distinct_values[col][:SAMPLE_VALUES]
+        
+        if 'type' in batch.schema.names:
+            for entry in pc.value_counts(batch.column('type').drop_null()).to_pylist():
+                type_distribution[entry['values']] += entry['counts']
+    
+    cardinalities = {}
+    null_percentages = {}
+    column_values = {}
+    for col in columns:
+        if col in capped_columns:
+            cardinalities[col] = cardinality_cap
+        elif len(distinct_values[col]):
+            cardinalities[col] = len(distinct_values[col])
+        if len(distinct_values[col]):
+            column_values[col] = distinct_values[col][:SAMPLE_VALUES].to_pylist()
+        if null_counts[col]:
+            null_percentages[col] = null_counts[col] / total_rows * 100
     
     return {
         'total_rows_sampled': total_rows,
         'cardinalities': cardinalities,
+        'capped_columns': capped_columns,
         'null_percentages': null_percentages,
         'type_distribution': type_distribution,
-        'column_values': {col: list(vals)[:20] for col, vals in column_values.items()}  # First 20 values
+        'column_values': column_values  # First 20 values
     }
 
 
+def _sample_cache_path(cache_dir: Path, csv_file: Path, sample_size: int,
+                       cardinality_cap: int) -> Path:
+    """Cache file for a sample analysis, keyed by file identity and sampling setup."""
+    st = csv_file.stat()
+    ident = f"{csv_file.resolve()}|{st.st_mtime_ns}|{st.st_size}|{sample_size}|{cardinality_cap}|{SAMPLE_VALUES}"
+    return cache_dir / f"{csv_file.stem}-sample-{hashlib.sha1(ident.encode()).hexdigest()[:16]}.json"
+
+
+def cached_analyze_data_sample(csv_file: Path, sample_size: int = 1000000,
+                               cardinality_cap: int = CARDINALITY_CAP,
+                               cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    analyze_data_sample with an on-disk JSON cache of its result.
+    
+    Re-running the analyzer on an unchanged sample file (same path, mtime,
+    size and sampling settings) loads the stored statistics instead of
+    re-scanning the CSV. A cache that cannot be written (OSError) just
+    behaves as a miss.
+    
+    Args:
+        csv_file: CSV file to sample
+        sample_size: Maximum number of rows to read
+        cardinality_cap: Distinct count at which a column stops being tracked
+        cache_dir: Cache directory (None disables caching)
+    
+    Returns:
+        Sample statistics, as returned by analyze_data_sample
+    """
+    if cache_dir is None:
+        return analyze_data_sample(csv_file, sample_size, cardinality_cap)
+    
+    cache_path = _sample_cache_path(cache_dir, csv_file, sample_size, cardinality_cap)
+    if cache_path.exists():
+        print(f"\nUsing cached sample analysis for {csv_file.name} ({cache_path.name})")
+        data_analysis = _json_loads(cache_path.read_bytes())
+        data_analysis['capped_columns'] = set(data_analysis['capped_columns'])
+        data_analysis['type_distribution'] = Counter(data_analysis['type_distribution'])
+        return data_analysis
+    
+    data_analysis = analyze_data_sample(csv_file, sample_size, cardinality_cap)
+    tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(_json_dumps({
+            **data_analysis,
+            'capped_columns': sorted(data_analysis['capped_columns']),
+        }))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Unwritable cache (read-only or full disk): keep the result uncached
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+    return data_analysis
+
+
 def estimate_selectivity(query_analysis: Dict, data_analysis: Dict) -> Dict[str, Any]:
     """Estimate selectivity of common WHERE predicates"""
     
@@ -180,7 +334,7 @@ def recommend_optimizations(query_analysis: Dict, data_analysis: Dict,
         )
     
     # Time dimension recommendations
-    for time_dim in ['day', 'week', 'hour', 'minute']:
+    for time_dim in TIME_DIMENSIONS:
         freq = query_analysis['time_dimensions'].get(time_dim, 0)
         if freq > 0:
             pct = (freq / total_queries * 100)
@@ -191,7 +345,7 @@ def recommend_optimizations(query_analysis: Dict, data_analysis: Dict,
                 )
     
     # Bitmap index recommendations
-    for col in ['type', 'country', 'publisher_id', 'advertiser_id']:
+    for col in BITMAP_CANDIDATE_COLUMNS:
         cardinality = data_analysis['cardinalities'].get(col, float('inf'))
         where_freq = query_analysis['where_columns'].get(col, 0)
         
@@ -228,6 +382,12 @@ def main():
                        help='CSV file to sample for data analysis')
     parser.add_argument('--sample-size', type=int, default=1000000,
                        help='Number of rows to sample from data file')
+    parser.add_argument('--cardinality-cap', type=int, default=CARDINALITY_CAP,
+                       help=f'Stop counting distinct values past this (default: {CARDINALITY_CAP})')
+    parser.add_argument('--cache-dir', default=None,
+                       help=f'Sample analysis cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-scan the sample instead of using/writing the cache')
     
     args = parser.parse_args()
     
@@ -244,97 +404,107 @@ def main():
         print("Please add example queries (q1.json, q2.json, etc.)")
         return 1
     
-    print("=" * 80)
-    print("PREDICATE FREQUENCY & SELECTIVITY ANALYSIS")
-    print("=" * 80)
+    # The report is built in memory and written in a few large writes
+    out = io.StringIO()
+    
+    print("=" * 80, file=out)
+    print("PREDICATE FREQUENCY & SELECTIVITY ANALYSIS", file=out)
+    print("=" * 80, file=out)
     
     # Analyze queries
-    print(f"\nAnalyzing {len(query_files)} queries...")
+    print(f"\nAnalyzing {len(query_files)} queries...", file=out)
     query_analysis = analyze_queries(query_files)
     
-    print("\n" + "=" * 80)
-    print("QUERY PATTERN ANALYSIS")
-    print("=" * 80)
+    print("\n" + "=" * 80, file=out)
+    print("QUERY PATTERN ANALYSIS", file=out)
+    print("=" * 80, file=out)
     
-    print(f"\nTotal queries analyzed: {query_analysis['total_queries']}")
+    print(f"\nTotal queries analyzed: {query_analysis['total_queries']}", file=out)
     
-    print("\n📊 WHERE Clause Column Frequency:")
+    print("\n📊 WHERE Clause Column Frequency:", file=out)
     for col, count in query_analysis['where_columns'].most_common():
         pct = (count / query_analysis['total_queries'] * 100)
-        print(f"  {col:20s}: {count:2d} queries ({pct:5.1f}%)")
+        print(f"  {col:20s}: {count:2d} queries ({pct:5.1f}%)", file=out)
     
-    print("\n📊 WHERE Operators Used:")
+    print("\n📊 WHERE Operators Used:", file=out)
     for op, count in query_analysis['where_operators'].most_common():
-        print(f"  {op:10s}: {count} times")
+        print(f"  {op:10s}: {count} times", file=out)
     
-    print("\n📊 GROUP BY Column Frequency:")
+    print("\n📊 GROUP BY Column Frequency:", file=out)
     for col, count in query_analysis['groupby_columns'].most_common():
         pct = (count / query_analysis['total_queries'] * 100)
-        print(f"  {col:20s}: {count:2d} queries ({pct:5.1f}%)")
+        print(f"  {col:20s}: {count:2d} queries ({pct:5.1f}%)", file=out)
     
-    print("\n📊 Common GROUP BY Patterns:")
+    print("\n📊 Common GROUP BY Patterns:", file=out)
     for pattern, count in query_analysis['groupby_patterns'].most_common(5):
-        print(f"  {pattern}: {count} times")
+        print(f"  {pattern}: {count} times", file=out)
     
-    print("\n📊 Time Dimensions Used:")
+    print("\n📊 Time Dimensions Used:", file=out)
     for dim, count in query_analysis['time_dimensions'].most_common():
         pct = (count / query_analysis['total_queries'] * 100)
-        print(f"  {dim:10s}: {count:2d} queries ({pct:5.1f}%)")
+        print(f"  {dim:10s}: {count:2d} queries ({pct:5.1f}%)", file=out)
     
-    print("\n📊 Aggregate Functions:")
+    print("\n📊 Aggregate Functions:", file=out)
     for agg, count in query_analysis['aggregate_columns'].most_common():
-        print(f"  {agg}: {count} times")
+        print(f"  {agg}: {count} times", file=out)
     
-    # Analyze data sample
+    # Analyze data sample (flush the query report first so the sampler's
+    # progress line lands after it)
     data_file = Path(args.data_sample)
     if data_file.exists():
-        data_analysis = analyze_data_sample(data_file, args.sample_size)
+        sys.stdout.write(out.getvalue())
+        out = io.StringIO()
+        cache_dir = None if args.no_cache else Path(args.cache_dir or DEFAULT_CACHE_DIR)
+        data_analysis = cached_analyze_data_sample(data_file, args.sample_size,
+                                                   args.cardinality_cap, cache_dir)
         
-        print("\n" + "=" * 80)
-        print("DATA CHARACTERISTICS (from sample)")
-        print("=" * 80)
+        print("\n" + "=" * 80, file=out)
+        print("DATA CHARACTERISTICS (from sample)", file=out)
+        print("=" * 80, file=out)
         
-        print(f"\nRows sampled: {data_analysis['total_rows_sampled']:,}")
+        print(f"\nRows sampled: {data_analysis['total_rows_sampled']:,}", file=out)
         
-        print("\n📊 Column Cardinalities:")
+        print("\n📊 Column Cardinalities:", file=out)
         for col, card in sorted(data_analysis['cardinalities'].items()):
-            print(f"  {col:20s}: {card:,} distinct values")
+            at_least = '≥' if col in data_analysis['capped_columns'] else ''
+            print(f"  {col:20s}: {at_least}{card:,} distinct values", file=out)
         
-        print("\n📊 NULL Percentages:")
+        print("\n📊 NULL Percentages:", file=out)
         for col, pct in sorted(data_analysis['null_percentages'].items()):
             if pct > 0:
-                print(f"  {col:20s}: {pct:5.1f}% NULL")
+                print(f"  {col:20s}: {pct:5.1f}% NULL", file=out)
         
-        print("\n📊 Type Distribution (sample):")
+        print("\n📊 Type Distribution (sample):", file=out)
         total = sum(data_analysis['type_distribution'].values())
         for type_val, count in data_analysis['type_distribution'].most_common():
             pct = (count / total * 100) if total > 0 else 0
-            print(f"  {type_val:15s}: {count:,} ({pct:5.1f}%)")
+            print(f"  {type_val:15s}: {count:,} ({pct:5.1f}%)", file=out)
         
         # Selectivity estimates
         selectivity = estimate_selectivity(query_analysis, data_analysis)
         
-        print("\n📊 Estimated Selectivity:")
+        print("\n📊 Estimated Selectivity:", file=out)
         for pred, sel in selectivity.items():
             rows_est = int(data_analysis['total_rows_sampled'] * sel)
-            print(f"  {pred:30s}: {sel:8.6f} (~{rows_est:,} rows)")
+            print(f"  {pred:30s}: {sel:8.6f} (~{rows_est:,} rows)", file=out)
         
         # Generate recommendations
-        print("\n" + "=" * 80)
-        print("OPTIMIZATION RECOMMENDATIONS")
-        print("=" * 80)
+        print("\n" + "=" * 80, file=out)
+        print("OPTIMIZATION RECOMMENDATIONS", file=out)
+        print("=" * 80, file=out)
         
         recommendations = recommend_optimizations(query_analysis, data_analysis, selectivity)
-        for rec in recommendations:
-            print(rec)
+        out.write("\n".join(recommendations) + "\n" if recommendations else "")
     
     else:
-        print(f"\n⚠️  Data file not found: {args.data_sample}")
-        print("Skipping data analysis")
+        print(f"\n⚠️  Data file not found: {args.data_sample}", file=out)
+        print("Skipping data analysis", file=out)
+    
+    print("\n" + "=" * 80, file=out)
+    print("ANALYSIS COMPLETE", file=out)
+    print("=" * 80, file=out)
     
-    print("\n" + "=" * 80)
-    print("ANALYSIS COMPLETE")
-    print("=" * 80)
+    sys.stdout.write(out.getvalue())
     
     return 0
 
@@ -8,14 +8,37 @@ import sys
 import time
 import argparse
 import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any
 import duckdb
-import pandas as pd
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
-from query_parser import QueryParser
+from query_parser import QueryParser, sql_literal
+from result_csv import write_result_csv
+
+# orjson parses query files several times faster; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# Column definitions for the events table (matches the challenge CSV header)
+EVENTS_SCHEMA = {
+    'ts': 'BIGINT',
+    'type': 'VARCHAR',
+    'auction_id': 'VARCHAR',
+    'advertiser_id': 'BIGINT',
+    'publisher_id': 'BIGINT',
+    'bid_price': 'DOUBLE',
+    'user_id': 'VARCHAR',
+    'total_price': 'DOUBLE',
+    'country': 'VARCHAR',
+}
 
 
 class BaselineRunner:
@@ -31,6 +54,9 @@ class BaselineRunner:
         self.data_dir = Path(data_dir)
         self.db_file = db_file
         self.conn = None
+        self.schema = dict(EVENTS_SCHEMA)
+        # Per connection/cursor: SQL shape → prepared statement name
+        self._prepared: Dict[int, Dict[str, str]] = {}
         
     def prepare(self):
         """Prepare phase: Load data into DuckDB"""
@@ -47,6 +73,7 @@ class BaselineRunner:
         else:
             self.conn = duckdb.connect()
             print("Created in-memory database")
+        self._prepared.clear()
         
         # Find CSV files
         csv_files = list(self.data_dir.glob("*.csv"))
@@ -55,19 +82,20 @@ class BaselineRunner:
         
         print(f"\nFound {len(csv_files)} CSV file(s)")
         
-        # Load data
-        for csv_file in csv_files:
-            print(f"Loading {csv_file.name}...")
-            file_start = time.time()
-            
-            # Create or replace table from CSV
-            self.conn.execute(f"""
-                CREATE OR REPLACE TABLE events AS 
-                SELECT * FROM read_csv_auto('{csv_file}')
-            """)
-            
-            file_time = time.time() - file_start
-            print(f"  Loaded in {file_time:.2f} seconds")
+        # Create table with the known schema (no type sniffing)
+        columns = ', '.join(f"{col} {sql_type}" for col, sql_type in self.schema.items())
+        self.conn.execute(f"CREATE OR REPLACE TABLE events ({columns})")
+        
+        # Load all files with one COPY so DuckDB parallelizes across them
+        csv_glob = str(self.data_dir / "*.csv").replace("'", "''")
+        print(f"Loading {csv_glob}...")
+        copy_start = time.time()
+        self.conn.execute(f"""
+            COPY events FROM '{csv_glob}'
+            (FORMAT CSV, HEADER, DELIMITER ',', AUTO_DETECT FALSE)
+        """)
+        copy_time = time.time() - copy_start
+        print(f"  Loaded in {copy_time:.2f} seconds")
         
         # Get row count
         result = self.conn.execute("SELECT COUNT(*) FROM events").fetchone()
@@ -80,38 +108,118 @@ class BaselineRunner:
         
         return load_time
     
-    def run_query(self, query_dict: Dict[str, Any], query_name: str = "Query") -> tuple:
+    def run_query(self, query_dict: Dict[str, Any], query_name: str = "Query",
+                  conn: duckdb.DuckDBPyConnection = None) -> tuple:
         """Run a single query and return results and timing
         
         Args:
             query_dict: Query as dictionary
             query_name: Name/description of query
+            conn: Connection or cursor to run on (default: self.conn)
             
         Returns:
-            (result_df, execution_time)
+            (result_table, execution_time) - result is a pyarrow Table
         """
+        conn = conn or self.conn
         parser = QueryParser(query_dict)
-        sql = parser.to_sql()
-        
-        print(f"\n{query_name}:")
-        print(f"  SQL: {sql}")
+        sql, params = parser.to_parameterized_sql()
         
         start_time = time.time()
-        result_df = self.conn.execute(sql).df()
+        statement = self._prepare(sql, conn)
+        args = ", ".join(sql_literal(p) for p in params)
+        result = conn.execute(
+            f"EXECUTE {statement}({args})" if params else f"EXECUTE {statement}"
+        )
+        # to_arrow_table() replaced fetch_arrow_table() in newer DuckDB
+        result_table = (getattr(result, 'to_arrow_table', None) or result.fetch_arrow_table)()
         execution_time = time.time() - start_time
         
-        print(f"  ✓ Completed in {execution_time:.4f} seconds")
-        print(f"  Result: {len(result_df)} rows")
+        # One print per query so parallel runs don't interleave lines
+        lines = [f"\n{query_name}:", f"  SQL: {sql}"]
+        if params:
+            lines.append(f"  Params: {params}")
+        lines.append(f"  ✓ Completed in {execution_time:.4f} seconds")
+        lines.append(f"  Result: {result_table.num_rows} rows")
+        print("\n".join(lines))
         
-        return result_df, execution_time
+        return result_table, execution_time
+    
+    def _prepare(self, sql: str, conn: duckdb.DuckDBPyConnection) -> str:
+        """Get the prepared statement for a query shape, preparing it on first use
+        
+        Prepared statements belong to a connection, so each cursor keeps
+        its own cache.
+        
+        Args:
+            sql: Parameterized SQL ($1..$n placeholders)
+            conn: Connection or cursor the statement will run on
+            
+        Returns:
+            Prepared statement name
+        """
+        prepared = self._prepared.setdefault(id(conn), {})
+        statement = prepared.get(sql)
+        if statement is None:
+            statement = f"baseline_q{len(prepared)}"
+            conn.execute(f"PREPARE {statement} AS {sql}")
+            prepared[sql] = statement
+        return statement
+    
+    def _run_query_file(self, i: int, query_file: Path, output_path: Path,
+                        conn: duckdb.DuckDBPyConnection) -> Dict[str, Any]:
+        """Load, run and save one query file
+        
+        Args:
+            i: 1-based query number
+            query_file: JSON query file
+            output_path: Directory to save the result CSV
+            conn: Connection or cursor to run on
+            
+        Returns:
+            Result dictionary with timing info
+        """
+        query_name = f"Query {i}: {query_file.stem}"
+        try:
+            # Load query
+            query_dict = _json_loads(query_file.read_bytes())
+            
+            # Run query
+            result_table, exec_time = self.run_query(query_dict, query_name, conn)
+            
+            # Save result
+            output_file = output_path / f"{query_file.stem}_result.csv"
+            write_result_csv(result_table, output_file)
+            print(f"  Saved to: {output_file}")
+            
+            return {
+                'query_file': query_file.name,
+                'execution_time': exec_time,
+                'rows': result_table.num_rows,
+                'success': True
+            }
+            
+        except Exception as e:
+            print(f"\n{query_name}:\n  ✗ Error: {e}")
+            return {
+                'query_file': query_file.name,
+                'execution_time': None,
+                'rows': None,
+                'success': False,
+                'error': str(e)
+            }
     
     def run_queries_from_dir(self, queries_dir: str = 'queries', 
-                            output_dir: str = 'results') -> List[Dict[str, Any]]:
+                            output_dir: str = 'results',
+                            workers: int = None) -> List[Dict[str, Any]]:
         """Run all queries from a directory
         
+        With more than one worker, queries run concurrently on a thread pool,
+        each borrowing its own DuckDB cursor from a shared queue.
+        
         Args:
             queries_dir: Directory containing JSON query files
             output_dir: Directory to save results
+            workers: Concurrent queries (default: CPU count; 1 = sequential)
             
         Returns:
             List of result dictionaries with timing info
@@ -132,44 +240,43 @@ class BaselineRunner:
         
         print(f"\nFound {len(query_files)} query file(s)\n")
         
-        results = []
-        total_time = 0
+        if not workers:
+            # CPUs this process may run on (containers, taskset)
+            if hasattr(os, 'sched_getaffinity'):
+                workers = len(os.sched_getaffinity(0))
+            else:
+                workers = os.cpu_count() or 1
+        workers = min(workers, len(query_files))
         
-        for i, query_file in enumerate(query_files, 1):
+        if workers <= 1:
+            results = [
+                self._run_query_file(i, query_file, output_path, self.conn)
+                for i, query_file in enumerate(query_files, 1)
+            ]
+        else:
+            print(f"Running with {workers} concurrent cursors")
+            cursors = queue.Queue()
+            for _ in range(workers):
+                cursors.put(self.conn.cursor())
+            
+            def run(i: int, query_file: Path) -> Dict[str, Any]:
+                cursor = cursors.get()
+                try:
+                    return self._run_query_file(i, query_file, output_path, cursor)
+                finally:
+                    cursors.put(cursor)
+            
             try:
-                # Load query
-                with open(query_file, 'r') as f:
-                    query_dict = json.load(f)
-                
-                # Run query
-                result_df, exec_time = self.run_query(
-                    query_dict, 
-                    query_name=f"Query {i}: {query_file.stem}"
-                )
-                
-                # Save result
-                output_file = output_path / f"{query_file.stem}_result.csv"
-                result_df.to_csv(output_file, index=False)
-                print(f"  Saved to: {output_file}")
-                
-                results.append({
-                    'query_file': query_file.name,
-                    'execution_time': exec_time,
-                    'rows': len(result_df),
-                    'success': True
-                })
-                
-                total_time += exec_time
-                
-            except Exception as e:
-                print(f"  ✗ Error: {e}")
-                results.append({
-                    'query_file': query_file.name,
-                    'execution_time': None,
-                    'rows': None,
-                    'success': False,
-                    'error': str(e)
-                })
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    # map() keeps results in query-file order
+                    results = list(pool.map(run, range(1, len(query_files) + 1), query_files))
+            finally:
+                while not cursors.empty():
+                    cursor = cursors.get()
+                    self._prepared.pop(id(cursor), None)
+                    cursor.close()
+        
+        total_time = sum(r['execution_time'] for r in results if r['success'])
         
         print("\n" + "=" * 80)
         print("SUMMARY")
@@ -203,6 +310,10 @@ def main():
                        help='Persistent database file (default: in-memory)')
     parser.add_argument('--prepare-only', action='store_true',
                        help='Only run prepare phase')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Concurrent queries (default: CPU count)')
+    parser.add_argument('--sequential', action='store_true',
+                       help='Run queries one at a time on the main connection (debugging)')
     
     args = parser.parse_args()
     
@@ -228,7 +339,8 @@ def main():
             # Run phase
             results = runner.run_queries_from_dir(
                 queries_dir=args.queries_dir,
-                output_dir=args.output_dir
+                output_dir=args.output_dir,
+                workers=1 if args.sequential else args.workers
             )
             
             # Save timing results
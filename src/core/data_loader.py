@@ -13,20 +13,202 @@ Key features:
 """
 
 import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
-from typing import List, Iterator
-from datetime import datetime
+from typing import List, Iterator, Callable, Any, Optional
+from datetime import date, datetime
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
 import logging
+import os
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Schema for the CSV files
+# Note: ts is Unix timestamp (milliseconds), auction_id is UUID
+CSV_SCHEMA = {
+    'ts': pl.Int64,  # Unix timestamp in milliseconds
+    'type': pl.Utf8,
+    'auction_id': pl.Utf8,  # UUID string
+    'advertiser_id': pl.Int64,
+    'publisher_id': pl.Int64,
+    'bid_price': pl.Float64,
+    'user_id': pl.Int64,
+    'total_price': pl.Float64,
+    'country': pl.Utf8,
+}
+
+# Arrow schema for the raw CSVs, in file column order. Declaring names and
+# types up front lets Arrow skip header parsing and type inference.
+ARROW_CSV_SCHEMA = pa.schema([
+    ('ts', pa.int64()),
+    ('type', pa.string()),
+    ('auction_id', pa.string()),
+    ('advertiser_id', pa.int64()),
+    ('publisher_id', pa.int64()),
+    ('bid_price', pa.float64()),
+    ('user_id', pa.string()),
+    ('total_price', pa.float64()),
+    ('country', pa.string()),
+])
+
+# Low-cardinality string columns (4 event types, ~250 countries) loaded as
+# Categorical, so lazy filters and group-bys work on u32 codes
+CATEGORICAL_COLUMNS = ['type', 'country']
+
+# Read-ahead buffer for streaming CSV input (see open_csv_stream)
+CSV_STREAM_BUFFER = 8 * 1024 * 1024
+
+# Parquet mirror of the CSVs (see DataLoader.write_parquet): zstd pages with
+# min/max statistics per row group so lazy scans can prune and project
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_ROW_GROUP_SIZE = 256_000
+
+# Packed integer time keys (see DataLoader.add_time_dimensions):
+#   day_key    = year * 512 + day_of_year
+#   hour_key   = day_key * 32 + hour
+#   minute_key = hour_key * 64 + minute
+#   week_key   = year * 64 + ISO week
+DAY_KEY_BASE = 512
+HOUR_KEY_BASE = 32
+MINUTE_KEY_BASE = 64
+WEEK_KEY_BASE = 64
+
+# Millisecond divisors for splitting the epoch timestamp into components
+MS_PER_DAY = 86_400_000
+MS_PER_HOUR = 3_600_000
+MS_PER_MINUTE = 60_000
+
+# Calendar lookup table range (see _calendar_lut), as [first, last) years
+CALENDAR_LUT_YEARS = (1900, 2200)
+
+# Time dimension -> key column holding it
+TIME_KEY_COLUMNS = {
+    'day': 'day_key',
+    'hour': 'hour_key',
+    'minute': 'minute_key',
+    'week': 'week_key',
+}
+
+# Time columns materialized into the Parquet mirror at conversion time.
+# year/day_of_year stay as small integers so range predicates on them can
+# prune row groups by min/max statistics.
+MIRROR_TIME_COLUMNS = list(TIME_KEY_COLUMNS.values()) + ['date', 'year', 'day_of_year']
+
+
+@lru_cache(maxsize=1)
+def _calendar_lut() -> pl.DataFrame:
+    """
+    Per-day calendar fields, keyed by days since the Unix epoch.
+    
+    ~110K rows covering CALENDAR_LUT_YEARS. Joining on it replaces
+    per-row calendar conversion with one hash lookup per row.
+    
+    Returns:
+        DataFrame with epoch_day (Int32), date, year, day_of_year, week_of_year
+    """
+    epoch = date(1970, 1, 1)
+    first = (date(CALENDAR_LUT_YEARS[0], 1, 1) - epoch).days
+    last = (date(CALENDAR_LUT_YEARS[1], 1, 1) - epoch).days
+    return pl.DataFrame({
+        'epoch_day': pl.int_range(first, last, dtype=pl.Int32, eager=True),
+    }).with_columns(
+        pl.col('epoch_day').cast(pl.Date).alias('date'),
+    ).with_columns([
+        pl.col('date').dt.year().alias('year'),
+        pl.col('date').dt.ordinal_day().alias('day_of_year'),
+        pl.col('date').dt.week().alias('week_of_year'),
+    ])
+
+
+def _zfill(expr: pl.Expr, width: int) -> pl.Expr:
+    return expr.cast(pl.Utf8).str.zfill(width)
+
+
+def _day_label(day_key: pl.Expr) -> pl.Expr:
+    return (day_key // DAY_KEY_BASE).cast(pl.Utf8) + "-" + _zfill(day_key % DAY_KEY_BASE, 3)
+
+
+def _hour_label(hour_key: pl.Expr) -> pl.Expr:
+    return _day_label(hour_key // HOUR_KEY_BASE) + " " + _zfill(hour_key % HOUR_KEY_BASE, 2)
+
+
+def time_key_label(dim: str) -> pl.Expr:
+    """
+    Expression rendering a packed time key column as its label string.
+    
+    Meant for aggregated results (one label per group, not per row).
+    
+    Args:
+        dim: 'day', 'hour', 'minute' or 'week'
+    
+    Returns:
+        Utf8 expression aliased to dim ("2024-001", "2024-001 14",
+        "2024-001 14:23", "2024-01")
+    """
+    key = pl.col(TIME_KEY_COLUMNS[dim])
+    if dim == 'day':
+        label = _day_label(key)
+    elif dim == 'hour':
+        label = _hour_label(key)
+    elif dim == 'minute':
+        label = _hour_label(key // MINUTE_KEY_BASE) + ":" + _zfill(key % MINUTE_KEY_BASE, 2)
+    else:
+        label = (key // WEEK_KEY_BASE).cast(pl.Utf8) + "-" + _zfill(key % WEEK_KEY_BASE, 2)
+    return label.alias(dim)
+
+
+def open_csv_stream(csv_file: Path) -> pa.NativeFile:
+    """
+    Open a CSV file as a buffered Arrow input stream.
+    
+    Each CSV is read exactly once, front to back, so a large sequential
+    read buffer beats random-access file handles.
+    
+    Args:
+        csv_file: CSV file path
+    
+    Returns:
+        Buffered pyarrow input stream (usable as a context manager)
+    """
+    return pa.input_stream(str(csv_file), buffer_size=CSV_STREAM_BUFFER)
+
+
+def release_page_cache(path: Path):
+    """
+    Drop a fully consumed file from the OS page cache.
+    
+    The raw CSVs are read once during prepare; keeping them cached only
+    evicts the rollup and events files that later phases re-read. Uses
+    posix_fadvise(POSIX_FADV_DONTNEED) and is a no-op where unsupported.
+    
+    Args:
+        path: File that has been fully read
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"posix_fadvise failed for {path}: {e}")
+
 
 class DataLoader:
     """
     Streaming data loader for ad events CSV files.
     
     Uses Polars lazy evaluation to avoid loading entire dataset into memory.
+    
+    If a sibling `<data_dir>_parquet/` directory holds an up-to-date Parquet
+    copy of every CSV (see write_parquet), lazy scans read that instead and
+    the time dimensions come precomputed.
     """
     
     def __init__(self, data_dir: Path):
@@ -43,117 +225,290 @@ class DataLoader:
             raise ValueError(f"No CSV files found in {data_dir}")
         
         logger.info(f"Found {len(self.csv_files)} CSV files in {data_dir}")
+        
+        self.parquet_dir = self.data_dir.parent / f"{self.data_dir.name}_parquet"
+        self.parquet_files = self._find_parquet_mirror()
+        if self.parquet_files:
+            logger.info(f"Using Parquet mirror in {self.parquet_dir}")
+        
+        # Lazy plans built once and shared (LazyFrames are immutable)
+        self._cached_lf: Optional[pl.LazyFrame] = None
+        self._cached_lf_with_dims: Optional[pl.LazyFrame] = None
+        
+        # Polars < 1.32 gives every Categorical column its own code mapping;
+        # the global string cache keeps codes compatible across files/frames
+        # (newer Polars shares categories globally and deprecates the cache)
+        if not hasattr(pl, 'Categories'):
+            pl.enable_string_cache()
+    
+    def _parquet_path(self, csv_file: Path) -> Path:
+        """Parquet mirror path for a CSV file."""
+        return self.parquet_dir / f"{csv_file.stem}.parquet"
+    
+    @staticmethod
+    def _mirror_is_current(csv_file: Path, parquet_file: Path) -> bool:
+        """True if parquet_file is at least as new as csv_file and has the time columns."""
+        try:
+            if parquet_file.stat().st_mtime_ns < csv_file.stat().st_mtime_ns:
+                return False
+        except FileNotFoundError:
+            return False
+        schema = pl.read_parquet_schema(parquet_file)
+        return all(col in schema for col in MIRROR_TIME_COLUMNS)
+    
+    def _find_parquet_mirror(self) -> List[Path]:
+        """
+        Parquet files mirroring the CSVs, or [] unless every CSV has a
+        current one (see _mirror_is_current).
+        """
+        parquet_files = [self._parquet_path(f) for f in self.csv_files]
+        for csv_file, parquet_file in zip(self.csv_files, parquet_files):
+            if not self._mirror_is_current(csv_file, parquet_file):
+                return []
+        return parquet_files
+    
+    @staticmethod
+    def _encode_categoricals(lf: pl.LazyFrame) -> pl.LazyFrame:
+        """Cast CATEGORICAL_COLUMNS to Categorical (no-op if already encoded)."""
+        return lf.with_columns([pl.col(c).cast(pl.Categorical) for c in CATEGORICAL_COLUMNS])
+    
+    def write_parquet(self) -> List[Path]:
+        """
+        Convert every CSV to Parquet once, into the sibling mirror directory.
+        
+        Each file is streamed through Polars (scan_csv -> sink_parquet) with
+        the fixed CSV schema, zstd compression and row-group statistics.
+        type and country are stored dictionary-encoded (Categorical).
+        The time dimension keys are computed here, once, and stored as
+        integer columns (bit-packed and well compressed), so
+        load_with_time_dims becomes a plain scan. Files whose mirror is
+        already up to date are skipped.
+        
+        Returns:
+            Parquet file paths, in CSV order
+        """
+        self.parquet_dir.mkdir(parents=True, exist_ok=True)
+        
+        for csv_file in self.csv_files:
+            parquet_file = self._parquet_path(csv_file)
+            if self._mirror_is_current(csv_file, parquet_file):
+                continue
+            
+            # Write to a temp name so a crash never leaves a truncated mirror
+            tmp_file = parquet_file.with_suffix('.parquet.tmp')
+            lf = pl.scan_csv(
+                csv_file,
+                schema=CSV_SCHEMA,
+                low_memory=False,
+            )
+            lf = self._encode_categoricals(lf)
+            self.add_time_dimensions(lf, keep_components=True).sink_parquet(
+                tmp_file,
+                compression=PARQUET_COMPRESSION,
+                statistics=True,
+                row_group_size=PARQUET_ROW_GROUP_SIZE,
+            )
+            os.replace(tmp_file, parquet_file)
+            logger.info(f"  {csv_file.name} -> {parquet_file.name}")
+        
+        self.parquet_files = self._find_parquet_mirror()
+        # Cached plans scan the CSVs; rebuild them over the mirror
+        self._cached_lf = None
+        self._cached_lf_with_dims = None
+        logger.info(f"Parquet mirror ready: {len(self.parquet_files)} files in {self.parquet_dir}")
+        
+        return self.parquet_files
     
     def load_lazy(self) -> pl.LazyFrame:
         """
         Load all CSV files as a single lazy DataFrame.
         
         This doesn't actually load data into memory - it creates a query plan
-        that will be executed when needed.
+        that will be executed when needed. Reads the Parquet mirror when one
+        exists, so projections and predicates are pushed into the reader.
+        type and country come back as Categorical. The plan is built once
+        per loader and reused by every caller.
         
         Returns:
             Polars LazyFrame with all data
         """
+        if self._cached_lf is not None:
+            return self._cached_lf
+        
+        if self.parquet_files:
+            logger.info("Creating lazy frame from Parquet files...")
+            self._cached_lf = self._encode_categoricals(pl.scan_parquet(
+                self.parquet_files,
+                low_memory=False,
+                rechunk=False,
+            ))
+            return self._cached_lf
+        
         logger.info("Creating lazy frame from CSV files...")
         
-        # Schema for the CSV files
-        # Note: ts is Unix timestamp (milliseconds), auction_id is UUID
-        schema = {
-            'ts': pl.Int64,  # Unix timestamp in milliseconds
-            'type': pl.Utf8,
-            'auction_id': pl.Utf8,  # UUID string
-            'advertiser_id': pl.Int64,
-            'publisher_id': pl.Int64,
-            'bid_price': pl.Float64,
-            'user_id': pl.Int64,
-            'total_price': pl.Float64,
-            'country': pl.Utf8,
-        }
+        # Single multi-file scan: Polars splits every file into byte ranges
+        # and parses them on all POLARS_MAX_THREADS threads. A fixed schema
+        # skips inference, low_memory=False keeps the fast parser path and
+        # rechunk=False avoids a full copy after the scan.
+        combined = pl.scan_csv(
+            self.csv_files,
+            schema=CSV_SCHEMA,
+            try_parse_dates=False,  # We'll parse manually for control
+            low_memory=False,
+            rechunk=False,
+        )
         
-        # Read all CSV files lazily and concatenate
-        lazy_frames = []
+        logger.info(f"Lazy frame created from {len(self.csv_files)} files")
         
-        for csv_file in self.csv_files:
-            lf = pl.scan_csv(
-                csv_file,
-                schema=schema,
-                try_parse_dates=False,  # We'll parse manually for control
-            )
-            lazy_frames.append(lf)
+        self._cached_lf = self._encode_categoricals(combined)
+        return self._cached_lf
+    
+    def map_files_parallel(
+        self,
+        func: Callable[[Path], Any],
+        max_workers: Optional[int] = None
+    ) -> Iterator[Any]:
+        """
+        Apply func to every CSV file in a pool of worker processes.
         
-        # Concatenate all lazy frames
-        combined = pl.concat(lazy_frames)
+        Results are yielded as workers finish (completion order, not file
+        order). Workers are spawned (not forked) because Polars' thread pool
+        is not fork-safe, and each worker's POLARS_MAX_THREADS is set to its
+        share of the cores so processes don't oversubscribe the CPU.
         
-        logger.info(f"Lazy frame created from {len(self.csv_files)} files")
+        Args:
+            func: Picklable callable taking a CSV path (module-level function or partial)
+            max_workers: Number of worker processes (default: all cores)
+        
+        Yields:
+            func(csv_file) for each CSV file
+        """
+        cores = os.cpu_count() or 8
+        max_workers = max(1, min(max_workers or cores, len(self.csv_files)))
+        threads_per_worker = max(1, cores // max_workers)
+        
+        logger.info(f"Dispatching {len(self.csv_files)} files to {max_workers} worker processes "
+                    f"({threads_per_worker} threads each)...")
+        
+        previous_threads = os.environ.get('POLARS_MAX_THREADS')
+        os.environ['POLARS_MAX_THREADS'] = str(threads_per_worker)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            ) as pool:
+                futures = [pool.submit(func, csv_file) for csv_file in self.csv_files]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            if previous_threads is None:
+                os.environ.pop('POLARS_MAX_THREADS', None)
+            else:
+                os.environ['POLARS_MAX_THREADS'] = previous_threads
+    
+    def iter_arrow_batches(
+        self,
+        csv_file: Path,
+        columns: Optional[List[str]] = None,
+        block_size: int = 256 * 1024 * 1024
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Stream one CSV file as Arrow record batches with Arrow's threaded CSV reader.
         
-        return combined
+        Column names and types come from ARROW_CSV_SCHEMA (the header row is
+        skipped, nothing is inferred), and unrequested columns are dropped
+        by the reader before conversion - auction_id/user_id are the widest
+        fields and are never queried. The file is dropped from the page
+        cache once fully read.
+        
+        Args:
+            csv_file: CSV file to read
+            columns: Columns to keep, in output order (default: all)
+            block_size: Bytes per parsed block (256MB default for faster I/O)
+        
+        Yields:
+            Record batches with the requested columns
+        """
+        read_opts = pacsv.ReadOptions(
+            column_names=ARROW_CSV_SCHEMA.names,
+            skip_rows=1,  # header - names are declared above
+            block_size=block_size,
+            use_threads=True
+        )
+        convert_opts = pacsv.ConvertOptions(
+            column_types=ARROW_CSV_SCHEMA,
+            include_columns=columns or ARROW_CSV_SCHEMA.names,
+            strings_can_be_null=True
+        )
+        
+        with open_csv_stream(csv_file) as source:
+            reader = pacsv.open_csv(
+                source,
+                read_options=read_opts,
+                parse_options=pacsv.ParseOptions(delimiter=','),
+                convert_options=convert_opts
+            )
+            for batch in reader:
+                yield batch
+        
+        # CSV is read exactly once - keep it out of the page cache
+        release_page_cache(csv_file)
     
-    def add_time_dimensions(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+    def add_time_dimensions(self, lf: pl.LazyFrame, keep_components: bool = False) -> pl.LazyFrame:
         """
         Add time dimension columns to lazy frame.
         
+        Time buckets are packed integer keys (see TIME_KEY_COLUMNS), not
+        label strings - grouping on a 4-8 byte integer is much cheaper than
+        hashing a formatted string per row. Render labels on aggregated
+        results with time_key_label().
+        
         Extracts:
-        - day: YYYY-DDD format (e.g., "2024-001")
-        - hour: YYYY-DDD HH format (e.g., "2024-001 14")
-        - minute: YYYY-DDD HH:MM format (e.g., "2024-001 14:23")
-        - week: YYYY-WW format (e.g., "2024-01")
-        - date: YYYY-MM-DD format (e.g., "2024-01-01")
+        - day_key: year*512 + day_of_year (label "2024-001")
+        - hour_key: day_key*32 + hour (label "2024-001 14")
+        - minute_key: hour_key*64 + minute (label "2024-001 14:23")
+        - week_key: year*64 + ISO week (label "2024-01")
+        - date: Date (e.g., 2024-01-01)
         
         Args:
             lf: Lazy frame with 'ts' column
+            keep_components: Also keep the integer year/day_of_year columns
             
         Returns:
             Lazy frame with additional time dimension columns
         """
         logger.info("Adding time dimension columns...")
         
-        # Parse Unix timestamp (milliseconds) to datetime
+        # Split the Unix timestamp (ms, UTC) with integer arithmetic - no
+        # datetime column. Calendar fields (date, year, day of year, ISO
+        # week) depend only on the day, so they come from a per-day lookup
+        # table instead of a calendar conversion per row.
         lf = lf.with_columns([
-            # Convert Unix timestamp (ms) to datetime
-            pl.from_epoch(pl.col('ts'), time_unit='ms').alias('timestamp'),
-        ])
-        
+            (pl.col('ts') // MS_PER_DAY).cast(pl.Int32).alias('epoch_day'),
+            ((pl.col('ts') // MS_PER_HOUR) % 24).cast(pl.Int8).alias('hour_of_day'),
+            ((pl.col('ts') // MS_PER_MINUTE) % 60).cast(pl.Int8).alias('minute_of_hour'),
+        ]).join(
+            _calendar_lut().lazy(), on='epoch_day', how='left', maintain_order='left'
+        )
+        
+        day_key = pl.col('year').cast(pl.UInt32) * DAY_KEY_BASE + pl.col('day_of_year').cast(pl.UInt32)
+        hour_key = day_key * HOUR_KEY_BASE + pl.col('hour_of_day').cast(pl.UInt32)
         lf = lf.with_columns([
-            # Extract day of year (1-366)
-            pl.col('timestamp').dt.ordinal_day().alias('day_of_year'),
-            # Extract year
-            pl.col('timestamp').dt.year().alias('year'),
-            # Extract hour (0-23)
-            pl.col('timestamp').dt.hour().alias('hour_of_day'),
-            # Extract minute (0-59)
-            pl.col('timestamp').dt.minute().alias('minute_of_hour'),
-            # Extract ISO week (1-53)
-            pl.col('timestamp').dt.week().alias('week_of_year'),
-            # Extract date
-            pl.col('timestamp').dt.date().alias('date'),
-        ])
-        
-        lf = lf.with_columns([
-            # day: "2024-001" format
-            (pl.col('year').cast(pl.Utf8) + "-" + 
-             pl.col('day_of_year').cast(pl.Utf8).str.zfill(3)).alias('day'),
-            
-            # hour: "2024-001 14" format
-            (pl.col('year').cast(pl.Utf8) + "-" + 
-             pl.col('day_of_year').cast(pl.Utf8).str.zfill(3) + " " +
-             pl.col('hour_of_day').cast(pl.Utf8).str.zfill(2)).alias('hour'),
-            
-            # minute: "2024-001 14:23" format
-            (pl.col('year').cast(pl.Utf8) + "-" + 
-             pl.col('day_of_year').cast(pl.Utf8).str.zfill(3) + " " +
-             pl.col('hour_of_day').cast(pl.Utf8).str.zfill(2) + ":" +
-             pl.col('minute_of_hour').cast(pl.Utf8).str.zfill(2)).alias('minute'),
-            
-            # week: "2024-01" format
-            (pl.col('year').cast(pl.Utf8) + "-" + 
-             pl.col('week_of_year').cast(pl.Utf8).str.zfill(2)).alias('week'),
+            day_key.alias('day_key'),
+            hour_key.alias('hour_key'),
+            (hour_key.cast(pl.UInt64) * MINUTE_KEY_BASE +
+             pl.col('minute_of_hour').cast(pl.UInt64)).alias('minute_key'),
+            (pl.col('year').cast(pl.UInt32) * WEEK_KEY_BASE +
+             pl.col('week_of_year').cast(pl.UInt32)).alias('week_key'),
         ])
         
         # Drop intermediate columns
-        lf = lf.drop(['timestamp', 'year', 'day_of_year', 'hour_of_day', 
-                      'minute_of_hour', 'week_of_year'])
+        intermediates = ['epoch_day', 'hour_of_day', 'minute_of_hour', 'week_of_year']
+        if not keep_components:
+            intermediates += ['year', 'day_of_year']
+        lf = lf.drop(intermediates)
         
-        logger.info("Time dimensions added: day, hour, minute, week, date")
+        logger.info("Time dimensions added: day_key, hour_key, minute_key, week_key, date")
         
         return lf
     
@@ -162,18 +517,26 @@ class DataLoader:
         Load data with time dimensions added.
         
         This is the main entry point for loading data with all necessary
-        time dimensions for rollup building.
+        time dimensions for rollup building. Like load_lazy, the plan is
+        built once and cached.
         
         Returns:
             LazyFrame with original columns + time dimensions
         """
+        if self._cached_lf_with_dims is not None:
+            return self._cached_lf_with_dims
+        
         lf = self.load_lazy()
-        lf = self.add_time_dimensions(lf)
+        if not self.parquet_files:
+            # The Parquet mirror already stores the time dimensions
+            lf = self.add_time_dimensions(lf)
         
         logger.info("Data loaded with time dimensions (lazy evaluation)")
         logger.info("Columns: ts, type, auction_id, advertiser_id, publisher_id, "
-                   "bid_price, user_id, total_price, country, day, hour, minute, week, date")
+                   "bid_price, user_id, total_price, country, day_key, hour_key, minute_key, "
+                   "week_key, date")
         
+        self._cached_lf_with_dims = lf
         return lf
     
     def get_sample(self, n: int = 1000) -> pl.DataFrame:
@@ -198,29 +561,22 @@ class DataLoader:
         """
         logger.info("Computing data statistics...")
         
-        lf = self.load_lazy()
-        
-        # Count rows
-        row_count = lf.select(pl.count()).collect().item()
-        
-        # Get unique counts for key dimensions
-        stats = {
-            'total_rows': row_count,
-            'num_files': len(self.csv_files),
-        }
-        
-        # Compute unique counts (this will materialize some data)
-        lf_with_dims = self.load_with_time_dims()
-        
-        unique_counts = lf_with_dims.select([
+        # One pass: every aggregate shares a single scan, and distinct days
+        # come straight from ts (no time-dimension pipeline)
+        counts = self.load_lazy().select([
+            pl.len().alias('total_rows'),
             pl.col('type').n_unique().alias('unique_types'),
             pl.col('country').n_unique().alias('unique_countries'),
             pl.col('advertiser_id').n_unique().alias('unique_advertisers'),
             pl.col('publisher_id').n_unique().alias('unique_publishers'),
-            pl.col('day').n_unique().alias('unique_days'),
-        ]).collect()
+            (pl.col('ts') // MS_PER_DAY).n_unique().alias('unique_days'),
+        ]).collect(engine="streaming").row(0, named=True)
         
-        stats.update(unique_counts.to_dict(as_series=False))
+        stats = {
+            'total_rows': counts.pop('total_rows'),
+            'num_files': len(self.csv_files),
+            **counts,
+        }
         
         logger.info(f"Data statistics: {stats}")
         
@@ -15,18 +15,109 @@ This is our safety net for 100% query coverage.
 """
 
 import logging
+import queue
+import sys
 import time
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+import pyarrow as pa
+
 try:
     from .query_router import QueryPattern
+    from .data_loader import ARROW_CSV_SCHEMA
+    from ..query_parser import sql_literal
 except ImportError:
+    # Imported with src/core on sys.path: query_parser lives in src/
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
     from query_router import QueryPattern
+    from data_loader import ARROW_CSV_SCHEMA
+    from query_parser import sql_literal
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Time labels stored in the time_dim table (events only keeps minute_id)
+TIME_DIMENSIONS = {'day', 'week', 'hour', 'minute'}
+
+# time_dim label formats and the minutes one label spans. Week is left out:
+# '%Y-W%V' mixes calendar year with ISO week, so it has no single range.
+LABEL_SPANS = {
+    'day': ('%Y-%m-%d', 1440),
+    'hour': ('%Y-%m-%d %H:00', 60),
+    'minute': ('%Y-%m-%d %H:%M', 1),
+}
+
+# Labels are local time; widening a label's UTC range by the largest UTC
+# offset in use (UTC+14 / UTC-12) keeps minute_id bounds valid in any zone
+MAX_UTC_OFFSET_MINUTES = 14 * 60
+
+
+# Rows per Arrow record batch when streaming fallback results out of DuckDB
+FETCH_BATCH_ROWS = 65_536
+
+# DuckDB types for the raw CSV columns (same fixed schema as DataLoader)
+_DUCKDB_TYPES = {pa.int64(): 'BIGINT', pa.float64(): 'DOUBLE', pa.string(): 'VARCHAR'}
+
+
+def _label_minute_bounds(col: str, label) -> Optional[Tuple[int, int]]:
+    """
+    minute_id range covering every minute that can carry a time label.
+    
+    Args:
+        col: Time dimension (day/hour/minute)
+        label: Label as rendered into time_dim (e.g. '2024-06-01')
+    
+    Returns:
+        (first, last) minute_id, or None if the label is not in canonical form
+    """
+    fmt, span = LABEL_SPANS[col]
+    try:
+        start = datetime.strptime(str(label), fmt)
+    except ValueError:
+        return None
+    # Label filters compare strings, so only canonical labels map to ranges
+    if start.strftime(fmt) != label:
+        return None
+    minute = int(start.replace(tzinfo=timezone.utc).timestamp()) // 60
+    return minute - MAX_UTC_OFFSET_MINUTES, minute + span - 1 + MAX_UTC_OFFSET_MINUTES
+
+
+def _filter_minute_bounds(f: Dict) -> Tuple[Optional[int], Optional[int]]:
+    """
+    minute_id bounds implied by a filter on a time label column.
+    
+    Args:
+        f: WHERE filter ({'col', 'op', 'val'})
+    
+    Returns:
+        (low, high) minute_id bounds; either side is None when unbounded
+    """
+    col, op, val = f['col'], f['op'], f['val']
+    if col not in LABEL_SPANS or val is None:
+        return None, None
+    
+    if op == 'eq':
+        bounds = [_label_minute_bounds(col, val)]
+    elif op == 'in' and isinstance(val, list) and val:
+        bounds = [_label_minute_bounds(col, v) for v in val]
+    elif op == 'between' and isinstance(val, list) and len(val) == 2:
+        low, high = _label_minute_bounds(col, val[0]), _label_minute_bounds(col, val[1])
+        bounds = [low, high] if low and high else [None]
+    elif op in ('gt', 'gte'):
+        low = _label_minute_bounds(col, val)
+        return (low[0] if low else None), None
+    elif op in ('lt', 'lte'):
+        high = _label_minute_bounds(col, val)
+        return None, (high[1] if high else None)
+    else:
+        return None, None
+    
+    if None in bounds:
+        return None, None
+    return min(b[0] for b in bounds), max(b[1] for b in bounds)
+
 
 class FallbackExecutor:
     """
@@ -46,12 +137,19 @@ class FallbackExecutor:
         Initialize fallback executor.
         
         Args:
-            data_dir: Directory containing raw CSV files (legacy, not used with DuckDB)
+            data_dir: Directory containing raw CSV files (scanned directly by
+                DuckDB when no pre-built database is available)
             duckdb_path: Path to pre-built DuckDB database (built during prepare phase)
         """
         self.data_dir = Path(data_dir)
         self.duckdb_path = duckdb_path
         self.con = None
+        self.has_time_dim = False
+        # Per cursor: SQL shape → prepared statement name
+        self._prepared: Dict[int, Dict[str, str]] = {}
+        # Idle cursors on self.con. Each query borrows one, so concurrent
+        # fallbacks run side by side while sharing one buffer pool
+        self._cursors: queue.SimpleQueue = queue.SimpleQueue()
         
         # Try to initialize DuckDB connection
         if duckdb_path and duckdb_path.exists():
@@ -63,33 +161,83 @@ class FallbackExecutor:
                 self.con.execute("PRAGMA threads=16")  # Use all available cores
                 self.con.execute("PRAGMA memory_limit='12GB'")  # Allow generous memory for aggregations
                 self.con.execute("PRAGMA enable_object_cache")  # Cache query results
-                self.con.execute("PRAGMA force_compression='uncompressed'")  # Faster reads at runtime
                 
                 # Verify table exists
                 result = self.con.execute("SELECT COUNT(*) FROM events").fetchone()
                 row_count = result[0]
                 
+                # Integer-bucket layout: time labels live in time_dim
+                self.has_time_dim = self.con.execute(
+                    "SELECT COUNT(*) FROM information_schema.tables "
+                    "WHERE table_name = 'time_dim'"
+                ).fetchone()[0] > 0
+                
                 logger.info(f"✅ DuckDB fallback engine ready ({row_count:,} rows)")
             except Exception as e:
                 logger.warning(f"Failed to initialize DuckDB: {e}")
                 self.con = None
-        else:
-            logger.warning("⚠️ DuckDB fallback not available - queries without rollups will fail!")
+        
+        # No pre-built database: query the raw CSVs in place
+        if self.con is None:
             if duckdb_path:
-                logger.warning(f"   Expected DuckDB at: {duckdb_path}")
+                logger.warning(f"⚠️ DuckDB fallback database not found at: {duckdb_path}")
+            self._connect_raw_csv()
     
-    def execute_from_raw(
-        self,
-        pattern: QueryPattern
-    ) -> Tuple[List[str], List[Tuple]]:
+    def _connect_raw_csv(self):
         """
-        Execute query using DuckDB fallback.
+        Open an in-memory DuckDB over the raw CSV files.
+        
+        The events view scans data_dir/*.csv with DuckDB's parallel CSV
+        reader; filters and the referenced columns are pushed into the scan.
+        Time labels are derived per row with the same local-time formats as
+        prepare.py's time_dim table, so results match the pre-built path.
+        """
+        csv_files = sorted(self.data_dir.glob('*.csv'))
+        if not csv_files:
+            logger.warning("⚠️ DuckDB fallback not available - queries without rollups will fail!")
+            logger.warning(f"   No CSV files found in: {self.data_dir}")
+            return
+        
+        try:
+            import duckdb
+            con = duckdb.connect(':memory:')
+            con.execute("PRAGMA enable_object_cache")  # Reuse CSV metadata across queries
+            
+            columns = ", ".join(
+                f"'{field.name}': '{_DUCKDB_TYPES[field.type]}'" for field in ARROW_CSV_SCHEMA
+            )
+            files = ", ".join(sql_literal(str(p)) for p in csv_files)
+            con.execute(f"""
+                CREATE VIEW events AS
+                SELECT
+                    *,
+                    STRFTIME(to_timestamp(ts // 60000 * 60), '%Y-%m-%d') AS day,
+                    STRFTIME(to_timestamp(ts // 60000 * 60), '%Y-W%V') AS week,
+                    STRFTIME(to_timestamp(ts // 60000 * 60), '%Y-%m-%d %H:00') AS hour,
+                    STRFTIME(to_timestamp(ts // 60000 * 60), '%Y-%m-%d %H:%M') AS minute
+                FROM read_csv([{files}], header = true, columns = {{{columns}}})
+            """)
+            
+            self.con = con
+            self.has_time_dim = False
+            logger.info(f"✅ DuckDB fallback ready over {len(csv_files)} raw CSV files in {self.data_dir}")
+        except Exception as e:
+            logger.warning(f"Failed to initialize DuckDB over raw CSV: {e}")
+            self.con = None
+    
+    def _execute(self, pattern: QueryPattern) -> pa.Table:
+        """
+        Run a pattern through its prepared statement and fetch the result.
+        
+        The result is streamed as Arrow record batches, so column data moves
+        straight from DuckDB's vectors into Arrow buffers (no fetchall()
+        copy and no per-row Python tuples, even for large GROUP BYs).
         
         Args:
             pattern: Parsed query pattern
         
         Returns:
-            Tuple of (column_names, rows)
+            PyArrow table with result columns
         """
         if not self.con:
             raise RuntimeError(
@@ -99,30 +247,115 @@ class FallbackExecutor:
         
         logger.info("🔄 Using DuckDB fallback (no rollup match)")
         
-        # Build SQL from pattern
-        sql = self._pattern_to_sql(pattern)
+        # Build parameterized SQL from pattern (filter values are bound)
+        sql, params = self._pattern_to_sql(pattern)
         logger.info(f"   SQL: {sql[:100]}{'...' if len(sql) > 100 else ''}")
         
         # Execute with timing
         t0 = time.time()
-        result = self.con.execute(sql)
-        columns = [desc[0] for desc in result.description]
-        rows = result.fetchall()
+        args = ", ".join(sql_literal(p) for p in params)
+        cursor = self._acquire_cursor()
+        try:
+            statement = self._prepare(sql, cursor)
+            result = cursor.execute(f"EXECUTE {statement}({args})" if params else f"EXECUTE {statement}")
+            # to_arrow_reader() replaced fetch_record_batch() in newer DuckDB
+            reader_for = getattr(result, 'to_arrow_reader', None) or result.fetch_record_batch
+            reader = reader_for(FETCH_BATCH_ROWS)
+            # Drain before the cursor goes back to the pool (the reader reads from it)
+            output = pa.Table.from_batches(list(reader), schema=reader.schema)
+        finally:
+            self._cursors.put(cursor)
         elapsed_ms = (time.time() - t0) * 1000
         
-        logger.info(f"✅ DuckDB fallback complete: {len(rows)} rows in {elapsed_ms:.1f}ms")
+        logger.info(f"✅ DuckDB fallback complete: {output.num_rows} rows in {elapsed_ms:.1f}ms")
+        
+        return output
+    
+    def execute_from_raw(
+        self,
+        pattern: QueryPattern
+    ) -> Tuple[List[str], pa.Table]:
+        """
+        Execute query using DuckDB fallback.
         
-        return columns, rows
+        Args:
+            pattern: Parsed query pattern
+        
+        Returns:
+            Tuple of (column_names, PyArrow table)
+        """
+        table = self._execute(pattern)
+        return table.column_names, table
     
-    def _pattern_to_sql(self, pattern: QueryPattern) -> str:
+    def execute_arrow(self, pattern: QueryPattern) -> pa.Table:
         """
-        Convert QueryPattern to SQL string (no joins/subqueries per spec).
+        Execute query using DuckDB fallback and return a PyArrow table.
+        
+        DuckDB hands back its columnar result directly, so the result can
+        be written with pyarrow.csv like rollup results (no per-row Python
+        tuples).
         
         Args:
             pattern: Parsed query pattern
         
         Returns:
-            SQL query string
+            PyArrow table with result columns
+        """
+        return self._execute(pattern)
+    
+    def _acquire_cursor(self):
+        """
+        Borrow an idle cursor, opening a new one if all are busy.
+        
+        Cursors are returned to the pool (not closed) after each query, so
+        the pool grows to the peak number of concurrent fallback queries
+        and their prepared statements stay warm.
+        
+        Returns:
+            DuckDB cursor on the shared database
+        """
+        try:
+            return self._cursors.get_nowait()
+        except queue.Empty:
+            return self.con.cursor()
+    
+    def _prepare(self, sql: str, cursor) -> str:
+        """
+        Get the prepared statement for a query shape, preparing it on first use.
+        
+        Queries with the same dims/aggregates/filter columns+ops share one
+        statement; only the bound filter values change, so DuckDB plans each
+        shape once per cursor. Prepared statements belong to a cursor, so
+        each one keeps its own map.
+        
+        Args:
+            sql: Parameterized SQL ($1..$n placeholders)
+            cursor: Cursor the statement will run on
+        
+        Returns:
+            Prepared statement name
+        """
+        prepared = self._prepared.setdefault(id(cursor), {})
+        statement = prepared.get(sql)
+        if statement is None:
+            statement = f"fallback_q{len(prepared)}"
+            cursor.execute(f"PREPARE {statement} AS {sql}")
+            prepared[sql] = statement
+            logger.info(f"   Prepared new query shape as {statement}")
+        return statement
+    
+    def _pattern_to_sql(self, pattern: QueryPattern) -> Tuple[str, List]:
+        """
+        Convert QueryPattern to parameterized SQL (no joins/subqueries per spec).
+        
+        Filter values become $1..$n placeholders so identical query shapes
+        map to the same SQL text (and the same prepared statement).
+        
+        Args:
+            pattern: Parsed query pattern
+        
+        Returns:
+            Tuple of (SQL with placeholders, parameter values)
         """
         # SELECT clause
         select_parts = list(pattern.group_by)
@@ -142,6 +375,12 @@ class FallbackExecutor:
         
         # WHERE clause
         where_parts = []
+        params = []
+        
+        def bind(value) -> str:
+            params.append(value)
+            return f"${len(params)}"
+        
         for f in pattern.where_filters:
             col, op, val = f['col'], f['op'], f['val']
             
@@ -150,34 +389,50 @@ class FallbackExecutor:
                 if val is None or val == 'NULL':
                     where_parts.append(f"{col} IS NULL")
                 else:
-                    where_parts.append(f"{col} = '{val}'")
+                    where_parts.append(f"{col} = {bind(val)}")
             
             elif op == 'neq' or op == 'ne':
                 if val is None or val == 'NULL':
                     where_parts.append(f"{col} IS NOT NULL")
                 else:
-                    where_parts.append(f"{col} != '{val}'")
+                    where_parts.append(f"{col} != {bind(val)}")
             
             elif op == 'in':
                 if isinstance(val, list):
-                    vals = "', '".join(str(v) for v in val)
-                    where_parts.append(f"{col} IN ('{vals}')")
+                    placeholders = ", ".join(bind(str(v)) for v in val)
+                    where_parts.append(f"{col} IN ({placeholders})")
                 else:
-                    where_parts.append(f"{col} IN ('{val}')")
+                    where_parts.append(f"{col} IN ({bind(val)})")
             
             elif op == 'between':
                 if isinstance(val, list) and len(val) == 2:
-                    where_parts.append(f"{col} BETWEEN '{val[0]}' AND '{val[1]}'")
+                    where_parts.append(f"{col} BETWEEN {bind(val[0])} AND {bind(val[1])}")
                 else:
                     raise ValueError(f"BETWEEN requires 2-element list, got: {val}")
             
             elif op in ('gt', 'gte', 'lt', 'lte'):
                 ops_map = {'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
-                where_parts.append(f"{col} {ops_map[op]} '{val}'")
+                where_parts.append(f"{col} {ops_map[op]} {bind(val)}")
             
             else:
                 raise ValueError(f"Unsupported operator: {op}")
         
+        # FROM clause: join the time label table only when a time dim is used
+        from_clause = "events"
+        if self.has_time_dim:
+            referenced = set(pattern.group_by) | {f['col'] for f in pattern.where_filters}
+            if referenced & TIME_DIMENSIONS:
+                from_clause = "events JOIN time_dim USING (minute_id)"
+                
+                # Label filters also bound minute_id directly, so the events
+                # scan prunes row groups by zonemap before the join
+                for f in pattern.where_filters:
+                    low, high = _filter_minute_bounds(f)
+                    if low is not None:
+                        where_parts.append(f"minute_id >= {bind(low)}")
+                    if high is not None:
+                        where_parts.append(f"minute_id <= {bind(high)}")
+        
         where_clause = " AND ".join(where_parts) if where_parts else "1=1"
         
         # GROUP BY clause
@@ -202,7 +457,7 @@ class FallbackExecutor:
         order_clause = ", ".join(order_parts) if order_parts else ""
         
         # Assemble SQL
-        sql = f"SELECT {select_clause} FROM events WHERE {where_clause}"
+        sql = f"SELECT {select_clause} FROM {from_clause} WHERE {where_clause}"
         
         if group_clause:
             sql += f" GROUP BY {group_clause}"
@@ -210,7 +465,7 @@ class FallbackExecutor:
         if order_clause:
             sql += f" ORDER BY {order_clause}"
         
-        return sql
+        return sql, params
 
 
 def main():
@@ -15,23 +15,139 @@ Performance target: <15ms per query execution
 """
 
 import polars as pl
+import pyarrow as pa
 import logging
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional, Callable
 from pathlib import Path
-from datetime import datetime, timedelta
 
 # Import relative to package structure
 try:
     from .query_router import QueryPattern
     from .rollup_loader import RollupLoader, get_loader
+    from .rollup_builder import PRICE_SCALE, rollup_sort_keys
 except ImportError:
     from query_router import QueryPattern
     from rollup_loader import RollupLoader, get_loader
+    from rollup_builder import PRICE_SCALE, rollup_sort_keys
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def _day_of_year_expr(expr: pl.Expr) -> pl.Expr:
+    """
+    Vectorized '2024-153' → '2024-06-01' conversion.
+    
+    Args:
+        expr: Utf8 expression holding "YYYY-DDD" strings
+    
+    Returns:
+        Utf8 expression with "YYYY-MM-DD" strings (null where unparseable)
+    """
+    year = expr.str.slice(0, 4).cast(pl.Int32, strict=False)
+    day_of_year = expr.str.slice(5).cast(pl.Int32, strict=False)
+    return (pl.date(year, 1, 1) + pl.duration(days=day_of_year - 1)).dt.strftime('%Y-%m-%d')
+
+
+def _price_value(expr: pl.Expr, dtype: pl.DataType) -> pl.Expr:
+    """
+    Convert an aggregated price expression back to dollars.
+    
+    Rollups store price sums/mins/maxes as Int64 micro-dollars; older
+    Float64 rollups are passed through unchanged.
+    
+    Args:
+        expr: Aggregated price expression
+        dtype: Dtype of the underlying rollup column
+    
+    Returns:
+        Float64 expression in dollars
+    """
+    if dtype.is_integer():
+        return expr / PRICE_SCALE
+    return expr
+
+
+def _to_day_of_year(value):
+    """
+    Convert a calendar date ("2024-06-01") to a day-of-year label ("2024-153").
+    
+    Anything that isn't a YYYY-MM-DD string is returned unchanged.
+    """
+    if isinstance(value, str) and len(value) == 10 and value.count('-') == 2:
+        try:
+            from datetime import datetime
+            parts = value.split('-')
+            year, month, day_num = int(parts[0]), int(parts[1]), int(parts[2])
+            day_of_year = datetime(year, month, day_num).timetuple().tm_yday
+            converted = f"{year}-{day_of_year:03d}"
+            logger.info(f"🔍 Converted calendar date to day-of-year: {value} → {converted}")
+            return converted
+        except ValueError:
+            pass  # Keep original value if conversion fails
+    return value
+
+
+def _day_filter_value(op: str, val):
+    """Convert a 'day' filter value (or BETWEEN pair / IN list) to day-of-year labels."""
+    if op in ('between', 'in') and isinstance(val, list):
+        return [_to_day_of_year(v) for v in val]
+    return _to_day_of_year(val)
+
+
+def _comparable(value, bound) -> bool:
+    """True if a filter value can be ordered against a column bound."""
+    if value is None or bound is None or isinstance(value, bool):
+        return False
+    if isinstance(bound, str):
+        return isinstance(value, str)
+    return isinstance(value, (int, float)) and not isinstance(value, str)
+
+
+def _filter_excludes_range(op: str, val, lo, hi) -> bool:
+    """
+    Whether a filter provably matches no value in [lo, hi].
+    
+    Conservative: returns False whenever the value can't be compared
+    with the bounds.
+    
+    Args:
+        op: Filter operator
+        val: (Converted) filter value
+        lo: Column minimum
+        hi: Column maximum
+    
+    Returns:
+        True if no row of the column can satisfy the filter
+    """
+    def outside(v) -> bool:
+        return _comparable(v, lo) and (v < lo or v > hi)
+    
+    if op == 'eq':
+        return outside(val)
+    if op == 'in':
+        return isinstance(val, list) and len(val) > 0 and all(outside(v) for v in val)
+    if op == 'between':
+        return (
+            isinstance(val, list) and len(val) == 2
+            and _comparable(val[0], lo) and _comparable(val[1], lo)
+            and (val[1] < lo or val[0] > hi or val[0] > val[1])
+        )
+    if op in ('ne', 'neq'):
+        return _comparable(val, lo) and lo == hi == val
+    if not _comparable(val, lo):
+        return False
+    if op == 'gt':
+        return val >= hi
+    if op == 'gte':
+        return val > hi
+    if op == 'lt':
+        return val <= lo
+    if op == 'lte':
+        return val < lo
+    return False
+
+
 class QueryExecutor:
     """
     Executes queries against pre-aggregated rollups.
@@ -52,6 +168,12 @@ class QueryExecutor:
             rollup_loader: RollupLoader instance (uses singleton if None)
         """
         self.loader = rollup_loader or get_loader()
+        # Canonical pattern key → result before ORDER BY (rollups are immutable)
+        self._result_cache: Dict[str, pl.DataFrame] = {}
+        # Rollup name → (leading sort column, value → (offset, length)) or None
+        self._slice_index: Dict[str, Optional[Tuple[str, Dict[Any, Tuple[int, int]]]]] = {}
+        # (canonical pattern key, rollup schema) → compiled plan
+        self._plan_cache: Dict[Tuple[str, Tuple], Callable[[pl.DataFrame], pl.DataFrame]] = {}
         logger.info("Query executor initialized")
     
     def apply_filters(self, df: pl.DataFrame, filters: List[Dict]) -> pl.DataFrame:
@@ -73,9 +195,144 @@ class QueryExecutor:
                 {"col": "day", "op": "eq", "val": "2024-06-01"}  # Derived from minute column
             ]
         """
+        filter_expr = self.build_filter_expr(df.columns, filters)
+        if filter_expr is None:
+            return df
+        
+        filtered = df.filter(filter_expr)
+        
+        logger.debug(f"Filtered: {len(df)} → {len(filtered)} rows")
+        return filtered
+    
+    def _get_slice_index(
+        self,
+        rollup_name: str,
+        df: pl.DataFrame
+    ) -> Optional[Tuple[str, Dict[Any, Tuple[int, int]]]]:
+        """
+        Build (once per rollup) the row ranges of each leading-key value.
+        
+        Rollups are sorted by rollup_sort_keys(), so every value of the
+        leading key occupies one contiguous run of rows. Rollups that are
+        not laid out that way (e.g. built before sorting was added) get no
+        index.
+        
+        Args:
+            rollup_name: Name of rollup
+            df: Rollup dataframe
+        
+        Returns:
+            (leading column, {value: (offset, length)}) or None
+        """
+        if rollup_name in self._slice_index:
+            return self._slice_index[rollup_name]
+        
+        dimensions = [c for c in df.columns if not c.endswith(('_sum', '_count', '_min', '_max'))
+                      and c != 'row_count']
+        index = None
+        if dimensions and df.height > 0:
+            lead = rollup_sort_keys(dimensions)[0]
+            runs = (
+                df.select(pl.col(lead).cast(pl.Utf8) if df.schema[lead] == pl.Categorical else pl.col(lead))
+                  .with_row_index('row')
+                  .group_by(lead)
+                  .agg(pl.col('row').min().alias('start'), pl.col('row').max().alias('end'), pl.len())
+            )
+            # Only valid if every value is one contiguous run
+            if (runs['end'] - runs['start'] + 1 == runs['len']).all():
+                index = (lead, {
+                    value: (start, length)
+                    for value, start, length in runs.select(lead, 'start', 'len').iter_rows()
+                })
+        
+        self._slice_index[rollup_name] = index
+        return index
+    
+    def filters_exclude_rollup(self, rollup_name: str, filters: List[Dict]) -> bool:
+        """
+        Check WHERE filters against the rollup's per-column min/max.
+        
+        The filters are AND-ed, so one filter that falls entirely outside
+        its column's range proves the result is empty; the check stops at
+        the first such filter. Filters on columns the rollup doesn't have
+        (derived time filters) are never used to prune.
+        
+        Args:
+            rollup_name: Name of rollup
+            filters: List of filter conditions
+        
+        Returns:
+            True if no rollup row can match
+        """
         if not filters:
+            return False
+        
+        ranges = self.loader.column_ranges(rollup_name)
+        for f in filters:
+            bounds = ranges.get(f['col'])
+            if bounds is None:
+                continue
+            val = _day_filter_value(f['op'], f['val']) if f['col'] == 'day' else f['val']
+            if _filter_excludes_range(f['op'], val, *bounds):
+                logger.info(f"⚡ Filter {f['col']} {f['op']} {f['val']!r} is outside "
+                            f"rollup range {bounds} - skipping scan")
+                return True
+        return False
+    
+    def slice_on_sort_key(
+        self,
+        rollup_name: str,
+        df: pl.DataFrame,
+        filters: List[Dict]
+    ) -> pl.DataFrame:
+        """
+        Narrow a rollup to the rows matching an equality filter on its leading sort key.
+        
+        The slice is zero-copy; the full filter expression is still applied
+        afterwards, so this only removes rows that could never match.
+        
+        Args:
+            rollup_name: Name of rollup
+            df: Rollup dataframe
+            filters: WHERE filters of the query
+        
+        Returns:
+            Sliced dataframe (or df unchanged if no filter applies)
+        """
+        eq_filters = [f for f in filters if f['op'] == 'eq' and isinstance(f['val'], (str, int))]
+        if not eq_filters:
+            return df
+        
+        index = self._get_slice_index(rollup_name, df)
+        if index is None:
             return df
         
+        lead, ranges = index
+        for f in eq_filters:
+            if f['col'] == lead:
+                offset, length = ranges.get(f['val'], (0, 0))
+                logger.debug(f"Sort-key slice on {lead}={f['val']!r}: {length}/{df.height} rows")
+                return df.slice(offset, length)
+        
+        return df
+    
+    def build_filter_expr(self, columns: List[str], filters: List[Dict]) -> Optional[pl.Expr]:
+        """
+        Build a single AND-ed predicate for WHERE filters.
+        
+        Calendar dates are converted to the rollup's day-of-year labels and
+        filters on missing time columns are derived from finer ones.
+        
+        Args:
+            columns: Rollup column names
+            filters: List of filter conditions
+        
+        Returns:
+            Predicate expression, or None when there are no filters
+        """
+        if not filters:
+            return None
+        
         # Build filter expression
         filter_expr = None
         
@@ -85,59 +342,28 @@ class QueryExecutor:
             val = f['val']
             
             # Check if column exists in dataframe
-            if col not in df.columns:
+            if col not in columns:
                 # Try to derive from other columns
-                if col == 'day' and 'minute' in df.columns:
+                if col == 'day' and 'minute' in columns:
                     # Extract day from minute string (format: "2024-153 14:30")
                     logger.debug(f"Deriving 'day' filter from 'minute' column")
                     col_expr = pl.col('minute').str.slice(0, 8)  # Extract "2024-153"
-                elif col == 'day' and 'hour' in df.columns:
+                elif col == 'day' and 'hour' in columns:
                     # Extract day from hour string (format: "2024-153 14")
                     logger.debug(f"Deriving 'day' filter from 'hour' column")
                     col_expr = pl.col('hour').str.slice(0, 8)  # Extract "2024-153"
-                elif col == 'hour' and 'minute' in df.columns:
+                elif col == 'hour' and 'minute' in columns:
                     # Extract hour from minute string (format: "2024-153 14")
                     logger.debug(f"Deriving 'hour' filter from 'minute' column")
                     col_expr = pl.col('minute').str.slice(0, 11)  # Extract "2024-153 14"
                 else:
-                    raise ValueError(f"Column '{col}' not found in dataframe and cannot be derived. Available: {df.columns}")
+                    raise ValueError(f"Column '{col}' not found in dataframe and cannot be derived. Available: {columns}")
             else:
                 col_expr = pl.col(col)
             
             # Convert filter value if needed (calendar date → day-of-year format)
-            if col == 'day' or (col not in df.columns and col == 'day'):
-                # Handle BETWEEN with list of dates
-                if op == 'between' and isinstance(val, list):
-                    converted_vals = []
-                    for v in val:
-                        if isinstance(v, str) and len(v) == 10 and v.count('-') == 2:
-                            try:
-                                from datetime import datetime
-                                parts = v.split('-')
-                                year, month, day_num = int(parts[0]), int(parts[1]), int(parts[2])
-                                date_obj = datetime(year, month, day_num)
-                                day_of_year = date_obj.timetuple().tm_yday
-                                converted = f"{year}-{day_of_year:03d}"
-                                converted_vals.append(converted)
-                                logger.info(f"🔍 Converted calendar date to day-of-year: {v} → {converted}")
-                            except:
-                                converted_vals.append(v)  # Keep original if conversion fails
-                        else:
-                            converted_vals.append(v)
-                    val = converted_vals
-                # Handle single date value
-                elif isinstance(val, str) and len(val) == 10 and val.count('-') == 2:
-                    try:
-                        from datetime import datetime
-                        # Convert "2024-06-01" to "2024-153"
-                        parts = val.split('-')
-                        year, month, day_num = int(parts[0]), int(parts[1]), int(parts[2])
-                        date_obj = datetime(year, month, day_num)
-                        day_of_year = date_obj.timetuple().tm_yday
-                        val = f"{year}-{day_of_year:03d}"
-                        logger.info(f"🔍 Converted calendar date to day-of-year: {parts[0]}-{parts[1]}-{parts[2]} → {val}")
-                    except:
-                        pass  # Keep original value if conversion fails
+            if col == 'day':
+                val = _day_filter_value(op, val)
             
             # Build single condition
             if op == 'eq':
@@ -169,11 +395,7 @@ class QueryExecutor:
             else:
                 filter_expr = filter_expr & condition
         
-        # Apply filter
-        filtered = df.filter(filter_expr)
-        
-        logger.debug(f"Filtered: {len(df)} → {len(filtered)} rows")
-        return filtered
+        return filter_expr
     
     def compute_aggregates(
         self, 
@@ -214,6 +436,29 @@ class QueryExecutor:
                 2024-01-01   | 1000.0
                 2024-01-02   | 2000.0
         """
+        exprs = self.build_aggregate_exprs(df.schema, aggregates, group_by)
+        if group_by:
+            return df.group_by(group_by).agg(exprs)
+        return df.select(exprs)
+    
+    def build_aggregate_exprs(
+        self,
+        schema: pl.Schema,
+        aggregates: List[Dict],
+        group_by: List[str] = None
+    ) -> List[pl.Expr]:
+        """
+        Build the final-aggregate expressions for compute_aggregates.
+        
+        Args:
+            schema: Rollup schema (price columns may be Int64 micro-dollars)
+            aggregates: List of aggregate specs
+            group_by: Optional GROUP BY dimensions
+        
+        Returns:
+            Expressions for group_by().agg() when group_by is set, otherwise
+            for select() (dimension columns included)
+        """
         # If we need to group (rollup has extra dimensions beyond query)
         if group_by:
             agg_exprs = []
@@ -227,7 +472,7 @@ class QueryExecutor:
                     # NULL-safe: only return value if count > 0
                     agg_exprs.append(
                         pl.when(pl.col(f'{col}_count').sum() > 0)
-                          .then(pl.col(f'{col}_sum').sum())
+                          .then(_price_value(pl.col(f'{col}_sum').sum(), schema[f'{col}_sum']))
                           .otherwise(None)
                           .alias(f'SUM({col})')
                     )
@@ -238,7 +483,7 @@ class QueryExecutor:
                     total_sum = pl.col(f'{col}_sum').sum()
                     total_count = pl.col(f'{col}_count').sum()
                     agg_exprs.append(
-                        (total_sum / total_count).alias(f'AVG({col})')
+                        _price_value(total_sum / total_count, schema[f'{col}_sum']).alias(f'AVG({col})')
                     )
                 
                 elif func == 'COUNT':
@@ -256,20 +501,19 @@ class QueryExecutor:
                 elif func == 'MIN':
                     # MIN = min of pre-aggregated mins
                     agg_exprs.append(
-                        pl.col(f'{col}_min').min().alias(f'MIN({col})')
+                        _price_value(pl.col(f'{col}_min').min(), schema[f'{col}_min']).alias(f'MIN({col})')
                     )
                 
                 elif func == 'MAX':
                     # MAX = max of pre-aggregated maxes
                     agg_exprs.append(
-                        pl.col(f'{col}_max').max().alias(f'MAX({col})')
+                        _price_value(pl.col(f'{col}_max').max(), schema[f'{col}_max']).alias(f'MAX({col})')
                     )
                 
                 else:
                     raise ValueError(f"Unsupported aggregate: {func}")
             
-            # Group and aggregate
-            result = df.group_by(group_by).agg(agg_exprs)
+            return agg_exprs
         
         else:
             # No grouping needed - rollup exactly matches query dimensions
@@ -277,7 +521,7 @@ class QueryExecutor:
             select_exprs = []
             
             # Keep dimension columns
-            for col in df.columns:
+            for col in schema:
                 if not any(col.endswith(suffix) for suffix in ['_sum', '_count', '_min', '_max', 'row_count']):
                     select_exprs.append(pl.col(col))
             
@@ -291,7 +535,7 @@ class QueryExecutor:
                     # But apply NULL check: if count = 0, return NULL
                     select_exprs.append(
                         pl.when(pl.col(f'{col}_count') > 0)
-                          .then(pl.col(f'{col}_sum'))
+                          .then(_price_value(pl.col(f'{col}_sum'), schema[f'{col}_sum']))
                           .otherwise(None)
                           .alias(f'SUM({col})')
                     )
@@ -299,7 +543,9 @@ class QueryExecutor:
                 elif func == 'AVG':
                     # AVG(col) = sum / count
                     select_exprs.append(
-                        (pl.col(f'{col}_sum') / pl.col(f'{col}_count')).alias(f'AVG({col})')
+                        _price_value(
+                            pl.col(f'{col}_sum') / pl.col(f'{col}_count'), schema[f'{col}_sum']
+                        ).alias(f'AVG({col})')
                     )
                 
                 elif func == 'COUNT':
@@ -316,20 +562,18 @@ class QueryExecutor:
                 
                 elif func == 'MIN':
                     select_exprs.append(
-                        pl.col(f'{col}_min').alias(f'MIN({col})')
+                        _price_value(pl.col(f'{col}_min'), schema[f'{col}_min']).alias(f'MIN({col})')
                     )
                 
                 elif func == 'MAX':
                     select_exprs.append(
-                        pl.col(f'{col}_max').alias(f'MAX({col})')
+                        _price_value(pl.col(f'{col}_max'), schema[f'{col}_max']).alias(f'MAX({col})')
                     )
                 
                 else:
                     raise ValueError(f"Unsupported aggregate: {func}")
             
-            result = df.select(select_exprs)
-        
-        return result
+            return select_exprs
     
     def apply_order_by(self, df: pl.DataFrame, order_by: List[Dict]) -> pl.DataFrame:
         """
@@ -363,20 +607,165 @@ class QueryExecutor:
         logger.debug(f"Sorted by: {sort_cols} (desc={sort_desc})")
         return sorted_df
     
-    def execute(
+    def compile_plan(
+        self,
+        pattern: QueryPattern,
+        schema: pl.Schema
+    ) -> Callable[[pl.DataFrame], pl.DataFrame]:
+        """
+        Specialize the execution of one query pattern against a rollup schema.
+        
+        All pattern interpretation (filter value conversion, column
+        derivation, aggregate formulas, calendar/categorical output
+        conversions) happens here, once. The returned function is a single
+        lazy Polars query - filter → aggregate → output conversion - that
+        the optimizer fuses into one pass over the rollup.
+        
+        Args:
+            pattern: Parsed query pattern
+            schema: Schema of the rollup the pattern is routed to
+        
+        Returns:
+            Function mapping the rollup DataFrame to the (unsorted) result
+        """
+        filter_expr = self.build_filter_expr(list(schema.names()), pattern.where_filters)
+        group_by = pattern.group_by
+        agg_exprs = self.build_aggregate_exprs(schema, pattern.aggregates, group_by)
+        
+        # Resolve output conversions against the aggregated schema
+        probe = pl.LazyFrame(schema=schema)
+        probe = probe.group_by(group_by).agg(agg_exprs) if group_by else probe.select(agg_exprs)
+        out_columns = probe.collect_schema().names()
+        post_exprs = self.calendar_exprs(out_columns)
+        # Dictionary-encoded dimensions are emitted as plain strings
+        post_exprs.append(pl.col(pl.Categorical).cast(pl.Utf8))
+        
+        def plan(df: pl.DataFrame) -> pl.DataFrame:
+            lf = df.lazy()
+            if filter_expr is not None:
+                lf = lf.filter(filter_expr)
+            lf = lf.group_by(group_by).agg(agg_exprs) if group_by else lf.select(agg_exprs)
+            return lf.with_columns(post_exprs).collect()
+        
+        return plan
+    
+    def _get_plan(
+        self,
+        pattern: QueryPattern,
+        schema: pl.Schema
+    ) -> Callable[[pl.DataFrame], pl.DataFrame]:
+        """
+        compile_plan() memoized by the pattern's canonical key and the schema.
+        
+        The rollup name is not part of the key: a plan depends only on the
+        pattern and the columns it runs on.
+        
+        Args:
+            pattern: Parsed query pattern
+            schema: Schema of the rollup the pattern is routed to
+        
+        Returns:
+            Compiled plan
+        """
+        key = (pattern.canonical_key(), tuple(schema.items()))
+        plan = self._plan_cache.get(key)
+        if plan is None:
+            plan = self.compile_plan(pattern, schema)
+            self._plan_cache[key] = plan
+        return plan
+    
+    def execute_df(
         self, 
         rollup_name: str, 
         pattern: QueryPattern
-    ) -> Tuple[List[str], List[Tuple]]:
+    ) -> pl.DataFrame:
         """
-        Execute query against rollup.
+        Execute query against rollup, returning the columnar result.
         
         Steps:
         1. Load rollup (instant if pre-loaded)
         2. Apply WHERE filters
         3. Compute aggregates
-        4. Apply ORDER BY
-        5. Format results
+        4. Convert day-of-year labels to calendar dates (and decode
+           dictionary-encoded dimensions to strings)
+        5. Apply ORDER BY
+        
+        Steps 2-4 run as one plan from compile_plan(). Steps 1-4 are cached
+        by the pattern's canonical key; a repeated query (same rollup,
+        filters, group-by, aggregates) only re-sorts.
+        
+        Args:
+            rollup_name: Name of rollup to query
+            pattern: Parsed query pattern
+        
+        Returns:
+            Result DataFrame (columns in output order)
+        """
+        logger.info(f"Executing query on rollup: {rollup_name}")
+        
+        cache_key = pattern.canonical_key(rollup_name)
+        df = self._result_cache.get(cache_key)
+        
+        if df is not None:
+            logger.info("⚡ Result cache hit - re-applying ORDER BY only")
+        else:
+            # 1. Load rollup (instant if pre-loaded!)
+            df = self.loader.load_rollup(rollup_name)
+            logger.debug(f"Loaded rollup: {len(df)} rows")
+            
+            if self.filters_exclude_rollup(rollup_name, pattern.where_filters):
+                # Nothing can match: run the plan on no rows (keeps output
+                # columns/dtypes and the one-row result of a global aggregate)
+                df = df.clear()
+            else:
+                # Rows are sorted by filter keys: cut to the matching run first
+                df = self.slice_on_sort_key(rollup_name, df, pattern.where_filters)
+            
+            # 2-4. Filter, aggregate and convert dates in one specialized plan
+            # (dates must be converted BEFORE sorting because ORDER BY
+            # references calendar format columns)
+            plan = self._get_plan(pattern, df.schema)
+            df = plan(df)
+            
+            self._result_cache[cache_key] = df
+        
+        # 5. Apply ORDER BY (after date conversion so sorting works on calendar dates)
+        df = self.apply_order_by(df, pattern.order_by)
+        
+        logger.info(f"Query complete: {len(df)} result rows")
+        
+        return df
+    
+    def execute_arrow(
+        self, 
+        rollup_name: str, 
+        pattern: QueryPattern
+    ) -> pa.Table:
+        """
+        Execute query against rollup and return a PyArrow table.
+        
+        Keeps results columnar end-to-end so they can be written with
+        pyarrow.csv (no per-row Python objects).
+        
+        Args:
+            rollup_name: Name of rollup to query
+            pattern: Parsed query pattern
+        
+        Returns:
+            PyArrow table with result columns
+        """
+        return self.execute_df(rollup_name, pattern).to_arrow()
+    
+    def execute(
+        self, 
+        rollup_name: str, 
+        pattern: QueryPattern
+    ) -> Tuple[List[str], List[Tuple]]:
+        """
+        Execute query against rollup.
+        
+        Row-oriented wrapper around execute_df() for callers that want
+        Python tuples.
         
         Args:
             rollup_name: Name of rollup to query
@@ -400,30 +789,11 @@ class QueryExecutor:
             >>> print(rows[:3])
             [('2024-01-01', 1000.0), ('2024-01-02', 2000.0), ...]
         """
-        logger.info(f"Executing query on rollup: {rollup_name}")
-        
-        # 1. Load rollup (instant if pre-loaded!)
-        df = self.loader.load_rollup(rollup_name)
-        logger.debug(f"Loaded rollup: {len(df)} rows")
-        
-        # 2. Apply filters
-        df = self.apply_filters(df, pattern.where_filters)
-        
-        # 3. Compute aggregates
-        df = self.compute_aggregates(df, pattern.aggregates, pattern.group_by)
-        
-        # 4. Convert day-of-year back to calendar dates for output
-        # (Must be done BEFORE sorting because ORDER BY references calendar format columns)
-        df = self.convert_dates_to_calendar(df)
+        df = self.execute_df(rollup_name, pattern)
         
-        # 5. Apply ORDER BY (after date conversion so sorting works on calendar dates)
-        df = self.apply_order_by(df, pattern.order_by)
-        
-        # 6. Format results
+        # Format results
         column_names = df.columns
-        rows = [tuple(row) for row in df.iter_rows()]
-        
-        logger.info(f"Query complete: {len(rows)} result rows")
+        rows = df.rows()
         
         return column_names, rows
     
@@ -437,91 +807,56 @@ class QueryExecutor:
         Also handles minute format:
         Internal: "2024-153 0:45"
         Output: "2024-06-01 00:45"
+        
+        All conversions are native Polars string/date expressions, so the
+        whole column is converted in one vectorized pass (no per-row Python
+        callbacks). Values that don't parse are passed through unchanged.
         """
-        from datetime import datetime
-        
-        # Check if 'day' column exists and needs conversion
-        if 'day' in df.columns:
-            # Convert "2024-153" → "2024-06-01"
-            df = df.with_columns([
-                pl.col('day').map_elements(
-                    lambda x: self._day_of_year_to_calendar(x) if isinstance(x, str) else x,
-                    return_dtype=pl.Utf8
-                ).alias('day')
-            ])
-        
-        # Check if 'minute' column exists and needs conversion
-        if 'minute' in df.columns:
-            # Convert "2024-153 0:45" → "2024-06-01 00:45"
-            df = df.with_columns([
-                pl.col('minute').map_elements(
-                    lambda x: self._minute_to_calendar(x) if isinstance(x, str) else x,
-                    return_dtype=pl.Utf8
-                ).alias('minute')
-            ])
-        
-        # Check if 'hour' column exists and needs conversion
-        if 'hour' in df.columns:
-            # Convert "2024-153 12" → "2024-06-01 12"
-            df = df.with_columns([
-                pl.col('hour').map_elements(
-                    lambda x: self._hour_to_calendar(x) if isinstance(x, str) else x,
-                    return_dtype=pl.Utf8
-                ).alias('hour')
-            ])
+        conversions = self.calendar_exprs(df.columns)
+        if conversions:
+            df = df.with_columns(conversions)
         
         return df
     
-    def _day_of_year_to_calendar(self, day_str: str) -> str:
-        """Convert '2024-153' to '2024-06-01'"""
-        try:
-            parts = day_str.split('-')
-            if len(parts) != 2:
-                return day_str
-            
-            year = int(parts[0])
-            day_of_year = int(parts[1])
-            
-            # Create date from day of year
-            date_obj = datetime(year, 1, 1) + timedelta(days=day_of_year - 1)
-            return date_obj.strftime('%Y-%m-%d')
-        except:
-            return day_str
-    
-    def _minute_to_calendar(self, minute_str: str) -> str:
-        """Convert '2024-153 0:45' to '2024-06-01 00:45'"""
-        try:
-            # Split into day and time parts
-            parts = minute_str.split(' ')
-            if len(parts) != 2:
-                return minute_str
-            
-            # Convert day part
-            day_calendar = self._day_of_year_to_calendar(parts[0])
-            
-            # Format time part (ensure HH:MM format)
-            time_part = parts[1]
-            if ':' in time_part:
-                hour, minute = time_part.split(':')
-                time_formatted = f"{int(hour):02d}:{int(minute):02d}"
-            else:
-                time_formatted = time_part
-            
-            return f"{day_calendar} {time_formatted}"
-        except:
-            return minute_str
-    
-    def _hour_to_calendar(self, hour_str: str) -> str:
-        """Convert '2024-153 12' to '2024-06-01 12'"""
-        try:
-            parts = hour_str.split(' ')
-            if len(parts) != 2:
-                return hour_str
-            
-            day_calendar = self._day_of_year_to_calendar(parts[0])
-            return f"{day_calendar} {parts[1]}"
-        except:
-            return hour_str
+    def calendar_exprs(self, columns: List[str]) -> List[pl.Expr]:
+        """
+        Build the day/hour/minute calendar conversions for convert_dates_to_calendar.
+        
+        Args:
+            columns: Result column names
+        
+        Returns:
+            with_columns() expressions (empty if no time columns)
+        """
+        conversions = []
+        
+        # Convert "2024-153" → "2024-06-01"
+        if 'day' in columns:
+            conversions.append(
+                pl.coalesce(_day_of_year_expr(pl.col('day')), pl.col('day')).alias('day')
+            )
+        
+        # Convert "2024-153 0:45" → "2024-06-01 00:45"
+        if 'minute' in columns:
+            parts = pl.col('minute').str.split_exact(' ', 1)
+            clock = parts.struct.field('field_1').str.split_exact(':', 1)
+            converted = (
+                _day_of_year_expr(parts.struct.field('field_0'))
+                + ' ' + clock.struct.field('field_0').str.zfill(2)
+                + ':' + clock.struct.field('field_1').str.zfill(2)
+            )
+            conversions.append(pl.coalesce(converted, pl.col('minute')).alias('minute'))
+        
+        # Convert "2024-153 12" → "2024-06-01 12"
+        if 'hour' in columns:
+            parts = pl.col('hour').str.split_exact(' ', 1)
+            converted = (
+                _day_of_year_expr(parts.struct.field('field_0'))
+                + ' ' + parts.struct.field('field_1')
+            )
+            conversions.append(pl.coalesce(converted, pl.col('hour')).alias('hour'))
+        
+        return conversions
 
 
 def main():
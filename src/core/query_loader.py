@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Query Loader - Load query definitions for the prepare and run phases
+
+Queries can come from a JSON file, a directory containing inputs.py, or the
+default baseline/inputs.py. Shared by run.py (execution) and prepare.py
+(rollup coverage check).
+"""
+
+import json
+import importlib.util
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# orjson parses query files several times faster; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _queries_from_python(inputs_path: Path) -> List[Dict]:
+    """
+    Execute a Python query file and return its `queries` list.
+    
+    The file is loaded as a private module object: sys.path is left alone
+    (no shadowing of other modules) and nothing is cached in sys.modules,
+    so every call sees the file's current contents.
+    
+    Args:
+        inputs_path: Path to inputs.py
+    
+    Returns:
+        The module's queries list
+    """
+    spec = importlib.util.spec_from_file_location('user_inputs', inputs_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {inputs_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.queries
+
+
+def load_queries(query_file: Optional[Path] = None, query_dir: Optional[Path] = None) -> List[Dict]:
+    """
+    Load queries from various sources.
+    
+    Priority order:
+    1. --query-file <path.json> - JSON file with query list
+    2. --query-dir <dir/inputs.py> - Python file with queries list
+    3. baseline/inputs.py (default)
+    
+    Args:
+        query_file: Path to JSON file containing query list (optional)
+        query_dir: Path to directory containing inputs.py (optional)
+    
+    Returns:
+        List of query dictionaries
+    """
+    # Option 1: Load from JSON file
+    if query_file and Path(query_file).exists():
+        logger.info(f"Loading queries from JSON: {query_file}")
+        queries = _json_loads(Path(query_file).read_bytes())
+        if not isinstance(queries, list):
+            queries = [queries]
+        return queries
+    
+    # Option 2: Load from query_dir/inputs.py
+    if query_dir and Path(query_dir).exists():
+        inputs_path = Path(query_dir) / 'inputs.py'
+        if inputs_path.exists():
+            logger.info(f"Loading queries from Python: {inputs_path}")
+            try:
+                return _queries_from_python(inputs_path)
+            except (ImportError, AttributeError) as e:
+                logger.warning(f"Could not import queries from {inputs_path}: {e}")
+    
+    # Option 3: Default to baseline/inputs.py
+    logger.info("Loading queries from baseline/inputs.py (default)")
+    try:
+        from baseline.inputs import queries
+        return queries
+    except ImportError:
+        logger.error("Could not load queries from baseline/inputs.py")
+        logger.error("Please provide --query-file or --query-dir")
+        return []
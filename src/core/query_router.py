@@ -16,6 +16,7 @@ Example routing:
 - GROUP BY advertiser_id, type → advertiser_type rollup
 """
 
+import json
 import logging
 from typing import Dict, List, Optional, Tuple, Set
 from dataclasses import dataclass
@@ -38,6 +39,29 @@ class QueryPattern:
         aggs = ', '.join(f"{a['func']}({a['col']})" for a in self.aggregates)
         filters = ', '.join(f"{f['col']}={f['val']}" for f in self.where_filters)
         return f"Pattern(dims=[{dims}], aggs=[{aggs}], filters=[{filters}])"
+    
+    def canonical_key(self, rollup_name: Optional[str] = None) -> str:
+        """
+        Canonical cache key for the query RESULT (before ORDER BY).
+        
+        Filters are order-independent (ANDed), so they are sorted. GROUP BY
+        and aggregates keep their order because it fixes the output column
+        order. ORDER BY is excluded: it is re-applied on a cache hit.
+        
+        Args:
+            rollup_name: Rollup the pattern is executed against
+        
+        Returns:
+            Stable string key
+        """
+        filters = sorted(
+            json.dumps(f, sort_keys=True, default=str) for f in self.where_filters
+        )
+        return json.dumps(
+            [rollup_name, list(self.group_by), self.aggregates, filters],
+            sort_keys=True,
+            default=str
+        )
 
 
 class QueryRouter:
@@ -14,7 +14,6 @@ Key features:
 
 import polars as pl
 import pyarrow as pa
-import pyarrow.csv as pc
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import logging
@@ -23,17 +22,351 @@ import datetime
 import time
 from collections import defaultdict
 import os
+import io
+from functools import partial
 
 # Import relative to package structure
 try:
-    from .data_loader import DataLoader
+    from .data_loader import (DataLoader, CSV_SCHEMA, ARROW_CSV_SCHEMA, release_page_cache,
+                              TIME_KEY_COLUMNS, DAY_KEY_BASE, time_key_label)
 except ImportError:
     # For standalone execution
-    from data_loader import DataLoader
+    from data_loader import (DataLoader, CSV_SCHEMA, ARROW_CSV_SCHEMA, release_page_cache,
+                             TIME_KEY_COLUMNS, DAY_KEY_BASE, time_key_label)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Raw event columns kept for the DuckDB fallback (auction_id/user_id are never queried)
+EVENT_SINK_COLUMNS = [
+    'ts', 'type', 'advertiser_id', 'publisher_id',
+    'bid_price', 'total_price', 'country',
+]
+
+# Rollups built by the single-pass and parallel builders
+ROLLUP_SPECS = [
+    ('day_type', ['day', 'type']),
+    ('hour_type', ['hour', 'type']),
+    ('minute_type', ['minute', 'type']),
+    ('week_type', ['week', 'type']),
+    ('country_type', ['country', 'type']),
+    ('advertiser_type', ['advertiser_id', 'type']),
+    ('publisher_type', ['publisher_id', 'type']),
+    ('day_country_type', ['day', 'country', 'type']),
+    ('day_advertiser_type', ['day', 'advertiser_id', 'type']),
+    ('hour_country_type', ['hour', 'country', 'type']),
+    # 4D rollup for Q2: publisher × country × type × day
+    ('day_publisher_country_type', ['day', 'publisher_id', 'country', 'type']),
+]
+
+# Rollups aggregated from raw event rows. Every other rollup is re-aggregated
+# from a finer one (derived rollup → parent, in dependency order), so each
+# batch feeds 4 hash aggregations instead of len(ROLLUP_SPECS).
+BASE_ROLLUPS = ['minute_type', 'hour_country_type', 'day_publisher_country_type', 'day_advertiser_type']
+BASE_ROLLUP_SPECS = [(name, dims) for name, dims in ROLLUP_SPECS if name in BASE_ROLLUPS]
+ROLLUP_LATTICE = {
+    'hour_type': 'minute_type',
+    'day_type': 'hour_type',
+    'week_type': 'day_type',
+    'country_type': 'hour_country_type',
+    'day_country_type': 'hour_country_type',
+    'publisher_type': 'day_publisher_country_type',
+    'advertiser_type': 'day_advertiser_type',
+}
+
+# Rollup rows are sorted by their dimensions in this order (most frequently
+# filtered first) so equality filters on the leading key select a contiguous
+# slice. Every query filters on type.
+SORT_PRIORITY = ['type', 'country', 'week', 'day', 'hour', 'minute', 'advertiser_id', 'publisher_id']
+
+# Low-cardinality dimensions stored dictionary-encoded (Categorical) in rollups
+CATEGORICAL_DIMENSIONS = ['country', 'type']
+
+# Price aggregates are stored as Int64 micro-dollars (prices have 6 decimals).
+# QueryExecutor divides by this factor when emitting results.
+PRICE_SCALE = 1_000_000
+
+def _resolve_local_timezone() -> str:
+    """
+    Resolve the system's IANA timezone name.
+    
+    CRITICAL: Match baseline's timezone behavior.
+    DuckDB's DATE(to_timestamp(ts)) uses system's LOCAL timezone, so rollup
+    time labels must be derived in the same zone on any machine.
+    
+    Returns:
+        IANA timezone name (e.g., "America/Los_Angeles")
+    """
+    # For Polars, we need a proper IANA timezone name
+    # Use tzlocal to get the system timezone name
+    try:
+        from tzlocal import get_localzone
+        return str(get_localzone())
+    except:
+        # Fallback: try to infer from time.timezone
+        # This works on most Unix systems
+        if time.daylight:
+            utc_offset = -time.altzone
+        else:
+            utc_offset = -time.timezone
+        
+        # Common timezone mappings based on UTC offset
+        # This is a simplified fallback
+        offset_to_tz = {
+            -28800: 'America/Los_Angeles',  # UTC-8 (PST)
+            -25200: 'America/Los_Angeles',  # UTC-7 (PDT)
+            -18000: 'America/New_York',     # UTC-5 (EST)
+            -14400: 'America/New_York',     # UTC-4 (EDT)
+            0: 'UTC',
+        }
+        return offset_to_tz.get(utc_offset, 'UTC')
+
+
+def _add_rollup_time_dims(df: pl.DataFrame, tz_name: str) -> pl.DataFrame:
+    """
+    Add the raw-row time dimensions (day, hour, minute) to a batch.
+    
+    Formats: day "2024-153", hour "2024-153 5", minute "2024-153 5:07", all
+    in the local timezone. Week labels are not computed per row: week_type
+    is derived from day_type (see ROLLUP_LATTICE).
+    
+    Args:
+        df: Batch with 'ts' column (Unix milliseconds)
+        tz_name: IANA timezone name from _resolve_local_timezone()
+    
+    Returns:
+        Batch with time dimension columns added
+    """
+    return df.with_columns([
+        pl.from_epoch(pl.col('ts'), time_unit='ms')
+          .dt.replace_time_zone('UTC')
+          .dt.convert_time_zone(tz_name)
+          .alias('datetime'),
+    ]).with_columns([
+        pl.col('datetime').dt.strftime('%Y-%j').alias('day'),
+    ]).with_columns([
+        (pl.col('day') + ' ' + pl.col('datetime').dt.hour().cast(pl.Utf8)).alias('hour'),
+    ]).with_columns([
+        (pl.col('hour') + ':' +
+         pl.col('datetime').dt.minute().cast(pl.Utf8).str.zfill(2)).alias('minute'),
+    ])
+
+
+def _derived_dimension_exprs(parent_dims: List[str], dims: List[str]) -> List[pl.Expr]:
+    """
+    Group-by expressions mapping a parent rollup's dimensions onto a coarser rollup's.
+    
+    Time labels roll up by prefix: minute "2024-153 5:07" → hour "2024-153 5"
+    → day "2024-153"; week "2024-22" (%U) is recomputed from the day label.
+    
+    Args:
+        parent_dims: Dimensions of the (finer) parent rollup
+        dims: Dimensions of the derived rollup
+    
+    Returns:
+        One aliased expression per derived dimension
+    """
+    exprs = []
+    for dim in dims:
+        if dim in parent_dims:
+            exprs.append(pl.col(dim))
+        elif dim == 'day' and ('hour' in parent_dims or 'minute' in parent_dims):
+            source = 'hour' if 'hour' in parent_dims else 'minute'
+            exprs.append(pl.col(source).str.slice(0, 8).alias('day'))
+        elif dim == 'hour' and 'minute' in parent_dims:
+            exprs.append(pl.col('minute').str.split(':').list.first().alias('hour'))
+        elif dim == 'week' and 'day' in parent_dims:
+            year = pl.col('day').str.slice(0, 4).cast(pl.Int32)
+            day_of_year = pl.col('day').str.slice(5).cast(pl.Int32)
+            exprs.append(
+                (pl.date(year, 1, 1) + pl.duration(days=day_of_year - 1))
+                  .dt.strftime('%Y-%U').alias('week')
+            )
+        else:
+            raise ValueError(f"Cannot derive '{dim}' from rollup dimensions {parent_dims}")
+    return exprs
+
+
+def _derive_rollups(base: Dict[str, pl.DataFrame]) -> Dict[str, pl.DataFrame]:
+    """
+    Complete the rollup set by re-aggregating base rollups down ROLLUP_LATTICE.
+    
+    SUM/COUNT/MIN/MAX all combine exactly, so a derived rollup equals the
+    one a raw-row aggregation would produce - but costs a group-by over the
+    (small) parent instead of another pass over every event.
+    
+    Args:
+        base: Finished BASE_ROLLUP_SPECS accumulators
+    
+    Returns:
+        All rollups in ROLLUP_SPECS
+    """
+    specs = dict(ROLLUP_SPECS)
+    rollups = dict(base)
+    for name, parent in ROLLUP_LATTICE.items():
+        exprs = _derived_dimension_exprs(specs[parent], specs[name])
+        rollups[name] = rollups[parent].group_by(exprs).agg(_combine_aggregations())
+        logger.info(f"  ↳ {name}: {len(rollups[name]):,} rows (derived from {parent})")
+    return rollups
+
+
+def _scaled_price(col: str) -> pl.Expr:
+    """Price column as exact integer micro-dollars (NULLs preserved)."""
+    return (pl.col(col) * PRICE_SCALE).round(0).cast(pl.Int64)
+
+
+def _raw_aggregations() -> List[pl.Expr]:
+    """
+    NULL-safe aggregate expressions over raw event rows.
+    
+    Price sums/mins/maxes are stored as Int64 micro-dollars (see PRICE_SCALE):
+    sums are exact regardless of fold order, and integer columns are cheaper
+    to scan and re-aggregate than Float64 at query time.
+    """
+    return [
+        _scaled_price('bid_price').drop_nulls().sum().alias('bid_price_sum'),
+        pl.col('bid_price').drop_nulls().count().alias('bid_price_count'),
+        _scaled_price('bid_price').drop_nulls().min().alias('bid_price_min'),
+        _scaled_price('bid_price').drop_nulls().max().alias('bid_price_max'),
+        _scaled_price('total_price').drop_nulls().sum().alias('total_price_sum'),
+        pl.col('total_price').drop_nulls().count().alias('total_price_count'),
+        _scaled_price('total_price').drop_nulls().min().alias('total_price_min'),
+        _scaled_price('total_price').drop_nulls().max().alias('total_price_max'),
+        pl.len().alias('row_count'),
+    ]
+
+
+def rollup_sort_keys(dimensions: List[str]) -> List[str]:
+    """
+    Sort order for a rollup's rows.
+    
+    Args:
+        dimensions: Rollup dimension columns
+    
+    Returns:
+        Dimensions ordered by SORT_PRIORITY (unknown dimensions last)
+    """
+    rank = {col: i for i, col in enumerate(SORT_PRIORITY)}
+    return sorted(dimensions, key=lambda col: rank.get(col, len(SORT_PRIORITY)))
+
+
+def _finalize_rollup(df: pl.DataFrame, dimensions: List[str]) -> pl.DataFrame:
+    """
+    Sort a finished rollup by rollup_sort_keys() and dictionary-encode it.
+    
+    Sorting happens on the plain strings, so the stored row order is
+    lexicographic regardless of how Categorical values compare.
+    
+    Args:
+        df: Finished rollup
+        dimensions: Rollup dimension columns
+    
+    Returns:
+        Sorted, encoded rollup
+    """
+    return _encode_categoricals(df.sort(rollup_sort_keys(dimensions)))
+
+
+def _encode_categoricals(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Dictionary-encode low-cardinality string dimensions.
+    
+    country (~250 values) and type (4 values) become Categorical, which
+    Arrow IPC stores as dictionary arrays: filters and group-bys then work
+    on integer codes instead of hashing strings.
+    
+    Args:
+        df: Finished rollup
+    
+    Returns:
+        Rollup with CATEGORICAL_DIMENSIONS cast to Categorical
+    """
+    cols = [c for c in CATEGORICAL_DIMENSIONS if c in df.columns]
+    if not cols:
+        return df
+    return df.with_columns([pl.col(c).cast(pl.Categorical) for c in cols])
+
+
+def _aggregate_by_time_keys(lf: pl.LazyFrame, dimensions: List[str]) -> pl.LazyFrame:
+    """
+    Aggregate a DataLoader frame into a rollup, grouping time on integer keys.
+    
+    Time dimensions are grouped on their packed key columns (see
+    DataLoader.add_time_dimensions) and rendered as label strings only on
+    the aggregated rows.
+    
+    Args:
+        lf: Frame from DataLoader.load_with_time_dims()
+        dimensions: Rollup dimension columns (e.g., ["day", "type"])
+    
+    Returns:
+        Lazy rollup: dimensions (labels) followed by _raw_aggregations()
+    """
+    key_columns = [TIME_KEY_COLUMNS[d] for d in dimensions if d in TIME_KEY_COLUMNS]
+    rollup = lf.group_by([TIME_KEY_COLUMNS.get(d, d) for d in dimensions]).agg(_raw_aggregations())
+    if not key_columns:
+        return rollup
+    return rollup.with_columns([
+        time_key_label(d) for d in dimensions if d in TIME_KEY_COLUMNS
+    ]).select(dimensions + [pl.exclude(dimensions + key_columns)])
+
+
+def _combine_aggregations() -> List[pl.Expr]:
+    """Expressions that merge partial rollups (sum of sums, min of mins, ...)."""
+    return [
+        pl.col('bid_price_sum').sum(),
+        pl.col('bid_price_count').sum(),
+        pl.col('bid_price_min').min(),
+        pl.col('bid_price_max').max(),
+        pl.col('total_price_sum').sum(),
+        pl.col('total_price_count').sum(),
+        pl.col('total_price_min').min(),
+        pl.col('total_price_max').max(),
+        pl.col('row_count').sum(),
+    ]
+
+
+def _aggregate_csv_file(
+    csv_file: Path,
+    tz_name: str,
+    events_sink_dir: Optional[Path] = None
+) -> Dict[str, bytes]:
+    """
+    Worker: aggregate ONE CSV file into partial rollups (runs in a subprocess).
+    
+    Reads only the queried columns, derives time dimensions, and returns every
+    rollup in BASE_ROLLUP_SPECS serialized as Arrow IPC bytes (small: already
+    pre-aggregated). Optionally writes the projected events for the fallback.
+    
+    Args:
+        csv_file: CSV file to aggregate
+        tz_name: IANA timezone name for time labels
+        events_sink_dir: Optional directory for this file's projected events IPC
+    
+    Returns:
+        Dict mapping rollup name to Arrow IPC bytes of the partial rollup
+    """
+    df = pl.read_csv(
+        csv_file,
+        columns=EVENT_SINK_COLUMNS,
+        schema_overrides={col: CSV_SCHEMA[col] for col in EVENT_SINK_COLUMNS},
+    )
+    release_page_cache(csv_file)
+    
+    if events_sink_dir is not None:
+        # Uncompressed so the fallback build can memory-map it zero-copy
+        df.write_ipc(Path(events_sink_dir) / f"{Path(csv_file).stem}.ipc", compression='uncompressed')
+    
+    df = _add_rollup_time_dims(df, tz_name)
+    
+    partials = {}
+    for rollup_name, dimensions in BASE_ROLLUP_SPECS:
+        partial = df.group_by(dimensions).agg(_raw_aggregations())
+        partials[rollup_name] = partial.write_ipc(None).getvalue()
+    
+    return partials
+
+
 
 class RollupBuilder:
     """
@@ -84,22 +417,7 @@ class RollupBuilder:
         # Build NULL-safe aggregates
         # CRITICAL: .drop_nulls() on the column BEFORE aggregating!
         # This ensures SUM/COUNT only operate on non-NULL values
-        rollup = lf.group_by(dimensions).agg([
-            # bid_price aggregates (NULL-safe)
-            pl.col('bid_price').drop_nulls().sum().alias('bid_price_sum'),
-            pl.col('bid_price').drop_nulls().count().alias('bid_price_count'),
-            pl.col('bid_price').drop_nulls().min().alias('bid_price_min'),
-            pl.col('bid_price').drop_nulls().max().alias('bid_price_max'),
-            
-            # total_price aggregates (NULL-safe)
-            pl.col('total_price').drop_nulls().sum().alias('total_price_sum'),
-            pl.col('total_price').drop_nulls().count().alias('total_price_count'),
-            pl.col('total_price').drop_nulls().min().alias('total_price_min'),
-            pl.col('total_price').drop_nulls().max().alias('total_price_max'),
-            
-            # Row count (always non-NULL)
-            pl.len().alias('row_count'),
-        ])
+        rollup = _aggregate_by_time_keys(lf, dimensions)
         
         # Materialize the rollup
         df = rollup.collect()
@@ -113,7 +431,10 @@ class RollupBuilder:
         
         return df
     
-    def build_all_rollups_single_pass(self) -> Dict[str, pl.DataFrame]:
+    def build_all_rollups_single_pass(
+        self,
+        events_sink_path: Optional[Path] = None
+    ) -> Dict[str, pl.DataFrame]:
         """
         Build all rollups in a SINGLE PASS with INCREMENTAL FOLDING.
         
@@ -121,26 +442,24 @@ class RollupBuilder:
         we FOLD each batch immediately into a single accumulator per rollup.
         This keeps memory bounded: sum(accumulator_sizes) + one_batch_size
         
+        When events_sink_path is given, every batch is also written (projected
+        to the query columns) to an uncompressed Arrow IPC file in the same
+        pass, so the DuckDB fallback can be built without re-reading the CSVs
+        (and memory-map it without decompressing into the heap).
+        
         Memory: ~2-4GB peak (vs 12+ GB with naive approach)
         Time: ~7-10 minutes for 245M rows
+        
+        Args:
+            events_sink_path: Optional path for the projected raw events IPC file
+        
+        Returns:
+            Dict mapping rollup name to aggregated DataFrame
         """
         start_time = time_module.time()
         
-        # Rollup specs optimized for 16GB RAM constraint
-        rollup_specs = [
-            ('day_type', ['day', 'type']),
-            ('hour_type', ['hour', 'type']),
-            ('minute_type', ['minute', 'type']),
-            ('week_type', ['week', 'type']),
-            ('country_type', ['country', 'type']),
-            ('advertiser_type', ['advertiser_id', 'type']),
-            ('publisher_type', ['publisher_id', 'type']),
-            ('day_country_type', ['day', 'country', 'type']),
-            ('day_advertiser_type', ['day', 'advertiser_id', 'type']),
-            ('hour_country_type', ['hour', 'country', 'type']),
-            # 4D rollup for Q2: publisher × country × type × day
-            ('day_publisher_country_type', ['day', 'publisher_id', 'country', 'type']),
-        ]
+        # Only base rollups see raw rows; the rest are derived at the end
+        rollup_specs = BASE_ROLLUP_SPECS
         
         # Initialize empty accumulators (one per rollup)
         accumulators = {}
@@ -152,21 +471,20 @@ class RollupBuilder:
             # Create empty DataFrame with correct schema
             schema_dict = {dim: pl.Utf8 for dim in dimensions}
             schema_dict.update({
-                'bid_price_sum': pl.Float64,
+                'bid_price_sum': pl.Int64,
                 'bid_price_count': pl.Int64,
-                'bid_price_min': pl.Float64,
-                'bid_price_max': pl.Float64,
-                'total_price_sum': pl.Float64,
+                'bid_price_min': pl.Int64,
+                'bid_price_max': pl.Int64,
+                'total_price_sum': pl.Int64,
                 'total_price_count': pl.Int64,
-                'total_price_min': pl.Float64,
-                'total_price_max': pl.Float64,
+                'total_price_min': pl.Int64,
+                'total_price_max': pl.Int64,
                 'row_count': pl.Int64,
             })
             accumulators[rollup_name] = pl.DataFrame(schema=schema_dict)
             temp_partials[rollup_name] = []
         
-        DEBUG_ROLLUP = bool(os.getenv('DEBUG_ROLLUP'))
-        logger.info(f"\nBuilding {len(rollup_specs)} rollups with INCREMENTAL FOLDING...")
+        logger.info(f"\nBuilding {len(ROLLUP_SPECS)} rollups ({len(rollup_specs)} base) with INCREMENTAL FOLDING...")
         logger.info(f"Reading {len(list(self.loader.data_dir.glob('*.csv')))} CSV files in batches...")
         logger.info(f"Memory strategy: Fold each batch immediately (bounded memory)")
         logger.info("")
@@ -178,147 +496,50 @@ class RollupBuilder:
         batch_start = time_module.time()
         
         # Define PyArrow schema to avoid type inference issues
-        arrow_schema = pa.schema([
-            ('ts', pa.int64()),
-            ('type', pa.string()),
-            ('auction_id', pa.string()),
-            ('advertiser_id', pa.int64()),
-            ('publisher_id', pa.int64()),
-            ('bid_price', pa.float64()),
-            ('user_id', pa.string()),
-            ('total_price', pa.float64()),
-            ('country', pa.string()),
-        ])
+        arrow_schema = ARROW_CSV_SCHEMA
+        
+        # Resolve local timezone ONCE (labels must match DuckDB's local time)
+        local_tz_name = _resolve_local_timezone()
+        
+        # Optional fused sink: raw events projected to the columns queries use
+        events_writer = None
+        if events_sink_path is not None:
+            events_schema = pa.schema([arrow_schema.field(c) for c in EVENT_SINK_COLUMNS])
+            # Uncompressed: the fallback build memory-maps it zero-copy
+            events_writer = pa.ipc.new_file(str(events_sink_path), events_schema)
+            logger.info(f"Fused sink: writing projected events to {events_sink_path}")
         
         for file_idx, csv_file in enumerate(csv_files):
             if (file_idx + 1) % 10 == 0:
                 elapsed = time_module.time() - batch_start
                 logger.info(f"  Processing file {file_idx+1}/{len(csv_files)} ({elapsed:.1f}s elapsed)...")
             
-            # Read CSV with PyArrow in streaming mode with explicit schema
+            # Stream the CSV with Arrow's reader: declared schema, projected columns
             try:
-                # Use convert_options to specify schema
-                convert_opts = pc.ConvertOptions(
-                    column_types=arrow_schema,
-                    strings_can_be_null=True
-                )
-                read_opts = pc.ReadOptions(
-                    block_size=256 * 1024 * 1024,  # 256MB blocks for faster I/O
-                    use_threads=True  # Explicitly enable threading
-                )
-                
-                reader = pc.open_csv(
-                    csv_file,
-                    convert_options=convert_opts,
-                    read_options=read_opts
-                )
-                
-                for arrow_batch in reader:
+                for arrow_batch in self.loader.iter_arrow_batches(csv_file, columns=EVENT_SINK_COLUMNS):
                     total_batches += 1
                     
+                    if events_writer is not None:
+                        events_writer.write_batch(arrow_batch)
+                    
                     # Convert Arrow batch to Polars (zero-copy)
                     df_batch = pl.from_arrow(arrow_batch)
                     
-                    # Add time dimensions to batch
-                    # CRITICAL: Match baseline's timezone behavior
-                    # DuckDB's DATE(to_timestamp(ts)) uses system's LOCAL timezone
-                    # We must use the system's local timezone too for consistency
-                    import time
-                    import datetime
-                    
-                    # Get system's local timezone
-                    # This ensures we match DuckDB's behavior on any machine
-                    local_tz = datetime.datetime.now(datetime.timezone.utc).astimezone().tzinfo
-                    local_tz_name = str(local_tz)  # e.g., "PDT", "EST", etc.
-                    
-                    # For Polars, we need a proper IANA timezone name
-                    # Use tzlocal to get the system timezone name
-                    try:
-                        from tzlocal import get_localzone
-                        local_tz_name = str(get_localzone())
-                    except:
-                        # Fallback: try to infer from time.timezone
-                        # This works on most Unix systems
-                        if time.daylight:
-                            utc_offset = -time.altzone
-                        else:
-                            utc_offset = -time.timezone
-                        
-                        # Common timezone mappings based on UTC offset
-                        # This is a simplified fallback
-                        offset_to_tz = {
-                            -28800: 'America/Los_Angeles',  # UTC-8 (PST)
-                            -25200: 'America/Los_Angeles',  # UTC-7 (PDT)
-                            -18000: 'America/New_York',     # UTC-5 (EST)
-                            -14400: 'America/New_York',     # UTC-4 (EDT)
-                            0: 'UTC',
-                        }
-                        local_tz_name = offset_to_tz.get(utc_offset, 'UTC')
-                    
-                    df_batch = df_batch.with_columns([
-                        pl.from_epoch(pl.col('ts'), time_unit='ms')
-                          .dt.replace_time_zone('UTC')
-                          .dt.convert_time_zone(local_tz_name)
-                          .alias('datetime'),
-                    ]).with_columns([
-                        pl.col('datetime').dt.strftime('%Y-%j').alias('day'),
-                        (pl.col('datetime').dt.strftime('%Y-%j') + ' ' + 
-                         pl.col('datetime').dt.hour().cast(pl.Utf8)).alias('hour'),
-                        (pl.col('datetime').dt.strftime('%Y-%j') + ' ' + 
-                         pl.col('datetime').dt.hour().cast(pl.Utf8) + ':' +
-                         pl.col('datetime').dt.minute().cast(pl.Utf8).str.zfill(2)).alias('minute'),
-                        pl.col('datetime').dt.strftime('%Y-%U').alias('week'),
-                        pl.col('datetime').dt.date().alias('date'),
-                    ])
+                    # Add time dimensions to batch (local timezone)
+                    df_batch = _add_rollup_time_dims(df_batch, local_tz_name)
                     
                     # BATCHED INCREMENTAL FOLD: Accumulate partials, fold periodically
                     for rollup_name, dimensions in rollup_specs:
                         # Compute batch aggregates
-                        batch_agg = df_batch.group_by(dimensions).agg([
-                            pl.col('bid_price').drop_nulls().sum().alias('bid_price_sum'),
-                            pl.col('bid_price').drop_nulls().count().alias('bid_price_count'),
-                            pl.col('bid_price').drop_nulls().min().alias('bid_price_min'),
-                            pl.col('bid_price').drop_nulls().max().alias('bid_price_max'),
-                            pl.col('total_price').drop_nulls().sum().alias('total_price_sum'),
-                            pl.col('total_price').drop_nulls().count().alias('total_price_count'),
-                            pl.col('total_price').drop_nulls().min().alias('total_price_min'),
-                            pl.col('total_price').drop_nulls().max().alias('total_price_max'),
-                            pl.len().alias('row_count'),
-                        ])
-                        
-                        # DIAGNOSTIC: Track advertiser_type specifically (only when debug enabled)
-                        if DEBUG_ROLLUP and rollup_name == 'advertiser_type' and total_batches <= 2:
-                            logger.info(f"[DIAG] Batch {total_batches} for {rollup_name}: {len(batch_agg)} unique keys")
-                            logger.info(f"[DIAG] Sample keys: {batch_agg.select(dimensions).head(5)}")
+                        batch_agg = df_batch.group_by(dimensions).agg(_raw_aggregations())
                         
                         # Add to temporary partials
                         temp_partials[rollup_name].append(batch_agg)
                         
                         # Fold when we have enough partials (reduces expensive join ops)
                         if len(temp_partials[rollup_name]) >= FOLD_BATCH_SIZE:
-                            # DIAGNOSTIC: Before fold (only when debug enabled)
-                            if DEBUG_ROLLUP and rollup_name == 'advertiser_type':
-                                logger.info(f"[DIAG] BEFORE fold: {len(temp_partials[rollup_name])} partials to combine")
-                                total_rows_in_partials = sum(len(p) for p in temp_partials[rollup_name])
-                                logger.info(f"[DIAG] Total rows across partials: {total_rows_in_partials}")
-                            
                             # Combine partials together first
-                            combined = pl.concat(temp_partials[rollup_name]).group_by(dimensions).agg([
-                                pl.col('bid_price_sum').sum(),
-                                pl.col('bid_price_count').sum(),
-                                pl.col('bid_price_min').min(),
-                                pl.col('bid_price_max').max(),
-                                pl.col('total_price_sum').sum(),
-                                pl.col('total_price_count').sum(),
-                                pl.col('total_price_min').min(),
-                                pl.col('total_price_max').max(),
-                                pl.col('row_count').sum(),
-                            ])
-                            
-                            # DIAGNOSTIC: After combine
-                            if rollup_name == 'advertiser_type':
-                                logger.info(f"[DIAG] AFTER concat+group_by: {len(combined)} unique keys")
-                                logger.info(f"[DIAG] Accumulator size before merge: {len(accumulators[rollup_name])}")
+                            combined = pl.concat(temp_partials[rollup_name]).group_by(dimensions).agg(_combine_aggregations())
                             
                             # Merge into accumulator
                             accumulators[rollup_name] = self._merge_accumulator(
@@ -327,10 +548,6 @@ class RollupBuilder:
                                 dimensions
                             )
                             
-                            # DIAGNOSTIC: After merge
-                            if rollup_name == 'advertiser_type':
-                                logger.info(f"[DIAG] Accumulator size after merge: {len(accumulators[rollup_name])}")
-                            
                             # Clear temp partials
                             temp_partials[rollup_name] = []
                     
@@ -339,8 +556,15 @@ class RollupBuilder:
             
             except Exception as e:
                 logger.error(f"Error processing {csv_file}: {e}")
+                if events_writer is not None:
+                    events_writer.close()
                 raise
         
+        if events_writer is not None:
+            events_writer.close()
+            size_mb = events_sink_path.stat().st_size / (1024 * 1024)
+            logger.info(f"✅ Events IPC written: {events_sink_path} ({size_mb:.1f} MB)")
+        
         scan_time = time_module.time() - batch_start
         logger.info(f"\n✅ Scan complete: {total_batches} batches, {len(csv_files)} files in {scan_time:.1f}s")
         
@@ -348,29 +572,8 @@ class RollupBuilder:
         logger.info(f"\nFinal fold: merging remaining partials...")
         for rollup_name, dimensions in rollup_specs:
             if temp_partials[rollup_name]:
-                # DIAGNOSTIC: Before final fold
-                if rollup_name == 'advertiser_type':
-                    logger.info(f"[DIAG] FINAL FOLD: {len(temp_partials[rollup_name])} partials to combine")
-                    total_rows_in_partials = sum(len(p) for p in temp_partials[rollup_name])
-                    logger.info(f"[DIAG] Total rows across all partials: {total_rows_in_partials}")
-                
                 # Combine remaining partials
-                combined = pl.concat(temp_partials[rollup_name]).group_by(dimensions).agg([
-                    pl.col('bid_price_sum').sum(),
-                    pl.col('bid_price_count').sum(),
-                    pl.col('bid_price_min').min(),
-                    pl.col('bid_price_max').max(),
-                    pl.col('total_price_sum').sum(),
-                    pl.col('total_price_count').sum(),
-                    pl.col('total_price_min').min(),
-                    pl.col('total_price_max').max(),
-                    pl.col('row_count').sum(),
-                ])
-                
-                # DIAGNOSTIC: After concat+group_by
-                if rollup_name == 'advertiser_type':
-                    logger.info(f"[DIAG] AFTER final concat+group_by: {len(combined)} unique keys")
-                    logger.info(f"[DIAG] Accumulator size before final merge: {len(accumulators[rollup_name])}")
+                combined = pl.concat(temp_partials[rollup_name]).group_by(dimensions).agg(_combine_aggregations())
                 
                 # Merge into accumulator
                 accumulators[rollup_name] = self._merge_accumulator(
@@ -379,9 +582,8 @@ class RollupBuilder:
                     dimensions
                 )
                 
-                # DIAGNOSTIC: After final merge
-                if rollup_name == 'advertiser_type':
-                    logger.info(f"[DIAG] Accumulator size after final merge: {len(accumulators[rollup_name])}")
+        # Derive the coarser rollups from the finished base rollups
+        accumulators = _derive_rollups(accumulators)
         
         logger.info(f"Final rollup sizes:")
         for rollup_name in accumulators:
@@ -395,6 +597,103 @@ class RollupBuilder:
         logger.info(f"   Peak memory: ~2-4GB (bounded by accumulator sizes)")
         logger.info("="*60)
         
+        # Sort by filter keys and dictionary-encode country/type before writing
+        accumulators = {
+            name: _finalize_rollup(accumulators[name], dimensions)
+            for name, dimensions in ROLLUP_SPECS
+        }
+        
+        # Store in cache
+        self.rollups.update(accumulators)
+        
+        return accumulators
+    
+    def build_all_rollups_parallel(
+        self,
+        max_workers: Optional[int] = None,
+        events_sink_dir: Optional[Path] = None
+    ) -> Dict[str, pl.DataFrame]:
+        """
+        Build all rollups with one worker PROCESS per CSV file.
+        
+        Each worker parses its file, pre-aggregates every rollup and ships the
+        (small) partials back as Arrow IPC bytes. The parent folds partials as
+        they complete, so peak memory is bounded by accumulator size plus
+        FOLD_BATCH_SIZE partials per rollup.
+        
+        Processes sidestep GIL-held parsing paths and keep several files in
+        flight at once, which also hides disk latency.
+        
+        Args:
+            max_workers: Worker processes (default: all cores)
+            events_sink_dir: Optional directory for per-file projected events IPC
+        
+        Returns:
+            Dict mapping rollup name to aggregated DataFrame
+        """
+        start_time = time_module.time()
+        
+        tz_name = _resolve_local_timezone()
+        FOLD_BATCH_SIZE = int(os.getenv('FOLD_BATCH_SIZE', '8'))  # Fold every N files
+        
+        if events_sink_dir is not None:
+            events_sink_dir = Path(events_sink_dir)
+            events_sink_dir.mkdir(parents=True, exist_ok=True)
+            for stale in events_sink_dir.glob('*.ipc'):
+                stale.unlink()
+        
+        logger.info(f"\nBuilding {len(ROLLUP_SPECS)} rollups with PARALLEL per-file workers...")
+        logger.info(f"Timezone for time dimensions: {tz_name}")
+        
+        accumulators: Dict[str, pl.DataFrame] = {}
+        pending: Dict[str, List[pl.DataFrame]] = {name: [] for name, _ in BASE_ROLLUP_SPECS}
+        
+        def fold(rollup_name: str, dimensions: List[str]):
+            parts = pending[rollup_name]
+            if rollup_name in accumulators:
+                parts = [accumulators[rollup_name]] + parts
+            accumulators[rollup_name] = pl.concat(parts).group_by(dimensions).agg(
+                _combine_aggregations()
+            )
+            pending[rollup_name] = []
+        
+        worker = partial(_aggregate_csv_file, tz_name=tz_name, events_sink_dir=events_sink_dir)
+        
+        files_done = 0
+        for partials in self.loader.map_files_parallel(worker, max_workers=max_workers):
+            files_done += 1
+            for rollup_name, dimensions in BASE_ROLLUP_SPECS:
+                pending[rollup_name].append(pl.read_ipc(io.BytesIO(partials[rollup_name])))
+                if len(pending[rollup_name]) >= FOLD_BATCH_SIZE:
+                    fold(rollup_name, dimensions)
+            
+            if files_done % 10 == 0:
+                elapsed = time_module.time() - start_time
+                logger.info(f"  Aggregated {files_done}/{len(self.loader.csv_files)} files ({elapsed:.1f}s elapsed)...")
+        
+        # Final fold
+        for rollup_name, dimensions in BASE_ROLLUP_SPECS:
+            if pending[rollup_name]:
+                fold(rollup_name, dimensions)
+        
+        # Derive the coarser rollups from the finished base rollups
+        accumulators = _derive_rollups(accumulators)
+        
+        total_time = time_module.time() - start_time
+        
+        logger.info("\n" + "="*60)
+        logger.info(f"✅ PARALLEL BUILD COMPLETE: {len(accumulators)} rollups from {files_done} files")
+        for rollup_name in accumulators:
+            logger.info(f"  ✅ {rollup_name}: {len(accumulators[rollup_name]):,} rows")
+        logger.info(f"   Total time: {total_time:.1f}s ({total_time/60:.1f} minutes)")
+        logger.info("="*60)
+        
+        # Sort by filter keys and dictionary-encode country/type before writing
+        accumulators = {
+            name: _finalize_rollup(accumulators[name], dimensions)
+            for name, dimensions in ROLLUP_SPECS
+        }
+        
         # Store in cache
         self.rollups.update(accumulators)
         
@@ -444,20 +743,14 @@ class RollupBuilder:
         for col in agg_cols:
             col_batch = f"{col}_batch"
             if 'min' in col:
-                # MIN: take minimum of both sides
+                # MIN: take minimum of both sides (nulls are ignored)
                 merge_exprs.append(
-                    pl.min_horizontal([
-                        pl.col(col).fill_null(pl.lit(float('inf'))),
-                        pl.col(col_batch).fill_null(pl.lit(float('inf')))
-                    ]).alias(col)
+                    pl.min_horizontal([pl.col(col), pl.col(col_batch)]).alias(col)
                 )
             elif 'max' in col:
-                # MAX: take maximum of both sides
+                # MAX: take maximum of both sides (nulls are ignored)
                 merge_exprs.append(
-                    pl.max_horizontal([
-                        pl.col(col).fill_null(pl.lit(float('-inf'))),
-                        pl.col(col_batch).fill_null(pl.lit(float('-inf')))
-                    ]).alias(col)
+                    pl.max_horizontal([pl.col(col), pl.col(col_batch)]).alias(col)
                 )
             else:
                 # SUM/COUNT: add both sides
@@ -525,22 +818,7 @@ class RollupBuilder:
             logger.info(f"  [{len(rollups)+1}/{len(rollup_specs)}] {name}...")
             
             # Build aggregation query plan
-            agg_plan = lf.group_by(dimensions).agg([
-                # bid_price aggregates (NULL-safe)
-                pl.col('bid_price').drop_nulls().sum().alias('bid_price_sum'),
-                pl.col('bid_price').drop_nulls().count().alias('bid_price_count'),
-                pl.col('bid_price').drop_nulls().min().alias('bid_price_min'),
-                pl.col('bid_price').drop_nulls().max().alias('bid_price_max'),
-                
-                # total_price aggregates (NULL-safe)
-                pl.col('total_price').drop_nulls().sum().alias('total_price_sum'),
-                pl.col('total_price').drop_nulls().count().alias('total_price_count'),
-                pl.col('total_price').drop_nulls().min().alias('total_price_min'),
-                pl.col('total_price').drop_nulls().max().alias('total_price_max'),
-                
-                # Row count
-                pl.len().alias('row_count'),
-            ])
+            agg_plan = _aggregate_by_time_keys(lf, dimensions)
             
             # Execute with streaming=True
             # This is where the magic happens: Polars reads chunks, 
@@ -673,9 +951,9 @@ class RollupBuilder:
         # Load data once
         lf = self.loader.load_with_time_dims()
         
-        # Get unique days
+        # Get unique days (packed integer keys sort chronologically)
         logger.info("Finding unique days...")
-        unique_days = lf.select('day').unique().collect()['day'].to_list()
+        unique_days = lf.select('day_key').unique().collect()['day_key'].to_list()
         unique_days.sort()
         
         logger.info(f"Found {len(unique_days)} unique days")
@@ -685,28 +963,16 @@ class RollupBuilder:
         # Build one partition per day
         for i, day in enumerate(unique_days, 1):
             # Filter to single day
-            day_lf = lf.filter(pl.col('day') == day)
+            day_lf = lf.filter(pl.col('day_key') == day)
             
             # Build aggregates for this day
-            partition = day_lf.group_by(['minute', 'type']).agg([
-                pl.col('bid_price').drop_nulls().sum().alias('bid_price_sum'),
-                pl.col('bid_price').drop_nulls().count().alias('bid_price_count'),
-                pl.col('bid_price').drop_nulls().min().alias('bid_price_min'),
-                pl.col('bid_price').drop_nulls().max().alias('bid_price_max'),
-                
-                pl.col('total_price').drop_nulls().sum().alias('total_price_sum'),
-                pl.col('total_price').drop_nulls().count().alias('total_price_count'),
-                pl.col('total_price').drop_nulls().min().alias('total_price_min'),
-                pl.col('total_price').drop_nulls().max().alias('total_price_max'),
-                
-                pl.len().alias('row_count'),
-            ])
+            partition = _aggregate_by_time_keys(day_lf, ['minute', 'type'])
             
             # Materialize
             df = partition.collect()
             
-            # Store with day identifier
-            partition_name = f"minute_type_day_{day.replace('-', '_')}"
+            # Store with day identifier ("2024_001")
+            partition_name = f"minute_type_day_{day // DAY_KEY_BASE}_{day % DAY_KEY_BASE:03d}"
             partitions[partition_name] = df
             
             if i % 50 == 0:
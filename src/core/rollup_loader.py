@@ -16,15 +16,117 @@ Key features:
 """
 
 import polars as pl
+import pyarrow as pa
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 import logging
 import time
-from functools import lru_cache
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from multiprocessing import shared_memory, resource_tracker
+
+try:
+    from .storage import read_ipc_file
+except ImportError:
+    from storage import read_ipc_file
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Manifest describing rollups published to POSIX shared memory by prepare.py
+SHM_MANIFEST = 'shm_manifest.json'
+
+# Manifest of rollup files (name, file, size, rows) written by prepare.py
+ROLLUP_MANIFEST = 'rollup_manifest.json'
+
+# Where POSIX shared memory segments are visible as files (Linux)
+SHM_ROOT = Path('/dev/shm')
+
+
+def _untrack_shared_memory(shm: shared_memory.SharedMemory):
+    """
+    Stop the multiprocessing resource tracker from unlinking a segment.
+    
+    Python < 3.13 unlinks every segment a process creates when it exits;
+    published rollups must outlive prepare.py.
+    """
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def drop_shared_memory(rollup_dir: Path) -> int:
+    """
+    Unlink every segment listed in a rollup dir's shared memory manifest.
+
+    Segments are untracked so they outlive prepare.py; this is the only
+    thing that frees them short of a reboot. Also removes the manifest.
+    Run via `python prepare.py --drop-shm`.
+
+    Args:
+        rollup_dir: Rollup directory holding the manifest
+
+    Returns:
+        Number of segments unlinked
+    """
+    manifest_path = Path(rollup_dir) / SHM_MANIFEST
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable shared memory manifest: {e}")
+        manifest = {}
+
+    dropped = 0
+    for entry in manifest.values():
+        try:
+            stale = shared_memory.SharedMemory(name=entry['shm_name'])
+        except (FileNotFoundError, KeyError, TypeError):
+            continue
+        stale.close()
+        # unlink() also drops the tracker registration made on attach
+        stale.unlink()
+        dropped += 1
+
+    manifest_path.unlink(missing_ok=True)
+    return dropped
+
+
+# Suffixes of pre-aggregated measure columns (everything else is a dimension)
+MEASURE_SUFFIXES = ('_sum', '_count', '_min', '_max')
+
+
+def compute_column_ranges(df: pl.DataFrame) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Compute (min, max) of every dimension column of a rollup.
+    
+    Strings and categoricals are compared lexically, like the string
+    comparisons filters run on them. All-NULL columns get (None, None).
+    
+    Args:
+        df: Rollup dataframe
+    
+    Returns:
+        Dictionary mapping dimension column to (min, max)
+    """
+    dimensions = [c for c in df.columns if not c.endswith(MEASURE_SUFFIXES) and c != 'row_count']
+    if not dimensions or df.height == 0:
+        return {}
+    
+    exprs = []
+    for c in dimensions:
+        # Categoricals: take the (few) distinct values as strings first
+        col = pl.col(c).unique().cast(pl.Utf8) if df.schema[c] == pl.Categorical else pl.col(c)
+        exprs.extend([col.min().alias(f'{c}__min'), col.max().alias(f'{c}__max')])
+    
+    row = df.select(exprs).row(0)
+    return {c: (row[2 * i], row[2 * i + 1]) for i, c in enumerate(dimensions)}
+
 
 class RollupLoader:
     """
@@ -40,27 +142,117 @@ class RollupLoader:
     - Query-time: <10ms per rollup load
     """
     
-    def __init__(self, rollup_dir: Path, preload_threshold_mb: float = 1.0):
+    def __init__(
+        self,
+        rollup_dir: Path,
+        preload_threshold_mb: float = 1.0,
+        attach_shared_memory: bool = True,
+        background_preload: bool = False,
+        lazy_cache_size: int = 4
+    ):
         """
         Initialize rollup loader.
         
         Args:
             rollup_dir: Directory containing rollup .arrow files
             preload_threshold_mb: Rollups smaller than this (MB) are pre-loaded
+            attach_shared_memory: Attach rollups published by prepare.py to
+                shared memory instead of reading them from disk
+            background_preload: Pre-load from disk on a background thread
+                instead of blocking __init__; load_rollup() reads a rollup
+                directly if its prefetch hasn't finished yet
+            lazy_cache_size: How many lazily loaded (above-threshold)
+                rollups to keep decoded, least recently used evicted first
         """
         self.rollup_dir = Path(rollup_dir)
         self.preload_threshold_mb = preload_threshold_mb
         self.preloaded = {}  # Small rollups kept in memory
         self.rollup_paths = {}  # Map rollup name → file path
         self.rollup_sizes = {}  # Map rollup name → size in MB
+        self.rollup_rows = {}  # Map rollup name → row count (from manifest)
+        self._column_ranges: Dict[str, Dict[str, Tuple[Any, Any]]] = {}  # name → {dim: (min, max)}
+        self.shm_attached = set()  # Rollups attached from shared memory
+        self.lazy_cache_size = lazy_cache_size
+        self._lazy_cache: "OrderedDict[str, pl.DataFrame]" = OrderedDict()  # LRU of large rollups
+        self._lazy_lock = threading.Lock()
+        self._preload_thread: Optional[threading.Thread] = None
         
         logger.info(f"Initializing rollup loader from: {self.rollup_dir}")
         
-        # Discover all rollup files
-        self._discover_rollups()
+        # Discover all rollup files (manifest first, directory scan otherwise)
+        if not self._read_manifest():
+            self._discover_rollups()
+        
+        # Zero-copy attach to rollups published by prepare.py
+        if attach_shared_memory:
+            self._attach_shared_memory()
         
         # Pre-load small rollups
-        self._preload_small_rollups()
+        if background_preload:
+            self._preload_thread = threading.Thread(
+                target=self._preload_small_rollups, name='rollup-preload', daemon=True
+            )
+            self._preload_thread.start()
+        else:
+            self._preload_small_rollups()
+    
+    def _read_manifest(self) -> bool:
+        """
+        Discover rollups from the manifest written by prepare.py.
+        
+        Avoids globbing and stat-ing every rollup file at startup.
+        
+        Returns:
+            True if the manifest was usable, False to fall back to a scan
+        """
+        manifest_path = self.rollup_dir / ROLLUP_MANIFEST
+        if not manifest_path.exists():
+            return False
+        
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rollup manifest: {e}")
+            return False
+        
+        for name, entry in manifest.items():
+            self.rollup_paths[name] = self.rollup_dir / entry['file']
+            self.rollup_sizes[name] = entry['size_bytes'] / (1024 * 1024)
+            self.rollup_rows[name] = entry['num_rows']
+            if entry.get('ranges') is not None:
+                self._column_ranges[name] = {c: tuple(v) for c, v in entry['ranges'].items()}
+        
+        logger.info(f"✅ Discovered {len(self.rollup_paths)} rollups from {ROLLUP_MANIFEST}")
+        return True
+    
+    def write_manifest(self):
+        """
+        Write the rollup manifest (file, size, row count and dimension
+        min/max per rollup).
+        
+        Called by prepare.py once all rollups are written and pre-loaded, so
+        run.py can skip directory discovery.
+        """
+        manifest = {}
+        for name, path in self.rollup_paths.items():
+            df = self.preloaded.get(name)
+            manifest[name] = {
+                'file': path.name,
+                'size_bytes': path.stat().st_size,
+                'num_rows': len(df) if df is not None else None,
+                'ranges': compute_column_ranges(df) if df is not None else None,
+            }
+        
+        with open(self.rollup_dir / ROLLUP_MANIFEST, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        
+        logger.info(f"✅ Wrote {ROLLUP_MANIFEST} ({len(manifest)} rollups)")
+    
+    def wait_for_preload(self):
+        """Block until a background pre-load (if any) has finished."""
+        if self._preload_thread is not None:
+            self._preload_thread.join()
     
     def _discover_rollups(self):
         """Discover all rollup files and their sizes."""
@@ -85,12 +277,15 @@ class RollupLoader:
         start_time = time.time()
         preload_count = 0
         
-        for name, size_mb in self.rollup_sizes.items():
+        for name, size_mb in list(self.rollup_sizes.items()):
+            if name in self.preloaded:
+                continue  # Already attached from shared memory (or loaded)
             if size_mb < self.preload_threshold_mb:
                 logger.info(f"  Loading {name} ({size_mb:.2f} MB)...")
                 load_start = time.time()
                 
-                self.preloaded[name] = pl.read_ipc(self.rollup_paths[name])
+                # Single dict assignment: safe while queries read self.preloaded
+                self.preloaded[name] = read_ipc_file(self.rollup_paths[name])
                 
                 load_time = (time.time() - load_start) * 1000
                 logger.info(f"    ✅ Loaded in {load_time:.1f}ms")
@@ -99,13 +294,121 @@ class RollupLoader:
         total_time = (time.time() - start_time) * 1000
         logger.info(f"\n✅ Pre-loaded {preload_count} rollups in {total_time:.1f}ms")
     
+    def _shm_name(self, name: str) -> str:
+        """Shared memory segment name for a rollup (unique per rollup dir)."""
+        dir_hash = hashlib.md5(str(self.rollup_dir.resolve()).encode()).hexdigest()[:8]
+        return f"rollup_{dir_hash}_{name}"
+    
+    def publish_to_shared_memory(self) -> int:
+        """
+        Publish every pre-loaded rollup to POSIX shared memory.
+        
+        Called by prepare.py after pre-loading. Each rollup is serialized as
+        an UNCOMPRESSED Arrow IPC file into a segment named rollup_<hash>_<name>;
+        a manifest in the rollup dir records segment names, sizes and source
+        file mtimes. run.py then attaches with zero decompression and zero
+        disk I/O.
+        
+        Returns:
+            Number of rollups published
+        """
+        logger.info(f"\nPublishing {len(self.preloaded)} rollups to shared memory...")
+        start_time = time.time()
+
+        # Free everything the previous run published, including rollups
+        # that no longer exist (their names would never be reused)
+        dropped = drop_shared_memory(self.rollup_dir)
+        if dropped:
+            logger.info(f"  Dropped {dropped} segments from the previous run")
+
+        manifest = {}
+        total_bytes = 0
+        
+        for name, df in self.preloaded.items():
+            sink = pa.BufferOutputStream()
+            table = df.to_arrow().combine_chunks()
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            payload = sink.getvalue()
+            
+            shm_name = self._shm_name(name)
+            
+            # Replace a stale segment from a previous prepare run
+            # (unlink() also drops the tracker registration made on attach)
+            try:
+                stale = shared_memory.SharedMemory(name=shm_name)
+                stale.close()
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+            
+            shm = shared_memory.SharedMemory(name=shm_name, create=True, size=max(payload.size, 1))
+            _untrack_shared_memory(shm)
+            shm.buf[:payload.size] = memoryview(payload).cast("B")
+            shm.close()
+            
+            manifest[name] = {
+                'shm_name': shm_name,
+                'size': payload.size,
+                'source_mtime_ns': self.rollup_paths[name].stat().st_mtime_ns,
+            }
+            total_bytes += payload.size
+        
+        with open(self.rollup_dir / SHM_MANIFEST, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        
+        elapsed = (time.time() - start_time) * 1000
+        logger.info(f"✅ Published {len(manifest)} rollups "
+                    f"({total_bytes / (1024*1024):.1f} MB) in {elapsed:.1f}ms")
+        
+        return len(manifest)
+    
+    def _attach_shared_memory(self):
+        """Attach rollups published by prepare.py (skips stale or missing segments)."""
+        manifest_path = self.rollup_dir / SHM_MANIFEST
+        if not manifest_path.exists():
+            return
+        
+        start_time = time.time()
+        
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable shared memory manifest: {e}")
+            return
+        
+        for name, entry in manifest.items():
+            path = self.rollup_paths.get(name)
+            if path is None or path.stat().st_mtime_ns != entry['source_mtime_ns']:
+                continue  # Rollup rewritten since publish
+            
+            # POSIX shm segments are files under /dev/shm on Linux; a pyarrow
+            # memory map keeps the mapping alive exactly as long as the
+            # buffers referencing it (no close/export races at exit)
+            shm_path = SHM_ROOT / entry['shm_name']
+            if not shm_path.exists():
+                continue  # Segment gone (e.g. reboot) or no /dev/shm (macOS)
+            
+            source = pa.memory_map(str(shm_path))
+            buf = source.read_buffer(entry['size'])
+            table = pa.ipc.open_file(pa.BufferReader(buf)).read_all()
+            
+            self.preloaded[name] = pl.from_arrow(table)
+            self.shm_attached.add(name)
+        
+        if self.shm_attached:
+            elapsed = (time.time() - start_time) * 1000
+            logger.info(f"✅ Attached {len(self.shm_attached)} rollups from shared memory in {elapsed:.1f}ms")
+    
     def load_rollup(self, name: str) -> pl.DataFrame:
         """
         Load a rollup (from cache or disk).
         
         Strategy:
         1. Check if pre-loaded (0ms)
-        2. Load from disk with memory mapping (<10ms)
+        2. Check the LRU of recently used large rollups (0ms)
+        3. Load from disk with memory mapping (<10ms), then cache
         
         Args:
             name: Rollup name (e.g., "day_type")
@@ -117,6 +420,13 @@ class RollupLoader:
         if name in self.preloaded:
             return self.preloaded[name]
         
+        # Recently used large rollup: skip the LZ4 decode
+        with self._lazy_lock:
+            df = self._lazy_cache.get(name)
+            if df is not None:
+                self._lazy_cache.move_to_end(name)
+                return df
+        
         # Slow path: load from disk
         if name not in self.rollup_paths:
             raise ValueError(f"Rollup '{name}' not found in {self.rollup_dir}")
@@ -124,14 +434,20 @@ class RollupLoader:
         logger.debug(f"Loading rollup from disk: {name}")
         start_time = time.time()
         
-        df = pl.read_ipc(
-            self.rollup_paths[name],
-            memory_map=False  # Disable mmap to avoid warning with compressed files
-        )
+        # Memory-mapped read (page cache backs the buffers)
+        df = read_ipc_file(self.rollup_paths[name])
         
         load_time = (time.time() - start_time) * 1000
         logger.debug(f"  Loaded {name} in {load_time:.1f}ms")
         
+        if self.lazy_cache_size > 0:
+            with self._lazy_lock:
+                self._lazy_cache[name] = df
+                self._lazy_cache.move_to_end(name)
+                while len(self._lazy_cache) > self.lazy_cache_size:
+                    evicted, _ = self._lazy_cache.popitem(last=False)
+                    logger.debug(f"  Evicted {evicted} from rollup cache")
+        
         return df
     
     def load_partition(self, base_name: str, partition_key: str) -> pl.DataFrame:
@@ -156,13 +472,32 @@ class RollupLoader:
         logger.debug(f"Loading partition: {base_name}/{partition_key}")
         start_time = time.time()
         
-        df = pl.read_ipc(partition_file, memory_map=False)
+        df = read_ipc_file(partition_file)
         
         load_time = (time.time() - start_time) * 1000
         logger.debug(f"  Loaded partition in {load_time:.1f}ms")
         
         return df
     
+    def column_ranges(self, name: str) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Get the (min, max) of each dimension column of a rollup.
+        
+        Read from the manifest when prepare.py recorded them, otherwise
+        computed from the loaded rollup once and cached.
+        
+        Args:
+            name: Rollup name
+        
+        Returns:
+            Dictionary mapping dimension column to (min, max)
+        """
+        ranges = self._column_ranges.get(name)
+        if ranges is None:
+            ranges = compute_column_ranges(self.load_rollup(name))
+            self._column_ranges[name] = ranges
+        return ranges
+    
     def get_available_rollups(self) -> List[str]:
         """
         Get list of available rollup names.
@@ -185,7 +520,7 @@ class RollupLoader:
                 'path': str(path),
                 'size_mb': self.rollup_sizes[name],
                 'preloaded': name in self.preloaded,
-                'rows': len(self.preloaded[name]) if name in self.preloaded else None,
+                'rows': len(self.preloaded[name]) if name in self.preloaded else self.rollup_rows.get(name),
             }
         return info
     
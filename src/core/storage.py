@@ -13,8 +13,9 @@ Key features:
 """
 
 import polars as pl
+import pyarrow as pa
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
 import time
 
@@ -22,6 +23,45 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+def write_ipc_file(df: pl.DataFrame, path: Path, compression: Optional[str] = 'lz4') -> None:
+    """
+    Write a DataFrame as an Arrow IPC file holding ONE record batch.
+    
+    Rollups are small after aggregation, so a single contiguous batch keeps
+    reads to one buffer set per column. Buffers are written by the Arrow
+    C++ IPC writer (8-byte aligned, padded), so memory-mapped reads of
+    uncompressed files are zero-copy.
+    
+    Args:
+        df: DataFrame to write
+        path: Output file path
+        compression: 'lz4' (LZ4 frame), 'zstd', or None
+    """
+    table = df.to_arrow().combine_chunks()
+    options = pa.ipc.IpcWriteOptions(compression=compression, use_threads=True)
+    
+    with pa.ipc.new_file(str(path), table.schema, options=options) as writer:
+        writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+
+
+def read_ipc_file(path: Path) -> pl.DataFrame:
+    """
+    Read an Arrow IPC file through a memory map.
+    
+    The OS page cache backs the file directly; compressed buffers are
+    decompressed from the mapping without an intermediate read copy.
+    
+    Args:
+        path: Arrow IPC file path
+    
+    Returns:
+        DataFrame with file contents
+    """
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return pl.from_arrow(table)
+
+
 class StorageWriter:
     """
     Writes rollup DataFrames to Arrow IPC files.
@@ -80,8 +120,8 @@ class StorageWriter:
         # Determine output path
         output_path = self.output_dir / f"{name}.arrow"
         
-        # Write with compression
-        df.write_ipc(output_path, compression=compression)
+        # Write with compression (single record batch)
+        write_ipc_file(df, output_path, compression=compression)
         
         # Get file stats
         file_size_kb = output_path.stat().st_size / 1024
@@ -126,7 +166,7 @@ class StorageWriter:
             output_path = partition_dir / f"{day_part}.arrow"
             
             # Write partition
-            df.write_ipc(output_path, compression=compression)
+            write_ipc_file(df, output_path, compression=compression)
             
             file_size_kb = output_path.stat().st_size / 1024
             total_size_kb += file_size_kb
@@ -227,7 +267,7 @@ class StorageWriter:
         logger.info(f"Loading rollup: {name}")
         start_time = time.time()
         
-        df = pl.read_ipc(rollup_path)
+        df = read_ipc_file(rollup_path)
         
         load_time = time.time() - start_time
         logger.info(f"✅ Loaded {name}: {len(df):,} rows in {load_time*1000:.2f}ms")
@@ -253,7 +293,7 @@ class StorageWriter:
         logger.info(f"Loading partition: {base_name}/{partition_key}")
         start_time = time.time()
         
-        df = pl.read_ipc(partition_path)
+        df = read_ipc_file(partition_path)
         
         load_time = time.time() - start_time
         logger.info(f"✅ Loaded {base_name}/{partition_key}: {len(df):,} rows in {load_time*1000:.2f}ms")
@@ -4,10 +4,21 @@ Parses JSON query structure into executable components
 """
 
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from datetime import datetime
 
 
+def sql_literal(value) -> str:
+    """Render a bound parameter value as a SQL literal (for EXECUTE)"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
 class QueryParser:
     """Parse and validate JSON queries according to challenge spec"""
     
@@ -72,6 +83,27 @@ class QueryParser:
     
     def to_sql(self) -> str:
         """Convert query to SQL string (for DuckDB baseline)"""
+        return self._build_sql()
+    
+    def to_parameterized_sql(self) -> Tuple[str, List[Any]]:
+        """Convert query to SQL with $1..$n placeholders for WHERE values
+        
+        Queries that differ only in their filter constants render to the
+        same SQL text, so callers can prepare each shape once.
+        
+        Returns:
+            (sql, params)
+        """
+        params = []
+        
+        def bind(value) -> str:
+            params.append(value)
+            return f"${len(params)}"
+        
+        return self._build_sql(bind), params
+    
+    def _build_sql(self, bind: Optional[Callable[[Any], str]] = None) -> str:
+        """Render the SQL, binding WHERE values through `bind` if given"""
         sql_parts = []
         
         # SELECT clause
@@ -99,7 +131,7 @@ class QueryParser:
         if where_conditions:
             where_clauses = []
             for cond in where_conditions:
-                where_clauses.append(self._condition_to_sql(cond))
+                where_clauses.append(self._condition_to_sql(cond, bind))
             sql_parts.append(f"WHERE {' AND '.join(where_clauses)}")
         
         # GROUP BY clause
@@ -140,7 +172,8 @@ class QueryParser:
         else:
             return dimension
     
-    def _condition_to_sql(self, condition: Dict[str, Any]) -> str:
+    def _condition_to_sql(self, condition: Dict[str, Any],
+                          bind: Optional[Callable[[Any], str]] = None) -> str:
         """Convert WHERE condition to SQL"""
         col = condition['col']
         op = condition['op']
@@ -150,6 +183,18 @@ class QueryParser:
         if col in self.TIME_DIMENSIONS:
             col = self._time_dimension_to_sql(col).split(' AS ')[0]
         
+        if bind is not None:
+            if op == 'eq':
+                return f"{col} = {bind(val)}"
+            elif op == 'neq':
+                return f"{col} != {bind(val)}"
+            elif op == 'in':
+                return f"{col} IN ({', '.join(bind(v) for v in val)})"
+            elif op == 'between':
+                return f"{col} BETWEEN {bind(val[0])} AND {bind(val[1])}"
+            else:
+                raise ValueError(f"Unsupported operator: {op}")
+        
         if op == 'eq':
             if isinstance(val, str):
                 return f"{col} = '{val}'"
@@ -0,0 +1,99 @@
+"""
+Result CSV writer shared by run.py and the DuckDB baseline runner
+Writes query results with pyarrow's columnar CSV writer while keeping
+the text format of the previous Python writers (csv.writer / pandas)
+"""
+
+import csv
+import io
+from pathlib import Path
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.types as pat
+
+
+def _float_strings(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Format a float column with Arrow's cast kernel, str()-style
+
+    Arrow writes integral floats without the trailing '.0' (2, not 2.0);
+    append it wherever the text has no '.', exponent, 'inf' or 'nan'.
+    Arrow's exponent thresholds differ from repr() (0.00001 vs 1e-05), which
+    only changes the notation of very small/large values, not the value.
+    """
+    text = pc.cast(column, pa.string())
+    integral = pc.invert(pc.match_substring_regex(text, '[.en]'))
+    return pc.if_else(integral, pc.binary_join_element_wise(text, '.0', ''), text)
+
+
+def _python_formatted(column: pa.ChunkedArray) -> pa.Array:
+    """Format a column with str() per value (NULL stays empty)"""
+    return pa.array(
+        [None if value is None else str(value) for value in column.to_pylist()],
+        type=pa.string(),
+    )
+
+
+def _formatted(column: pa.ChunkedArray) -> Optional[pa.ChunkedArray]:
+    """Text for types Arrow renders differently from Python's str()
+
+    The previous writers used str() (2.0, True, 2024-01-01 05:00:00); Arrow
+    writes 2, true and 2024-01-01 05:00:00.000000. Returns None for columns
+    Arrow already writes the same way (integers, strings, dates, decimals).
+    """
+    data_type = column.type
+    if pat.is_floating(data_type):
+        return _float_strings(column)
+    if pat.is_boolean(data_type):
+        return pc.if_else(column, 'True', 'False')
+    if pat.is_timestamp(data_type):
+        # Rare in results; str() also covers microseconds and UTC offsets
+        return _python_formatted(column)
+    return None
+
+
+def write_result_csv(table: pa.Table, output_file: Path, lineterminator: str = '\n'):
+    """Write a result table as CSV with Arrow's C++ writer
+
+    Integer, string, date and decimal columns are written by Arrow directly;
+    float and boolean columns are first rendered with compute kernels so
+    values read as before (2.0, not 2). The header goes through the csv
+    module (Arrow always quotes header names). Values are unquoted; if one
+    contains a delimiter/quote/newline the file is rewritten with the csv
+    module's minimal quoting.
+
+    Args:
+        table: Result table
+        output_file: Output CSV path
+        lineterminator: Line ending ('\\n' like pandas, '\\r\\n' like csv.writer)
+    """
+    for i, field in enumerate(table.schema):
+        text = _formatted(table.column(i))
+        if text is not None:
+            table = table.set_column(i, field.name, text)
+
+    header = io.StringIO()
+    csv.writer(header, lineterminator=lineterminator).writerow(table.column_names)
+    header_bytes = header.getvalue().encode()
+
+    with open(output_file, 'wb') as f:
+        f.write(header_bytes)
+        try:
+            pacsv.write_csv(
+                table, f,
+                write_options=pacsv.WriteOptions(
+                    include_header=False, quoting_style='none', eol=lineterminator
+                )
+            )
+            return
+        except pa.ArrowInvalid:
+            pass
+
+    # A value contains a delimiter/quote/newline. Arrow's 'needed' quoting
+    # quotes every string, so quote minimally with the csv module instead
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator=lineterminator)
+        writer.writerow(table.column_names)
+        writer.writerows(zip(*(column.to_pylist() for column in table.columns)))
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Run-phase correctness tests
+
+Covers the pieces of the run path that change output or skip work:
+1. Result CSV writer (float text, NULLs, quoting, line endings)
+2. Min/max pruning of day and hour filters
+3. Result and compiled-plan caches
+4. Shared memory attach rejecting a rewritten rollup
+5. minute_id bounds the DuckDB fallback derives from time-label filters
+
+Uses small rollups written to a temporary directory.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.core import QueryExecutor, QueryPattern, RollupLoader
+from src.core.fallback_executor import MAX_UTC_OFFSET_MINUTES, _filter_minute_bounds
+from src.core.rollup_builder import PRICE_SCALE
+from src.core.rollup_loader import drop_shared_memory
+from src.result_csv import write_result_csv
+
+
+def _measures(n: int) -> dict:
+    """Rollup measure columns for n rows (each group: one $1.50 bid)"""
+    return {
+        'bid_price_sum': pl.Series([int(1.5 * PRICE_SCALE)] * n, dtype=pl.Int64),
+        'bid_price_count': pl.Series([1] * n, dtype=pl.UInt32),
+        'total_price_sum': pl.Series([0] * n, dtype=pl.Int64),
+        'total_price_count': pl.Series([0] * n, dtype=pl.UInt32),
+        'row_count': pl.Series([2] * n, dtype=pl.UInt32),
+    }
+
+
+def _write_test_rollups(rollup_dir: Path):
+    """day_type covers 2024-001..2024-002, hour_type covers hours 0 and 13 of 2024-001"""
+    pl.DataFrame({
+        'day': ['2024-001', '2024-001', '2024-002'],
+        'type': pl.Series(['click', 'impression', 'impression'], dtype=pl.Categorical),
+        **_measures(3),
+    }).write_ipc(rollup_dir / 'day_type.arrow', compression='lz4')
+    pl.DataFrame({
+        'hour': ['2024-001 0', '2024-001 13'],
+        'type': pl.Series(['impression', 'impression'], dtype=pl.Categorical),
+        **_measures(2),
+    }).write_ipc(rollup_dir / 'hour_type.arrow', compression='lz4')
+
+
+def _day_pattern(where_filters: list) -> QueryPattern:
+    """SELECT day, SUM(bid_price) ... GROUP BY day ORDER BY day"""
+    return QueryPattern(
+        select_cols=['day'],
+        aggregates=[{'func': 'SUM', 'col': 'bid_price'}],
+        group_by=['day'],
+        where_filters=where_filters,
+        order_by=[{'col': 'day', 'dir': 'asc'}],
+    )
+
+
+def test_result_csv_round_trip():
+    """Floats keep str() text, NULLs are empty, only values that need it are quoted"""
+    print("\n" + "="*60)
+    print("TEST 1: Result CSV round trip")
+    print("="*60)
+
+    table = pa.table({
+        'price': pa.array([2.0, None, 1.5, -0.0, 1e16], pa.float64()),
+        'flag': pa.array([True, False, None, True, False]),
+        'label': ['plain', 'a,b', 'say "hi"', None, 'x'],
+        'n': pa.array([1, 2, None, 4, 5], pa.int64()),
+    })
+    expected = [
+        ['price', 'flag', 'label', 'n'],
+        ['2.0', 'True', 'plain', '1'],
+        ['', 'False', 'a,b', '2'],
+        ['1.5', '', 'say "hi"', ''],
+        ['-0.0', 'True', '', '4'],
+        ['1e+16', 'False', 'x', '5'],
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for eol in ('\n', '\r\n'):
+            out = Path(tmp) / 'q.csv'
+            write_result_csv(table, out, lineterminator=eol)
+
+            raw = out.read_bytes()
+            assert raw.count(eol.encode()) == len(expected), f"line endings: {raw!r}"
+            assert b'"plain"' not in raw, "values are quoted only when needed"
+            with open(out, newline='') as f:
+                assert list(csv.reader(f)) == expected
+
+    # No value needs quoting: the Arrow writer path
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / 'q.csv'
+        write_result_csv(table.drop_columns(['label']), out)
+        assert out.read_text() == "price,flag,n\n2.0,True,1\n,False,2\n1.5,,\n-0.0,True,4\n1e+16,False,5\n"
+
+    print("  ✅ PASS")
+
+
+def test_prune_day_and_hour_filters():
+    """Filters outside a rollup's min/max skip the scan; the result is still correct"""
+    print("\n" + "="*60)
+    print("TEST 2: Min/max pruning of day and hour filters")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_test_rollups(Path(tmp))
+        executor = QueryExecutor(RollupLoader(Path(tmp), attach_shared_memory=False))
+
+        # Calendar dates are converted to day-of-year before the range check
+        for f, excluded in [
+            ({'col': 'day', 'op': 'eq', 'val': '2024-01-02'}, False),
+            ({'col': 'day', 'op': 'eq', 'val': '2024-06-01'}, True),
+            ({'col': 'day', 'op': 'between', 'val': ['2023-12-01', '2023-12-31']}, True),
+            ({'col': 'day', 'op': 'between', 'val': ['2023-12-31', '2024-01-01']}, False),
+            ({'col': 'day', 'op': 'gt', 'val': '2024-01-02'}, True),
+            ({'col': 'day', 'op': 'in', 'val': ['2023-05-05', '2024-01-01']}, False),
+            ({'col': 'day', 'op': 'in', 'val': ['2023-05-05', '2024-06-01']}, True),
+        ]:
+            assert executor.filters_exclude_rollup('day_type', [f]) == excluded, f
+
+        for f, excluded in [
+            ({'col': 'hour', 'op': 'eq', 'val': '2024-001 13'}, False),
+            ({'col': 'hour', 'op': 'eq', 'val': '2024-002 0'}, True),
+            ({'col': 'hour', 'op': 'lt', 'val': '2024-001 0'}, True),
+            ({'col': 'hour', 'op': 'gte', 'val': '2024-001 0'}, False),
+        ]:
+            assert executor.filters_exclude_rollup('hour_type', [f]) == excluded, f
+
+        # Columns the rollup doesn't have are never used to prune
+        assert not executor.filters_exclude_rollup(
+            'day_type', [{'col': 'country', 'op': 'eq', 'val': 'ZZ'}]
+        )
+
+        # A pruned query returns the same (empty) columns as a scanned one
+        pruned = executor.execute_df('day_type', _day_pattern(
+            [{'col': 'day', 'op': 'eq', 'val': '2024-06-01'}]
+        ))
+        scanned = executor.execute_df('day_type', _day_pattern(
+            [{'col': 'type', 'op': 'eq', 'val': 'purchase'}]
+        ))
+        assert pruned.height == 0 and scanned.height == 0
+        assert pruned.schema == scanned.schema
+
+        in_list = executor.execute_df('day_type', _day_pattern(
+            [{'col': 'day', 'op': 'in', 'val': ['2023-05-05', '2024-01-02']}]
+        ))
+        assert in_list.rows() == [('2024-01-02', 1.5)]
+
+    print("  ✅ PASS")
+
+
+def test_result_and_plan_cache():
+    """A repeated pattern hits the result cache and compiles its plan once"""
+    print("\n" + "="*60)
+    print("TEST 3: Result and plan caches")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_test_rollups(Path(tmp))
+        executor = QueryExecutor(RollupLoader(Path(tmp), attach_shared_memory=False))
+
+        filters = [{'col': 'type', 'op': 'eq', 'val': 'impression'}]
+        first = executor.execute_df('day_type', _day_pattern(filters))
+        assert first.rows() == [('2024-01-01', 1.5), ('2024-01-02', 1.5)]
+
+        # Same filters in a different ORDER BY: cached result, re-sorted
+        pattern = _day_pattern(filters)
+        pattern.order_by = [{'col': 'day', 'dir': 'desc'}]
+        second = executor.execute_df('day_type', pattern)
+        assert second.rows() == first.rows()[::-1]
+        assert len(executor._result_cache) == 1
+
+        # A result cache miss for the same pattern reuses the compiled plan
+        executor._result_cache.clear()
+        third = executor.execute_df('day_type', _day_pattern(filters))
+        assert third.rows() == first.rows()
+        assert len(executor._plan_cache) == 1
+
+    print("  ✅ PASS")
+
+
+def test_shm_attach_rejects_rewritten_rollup():
+    """run.py only attaches segments whose source rollup is unchanged"""
+    print("\n" + "="*60)
+    print("TEST 4: Shared memory attach after a rollup rewrite")
+    print("="*60)
+
+    if not Path('/dev/shm').is_dir():
+        print("  ⏭️  SKIP: no /dev/shm")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rollup_dir = Path(tmp)
+        _write_test_rollups(rollup_dir)
+        try:
+            RollupLoader(rollup_dir, attach_shared_memory=False).publish_to_shared_memory()
+
+            attached = RollupLoader(rollup_dir)
+            assert attached.shm_attached == {'day_type', 'hour_type'}
+
+            # Rewrite day_type (new mtime): its segment must not be used
+            path = rollup_dir / 'day_type.arrow'
+            st = path.stat()
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+            reloaded = RollupLoader(rollup_dir)
+            assert reloaded.shm_attached == {'hour_type'}
+            assert reloaded.load_rollup('day_type').height == 3
+        finally:
+            assert drop_shared_memory(rollup_dir) == 2
+
+    print("  ✅ PASS")
+
+
+def test_fallback_minute_bounds():
+    """minute_id bounds cover a label's minutes under every UTC offset"""
+    print("\n" + "="*60)
+    print("TEST 5: Fallback minute_id bounds")
+    print("="*60)
+
+    def minute_id(utc: datetime) -> int:
+        return int(utc.replace(tzinfo=timezone.utc).timestamp()) // 60
+
+    start = datetime(2024, 6, 1)
+    for col, label, span in [('day', '2024-06-01', 1440),
+                             ('hour', '2024-06-01 05:00', 60),
+                             ('minute', '2024-06-01 00:00', 1)]:
+        low, high = _filter_minute_bounds({'col': col, 'op': 'eq', 'val': label})
+        label_start = start + timedelta(hours=5) if col == 'hour' else start
+        # Local time = UTC + offset, so the label's UTC minutes shift by -offset
+        for offset in (-MAX_UTC_OFFSET_MINUTES, -570, 0, 345, MAX_UTC_OFFSET_MINUTES):
+            first = minute_id(label_start) - offset
+            assert low <= first and first + span - 1 <= high, (col, offset)
+
+    low, high = _filter_minute_bounds(
+        {'col': 'day', 'op': 'between', 'val': ['2024-06-01', '2024-06-03']}
+    )
+    assert low == minute_id(start) - MAX_UTC_OFFSET_MINUTES
+    assert high == minute_id(start + timedelta(days=3)) - 1 + MAX_UTC_OFFSET_MINUTES
+
+    assert _filter_minute_bounds({'col': 'day', 'op': 'gte', 'val': '2024-06-01'})[1] is None
+    # Non-canonical labels compare as strings: no bounds
+    assert _filter_minute_bounds({'col': 'day', 'op': 'eq', 'val': '2024-6-1'}) == (None, None)
+    assert _filter_minute_bounds({'col': 'type', 'op': 'eq', 'val': 'click'}) == (None, None)
+
+    print("  ✅ PASS")
+
+
+def main():
+    tests = [
+        test_result_csv_round_trip,
+        test_prune_day_and_hour_filters,
+        test_result_and_plan_cache,
+        test_shm_attach_rejects_rewritten_rollup,
+        test_fallback_minute_bounds,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            print(f"  ❌ FAIL: {test.__name__} {e}")
+            failed += 1
+
+    print(f"\nPassed: {len(tests) - failed}/{len(tests)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())